@@ -12,7 +12,7 @@ if [ $? -eq 0 ]; then
     echo "✅ NamiBot environment activated successfully!"
     echo "📦 Python version: $(python --version)"
     echo "📦 Installed packages:"
-    pip list | grep -E "(wikipedia-api|requests)"
+    pip list | grep -E "(requests)"
     echo ""
     echo "🚀 You can now run NamiBot:"
     echo "   python namibot.py          # Console version"
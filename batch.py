@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+NamiBot Batch Mode
+Answers a file of questions concurrently on a shared NamiBotEngine and writes
+one JSON line per question, in input order.
+
+Input is one question per line, or JSON lines with a "question" (or "message",
+"query", "title") field; the other fields are copied to the output record.
+JSON lines that do not parse or have no question are reported as
+errors in their output record without stopping the batch.
+
+Usage: python batch.py questions.txt [--output answers.jsonl] [--workers 8]
+       cat questions.jsonl | python batch.py - --dump enwiki-pages-articles.xml.bz2
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import redirect_stdout
+
+from namibot import NamiBot, NamiBotEngine
+
+
+QUESTION_FIELDS = ("question", "message", "query", "title")
+
+
+def read_questions(lines):
+    """Yield (record, question) for each non-empty line of plain text or JSON.
+
+    Invalid lines are yielded as (error record, None).
+    """
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        if not line.startswith("{"):
+            yield {"line": number, "question": line}, line
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield {"line": number, "error": f"Invalid JSON: {e}"}, None
+            continue
+        question = next((record[field] for field in QUESTION_FIELDS if record.get(field)), None)
+        if question is None or not str(question).strip():
+            yield {**record, "line": number, "error": "No question field"}, None
+            continue
+        yield record, str(question)
+
+
+def answer(engine, record, question, bot_name="NamiBot"):
+    """Answer one question in a fresh session, so answers do not depend on batch order.
+
+    Returns (result record, whether the question was answered).
+    """
+    start = time.perf_counter()
+    try:
+        response = NamiBot(bot_name, engine=engine).get_response(question)
+        result, ok = dict(record, response=response), True
+    except Exception as e:
+        result, ok = dict(record, error=str(e)), False
+    result['seconds'] = round(time.perf_counter() - start, 4)
+    return result, ok
+
+
+def run_batch(questions, output, engine, workers=8):
+    """Answer (record, question) pairs with a pool of workers, writing JSON lines in input order.
+
+    At most a few questions per worker are in flight, so arbitrarily long
+    input is streamed. Returns the aggregate statistics.
+    """
+    start = time.perf_counter()
+    answered = failed = 0
+    in_flight = deque()
+
+    def write_oldest():
+        nonlocal answered, failed
+        result, ok = in_flight.popleft().result()
+        output.write(json.dumps(result, ensure_ascii=False) + "\n")
+        if not ok:
+            failed += 1
+        else:
+            answered += 1
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="namibot-batch") as pool:
+        for record, question in questions:
+            if question is None:
+                # Invalid lines keep their place in the output
+                future = Future()
+                future.set_result((record, False))
+                in_flight.append(future)
+            else:
+                in_flight.append(pool.submit(answer, engine, record, question))
+            if len(in_flight) >= workers * 4:
+                write_oldest()
+        while in_flight:
+            write_oldest()
+    output.flush()
+
+    seconds = time.perf_counter() - start
+    return {
+        'questions': answered + failed,
+        'failed': failed,
+        'seconds': round(seconds, 3),
+        'questions_per_second': round((answered + failed) / seconds, 1) if seconds else 0.0,
+        'workers': workers
+    }
+
+
+def main():
+    """Run NamiBot over a file of questions."""
+    parser = argparse.ArgumentParser(description="Answer a file of questions with NamiBot")
+    parser.add_argument("input", nargs="?", default="-", help="questions file (text or JSONL), - for stdin")
+    parser.add_argument("--output", "-o", default="-", help="answers JSONL file, - for stdout")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--dump", help="answer from a local Wikipedia dump instead of the API")
+    args = parser.parse_args()
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        # Progress messages go to stderr so that stdout carries only the answers
+        with redirect_stdout(sys.stderr):
+            engine = NamiBotEngine(language=args.language, backend="dump" if args.dump else "online",
+                                   dump_path=args.dump)
+            stats = run_batch(read_questions(source), output, engine, workers=args.workers)
+    finally:
+        for stream in (source, output):
+            if stream not in (sys.stdin, sys.stdout):
+                stream.close()
+
+    print(f"✅ Answered {stats['questions']} questions in {stats['seconds']:.1f}s "
+          f"({stats['questions_per_second']} questions/s, {stats['workers']} workers, "
+          f"{stats['failed']} failed)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
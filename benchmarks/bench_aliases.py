@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Alias Map Benchmark
+Asks queries that only resolve through MediaWiki normalization or redirects
+("AI", "second world war", ...) on the local MediaWiki stand-in, restarting
+the engine with an empty page cache between rounds, once without and once with
+a shared alias map. Reports titles sent and response bytes per lookup, the
+alias hit rate, and checks that both runs return the same documents.
+
+Usage: python benchmarks/bench_aliases.py [--rounds 5]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from namibot import NamiBotEngine
+from rate_limit import RateLimiter
+from stub_wiki import StubWikiServer
+from wiki_cache import PageCache, MemoryCache, AliasMap
+
+
+QUERIES = ("python", "AI", "second world war", "black holes", "deoxyribonucleic acid",
+           "albert einstein", "marie curie", "quantum mechanics", "nobel prize in physics", "theory of relativity")
+
+
+def run(stub, rounds, aliases):
+    """Look every query up once per round; return (documents, titles per lookup, bytes per lookup)."""
+    documents = []
+    titles_sent = bytes_received = 0
+    for _ in range(rounds):
+        # A restart: the page cache starts empty, the alias map (if any) is kept
+        engine = NamiBotEngine(api_url=stub.api_url, cache=PageCache([MemoryCache()]), negative_cache=False,
+                               search_index=False, aliases=aliases,
+                               rate_limiter=RateLimiter(rate=1e6, max_rate=1e6, burst=1e6))
+        resolve_titles = engine.wiki.resolve_titles
+
+        def counting_resolve(titles, resolve_titles=resolve_titles):
+            nonlocal titles_sent
+            titles_sent += len(titles)
+            return resolve_titles(titles)
+
+        engine.wiki.resolve_titles = counting_resolve
+        documents.append([engine.lookup(query)[0] for query in QUERIES])
+        bytes_received += engine.wiki.bytes_received
+    lookups = rounds * len(QUERIES)
+    return documents, titles_sent / lookups, bytes_received / lookups
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NamiBot alias map benchmark")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    aliases = AliasMap(":memory:")
+    with StubWikiServer() as stub:
+        plain, plain_titles, plain_bytes = run(stub, args.rounds, False)
+        learned, learned_titles, learned_bytes = run(stub, args.rounds, aliases)
+
+    print(f"{len(QUERIES)} queries x {args.rounds} restarts with an empty page cache")
+    print(f"{'':<12} {'titles/lookup':>14} {'bytes/lookup':>13}")
+    print(f"{'no aliases':<12} {plain_titles:>14.2f} {plain_bytes:>13.0f}")
+    print(f"{'alias map':<12} {learned_titles:>14.2f} {learned_bytes:>13.0f}")
+    stats = aliases.get_stats()
+    print(f"{stats['aliases']} aliases learned, hit rate {stats['alias_hit_rate']:.0%}, "
+          f"saved {1 - learned_bytes / plain_bytes:.0%} of the response bytes")
+    if plain != learned:
+        print("❌ the alias map changed the answers")
+        sys.exit(1)
+    print("✅ identical documents")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Session Construction Benchmark
+Creates NamiBot sessions on one shared engine, as the chat server does for
+every connection, and reports sessions created per second and the memory
+each one holds on to (traced with tracemalloc).
+
+Usage: python benchmarks/bench_construct.py [--sessions 20000]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from namibot import NamiBot, NamiBotEngine
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NamiBot session construction benchmark")
+    parser.add_argument("--sessions", type=int, default=20000)
+    args = parser.parse_args()
+
+    engine = NamiBotEngine(cache=False, negative_cache=False, aliases=False, search_index=False,
+                           title_suggester=False)
+    NamiBot(engine=engine).get_response("hello")  # compile the shared router outside the timings
+
+    gc.collect()
+    start = time.perf_counter()
+    for _ in range(args.sessions):
+        NamiBot(engine=engine)
+    seconds = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [NamiBot(engine=engine) for _ in range(args.sessions)]
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    print(f"{args.sessions} sessions: {args.sessions / seconds:,.0f} created/s "
+          f"({seconds / args.sessions * 1e6:.1f} µs each), {held / len(sessions):,.0f} bytes each")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+GUI Render Benchmark
+Renders many question/answer pairs (each answer with a Wikipedia link) into the
+chat window and reports the time per message for each block of messages. With
+bounded scrollback the time per message stays flat however long the session.
+
+Usage: python benchmarks/bench_gui_render.py [--messages 10000] [--block 1000] [--max-lines 5000]
+Needs a display (run under xvfb-run on a headless machine). Exits with status 1
+if the last block renders more than --max-slowdown times slower than the first.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tkinter as tk
+
+from gui_namibot import NamiBotGUI
+
+
+ANSWER = ("📖 **Python (programming language)**\n\nPython is a high-level, general-purpose programming "
+          "language. Its design philosophy emphasizes code readability.\n\n"
+          "🔗 Read more: https://en.wikipedia.org/wiki/Python_(programming_language)")
+
+
+class Bot:
+    """Stands in for NamiBot: the GUI only needs a name to render messages."""
+    name = "NamiBot"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NamiBot GUI render benchmark")
+    parser.add_argument("--messages", type=int, default=10000)
+    parser.add_argument("--block", type=int, default=1000)
+    parser.add_argument("--max-lines", type=int, default=5000)
+    parser.add_argument("--max-slowdown", type=float, default=2.0)
+    args = parser.parse_args()
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"⚠️  Skipped: no display available ({e})")
+        return
+    root.withdraw()
+    app = NamiBotGUI(root, namibot=Bot(), max_lines=args.max_lines)
+
+    print(f"{args.messages} messages, scrollback {args.max_lines} lines")
+    print(f"{'messages':>10} {'ms/message':>11} {'lines':>7} {'links':>7}")
+    blocks = []
+    for first in range(0, args.messages, args.block):
+        start = time.perf_counter()
+        for i in range(first, min(first + args.block, args.messages)):
+            if i % 2 == 0:
+                app.display_user_message(f"Tell me about Python {i}")
+            else:
+                # Answers arrive in chunks, as when streamed
+                app.start_bot_message()
+                for chunk in ANSWER.split("\n\n"):
+                    app.append_bot_chunk(chunk + "\n\n")
+                app.finish_bot_message()
+        root.update()
+        blocks.append((time.perf_counter() - start) * 1000 / args.block)
+        lines = int(app.chat_display.index("end-1c").split(".")[0])
+        print(f"{first + args.block:>10} {blocks[-1]:>11.3f} {lines:>7} {len(app.links):>7}")
+    root.destroy()
+
+    slowdown = blocks[-1] / blocks[0]
+    if slowdown > args.max_slowdown:
+        print(f"❌ the last block was {slowdown:.1f}x slower than the first")
+        sys.exit(1)
+    print(f"✅ render time per message stayed flat ({slowdown:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
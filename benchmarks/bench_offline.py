@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Offline Response Benchmark
+Runs get_response against a local MediaWiki stand-in (stub_wiki.py) with
+injected latency and reports p50/p95/p99 latency and throughput per intent
+class: small talk, direct hit, variation hit and miss. Results are written as
+JSON so runs on different commits can be compared with --compare.
+
+Usage: python benchmarks/bench_offline.py [--turns 200] [--latency 0.02] [--jitter 0.005]
+                                          [--cache] [--output bench_offline.json]
+                                          [--compare previous.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from namibot import NamiBot, NamiBotEngine
+from stub_wiki import StubWikiServer
+from rate_limit import RateLimiter
+from wiki_cache import PageCache, MemoryCache, NegativeCache, AliasMap
+
+
+# Messages per intent class, matched against the recorded pages in fixtures/
+INTENT_CLASSES = {
+    # Answered by the intent patterns, no lookup
+    'small_talk': ["Hello", "Thank you", "Help", "Hey there", "Thanks a lot"],
+    # The query itself resolves (after normalization or a redirect)
+    'direct_hit': ["Tell me about python", "What is quantum mechanics?", "Tell me about black hole",
+                   "What is artificial intelligence?", "Describe python"],
+    # Only a title-cased variation of the query exists
+    'variation_hit': ["Tell me about albert einstein", "Who is marie curie?", "Who is ada lovelace?",
+                      "Research second world war", "Explain deoxyribonucleic acid"],
+    # Nothing exists
+    'miss': ["Tell me about zorblaxian hyperdrives", "What is flurbnation?", "Search for quantum marmalade",
+             "Who is professor nobody", "Explain glorptastic theory"],
+}
+
+METRICS = ('p50_ms', 'p95_ms', 'p99_ms', 'mean_ms', 'throughput_per_s')
+
+
+def build_bot(api_url, cache):
+    """A bot talking to the stub; caches are memory-only or disabled.
+
+    The title index is disabled as well, so results do not depend on the
+    files in the user's cache directory.
+    """
+    # The stub does not throttle, so the client-side rate limit is lifted
+    limiter = RateLimiter(rate=1e6, max_rate=1e6, burst=1e6)
+    if cache:
+        engine = NamiBotEngine(api_url=api_url, cache=PageCache([MemoryCache()]),
+                               negative_cache=NegativeCache(), aliases=AliasMap(":memory:"), search_index=False,
+                               title_suggester=False, rate_limiter=limiter)
+    else:
+        engine = NamiBotEngine(api_url=api_url, cache=False, negative_cache=False, aliases=False,
+                               search_index=False, title_suggester=False, rate_limiter=limiter)
+    return NamiBot("NamiBot", engine=engine, history_limit=100)
+
+
+def summarize(latencies, elapsed, api_requests):
+    """Latency percentiles (ms) and throughput of one intent class."""
+    cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+    return {
+        'turns': len(latencies),
+        'p50_ms': round(cuts[49] * 1000, 3),
+        'p95_ms': round(cuts[94] * 1000, 3),
+        'p99_ms': round(cuts[98] * 1000, 3),
+        'mean_ms': round(statistics.fmean(latencies) * 1000, 3),
+        'throughput_per_s': round(len(latencies) / elapsed, 1),
+        'api_requests_per_turn': round(api_requests / len(latencies), 3)
+    }
+
+
+def run_class(bot, stub, messages, turns):
+    """Time get_response over `turns` messages cycling through one intent class."""
+    latencies = []
+    requests_before = stub.request_count
+    start = time.perf_counter()
+    for i in range(turns):
+        message = messages[i % len(messages)]
+        turn_start = time.perf_counter()
+        bot.get_response(message)
+        latencies.append(time.perf_counter() - turn_start)
+    elapsed = time.perf_counter() - start
+    return summarize(latencies, elapsed, stub.request_count - requests_before)
+
+
+def git_commit():
+    """Current commit hash, or None outside a git checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    """Print the change of every metric against a previous results file."""
+    with open(baseline_path, encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)
+    print(f"\nCompared with {baseline_path} (commit {baseline.get('commit')}):")
+    for intent, current in results['intents'].items():
+        previous = baseline.get('intents', {}).get(intent)
+        if previous is None:
+            continue
+        changes = []
+        for metric in METRICS:
+            if previous.get(metric):
+                change = (current[metric] - previous[metric]) / previous[metric] * 100
+                changes.append(f"{metric} {change:+.1f}%")
+        print(f"  {intent:<14} " + ", ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NamiBot offline response benchmark")
+    parser.add_argument("--turns", type=int, default=200, help="messages per intent class")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds of injected latency per API call")
+    parser.add_argument("--jitter", type=float, default=0.005, help="extra random latency of up to this many seconds")
+    parser.add_argument("--cache", action="store_true", help="enable the memory page and negative caches")
+    parser.add_argument("--output", default="bench_offline.json", help="where to write the JSON results")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    args = parser.parse_args()
+
+    with StubWikiServer(latency=args.latency, jitter=args.jitter) as stub:
+        bot = build_bot(stub.api_url, args.cache)
+        intents = {intent: run_class(bot, stub, messages, args.turns)
+                   for intent, messages in INTENT_CLASSES.items()}
+
+    results = {
+        'benchmark': 'offline_response',
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'config': {'turns': args.turns, 'latency': args.latency, 'jitter': args.jitter, 'cache': args.cache},
+        'intents': intents
+    }
+
+    print(f"\n{'intent':<14} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'turns/s':>9} {'API/turn':>9}")
+    for intent, stats in intents.items():
+        print(f"{intent:<14} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} "
+              f"{stats['throughput_per_s']:>9.1f} {stats['api_requests_per_turn']:>9.2f}")
+
+    with open(args.output, "w", encoding="utf-8") as output_file:
+        json.dump(results, output_file, indent=2)
+    print(f"\n📄 Results written to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
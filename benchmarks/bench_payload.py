@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Payload Benchmark
+Looks up pages whose intros have realistic lengths (a few hundred to several
+thousand characters) on the local MediaWiki stand-in, once asking for whole
+intros and once for extracts capped at the displayed SUMMARY_CHARS, and reports
+response bytes per answer. Both runs must render the same documents.
+
+Usage: python benchmarks/bench_payload.py [--pages 200]
+"""
+
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from namibot import NamiBotEngine, SUMMARY_CHARS
+from rate_limit import RateLimiter
+from stub_wiki import StubWikiServer
+from wiki_api import resolve_params
+
+
+# Intro lengths in characters; most article intros are between 500 and 3000
+INTRO_LENGTHS = (300, 600, 900, 1200, 1600, 2000, 2500, 3200, 4500)
+WORDS = ("the", "of", "and", "theory", "history", "physics", "was", "is", "a", "known", "for",
+         "developed", "published", "research", "university", "century", "science", "first")
+
+
+def make_pages(count, seed=1):
+    """Synthetic pages ({title: intro}) with intros of realistic lengths."""
+    rng = random.Random(seed)
+    pages = {}
+    for i in range(count):
+        length = INTRO_LENGTHS[i % len(INTRO_LENGTHS)]
+        words = []
+        while sum(len(word) + 1 for word in words) < length:
+            words.append(rng.choice(WORDS))
+        pages[f"Topic {i}"] = (" ".join(words)).capitalize() + "."
+    return pages
+
+
+def run(pages, extract_chars):
+    """Look up every page once; return (documents, bytes per answer, requests per answer)."""
+    with StubWikiServer(pages=pages) as stub:
+        engine = NamiBotEngine(api_url=stub.api_url, cache=False, negative_cache=False, aliases=False, search_index=False,
+                               rate_limiter=RateLimiter(rate=1e6, max_rate=1e6, burst=1e6))
+        engine.wiki.resolve_params = resolve_params(extract_chars)
+        documents = [engine.lookup(f"topic {i}")[0] for i in range(len(pages))]
+        return documents, engine.wiki.bytes_received / len(pages), stub.request_count / len(pages)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NamiBot payload size benchmark")
+    parser.add_argument("--pages", type=int, default=200)
+    args = parser.parse_args()
+
+    pages = make_pages(args.pages)
+    full, full_bytes, full_requests = run(pages, None)
+    capped, capped_bytes, capped_requests = run(pages, SUMMARY_CHARS)
+
+    print(f"{args.pages} lookups, summaries shown up to {SUMMARY_CHARS} characters")
+    print(f"{'fetch':<16} {'bytes/answer':>12} {'requests/answer':>16}")
+    print(f"{'whole intro':<16} {full_bytes:>12.0f} {full_requests:>16.2f}")
+    print(f"{'capped extract':<16} {capped_bytes:>12.0f} {capped_requests:>16.2f}")
+    print(f"saved {1 - capped_bytes / full_bytes:.0%} of the response bytes")
+    if full != capped:
+        print("❌ capped extracts rendered different documents")
+        sys.exit(1)
+    print("✅ identical documents")
+
+
+if __name__ == "__main__":
+    main()
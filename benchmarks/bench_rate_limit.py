@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter Benchmark
+Many threads send searches to a local MediaWiki stand-in that answers 429 above
+--server-rate requests per second, first without client-side limiting or
+retries, then through the shared adaptive RateLimiter.
+
+Usage: python benchmarks/bench_rate_limit.py [--threads 16] [--seconds 10] [--server-rate 30]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from namibot import NamiBot, NamiBotEngine
+from rate_limit import RateLimiter
+from stub_wiki import StubWikiServer
+
+
+class NoLimit(RateLimiter):
+    """The behaviour before rate limiting: send immediately, never pause."""
+
+    def reserve(self):
+        return 0.0, self._pauses
+
+    def throttled(self, attempt, retry_after=None):
+        return 0.0
+
+
+def run(label, limiter, max_retries, threads, seconds, server_rate):
+    """Hammer the stand-in from several sessions and report answered/failed searches."""
+    with StubWikiServer(max_rate=server_rate) as stub:
+        engine = NamiBotEngine(api_url=stub.api_url, cache=False, negative_cache=False,
+                               aliases=False, search_index=False, rate_limiter=limiter)
+        engine.wiki.max_retries = max_retries
+        answered = []
+        failed = []
+        deadline = time.monotonic() + seconds
+
+        def session(index):
+            bot = NamiBot(engine=engine, history_limit=10)
+            i = 0
+            while time.monotonic() < deadline:
+                # Every question is different, so no lookups are coalesced or cached
+                response = bot.get_response(f"Tell me about topic {index} {i}")
+                (failed if response.startswith("Sorry") else answered).append(1)
+                i += 1
+
+        workers = [threading.Thread(target=session, args=(i,)) for i in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+    final_rate = "-" if isinstance(limiter, NoLimit) else f"{limiter.rate:.1f}"
+    print(f"{label:<12} {len(answered) / seconds:>9.1f} {len(failed):>8} {stub.throttled_count:>10} {final_rate:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NamiBot rate limiter benchmark")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--server-rate", type=float, default=30.0, help="requests per second the stand-in accepts")
+    args = parser.parse_args()
+
+    print(f"{args.threads} sessions for {args.seconds:.0f}s, server accepts {args.server_rate:.0f} req/s")
+    print(f"{'client':<12} {'answers/s':>9} {'failed':>8} {'throttled':>10} {'final rate':>10}")
+    run("unlimited", NoLimit(), 0, args.threads, args.seconds, args.server_rate)
+    run("adaptive", RateLimiter(), 3, args.threads, args.seconds, args.server_rate)
+
+
+if __name__ == "__main__":
+    main()
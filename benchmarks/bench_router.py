@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Intent Routing Microbenchmark
+Compares the per-message cost of the sequential re.search loop with the
+compiled IntentRouter as the number of intents grows, and reports the cost of
+routing a message through NamiBot itself (router lookup included).
+
+Usage: python benchmarks/bench_router.py
+"""
+
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from namibot import NamiBot, NamiBotEngine
+from intent_router import IntentRouter, NAME_PATTERN
+
+
+MESSAGES = [
+    "hello there",
+    "tell me about albert einstein",
+    "python on wikipedia",
+    "thanks a lot",
+    "how many searches have you done",
+    "i like turtles",
+    "my name is alice",
+    "what can you do",
+]
+
+
+def build_intents(count):
+    """The bot's own intent patterns padded with synthetic keyword intents."""
+    intents = [r'\b(hi|hello|hey|greetings)\b', r'\b(thank you|thanks)\b',
+               r'\b(help|what can you do)\b', r'\b(search count|how many searches)\b']
+    for i in range(count - len(intents)):
+        intents.append(rf'\b(keyword{i}|phrase number {i})\b')
+    return intents
+
+
+def legacy_classify(text, search_patterns, intents):
+    """The sequential matching loop NamiBot.get_response used before the router."""
+    if "my name is" in text or "i'm" in text:
+        match = re.search(NAME_PATTERN, text)
+        if match:
+            return 'name', match.group(1)
+    for pattern in search_patterns:
+        match = re.search(pattern, text)
+        if match:
+            query = re.sub(r'[?!.,;:]', '', match.group(1).strip()).strip()
+            if query:
+                return 'search', query
+    for pattern in intents:
+        if re.search(pattern, text):
+            return 'intent', pattern
+    return None, None
+
+
+def per_message_us(function, repeat=5):
+    """Best-of-repeat cost of classifying one message, in microseconds."""
+    number = 200
+    best = min(timeit.repeat(lambda: [function(message) for message in MESSAGES], number=number, repeat=repeat))
+    return best / (number * len(MESSAGES)) * 1e6
+
+
+def bot_with_intents(engine, intents):
+    """A session of a NamiBot subclass that answers the given intents."""
+    bot_class = type("BenchBot", (NamiBot,), {'patterns': {intent: ("OK",) for intent in intents}})
+    return bot_class(engine=engine, history_limit=100)
+
+
+def main():
+    search_patterns = NamiBot.search_patterns
+    engine = NamiBotEngine(cache=False, negative_cache=False, aliases=False, search_index=False,
+                           title_suggester=False)
+    print(f"{'intents':>8} {'sequential µs':>14} {'router µs':>10} {'speedup':>8} {'_route µs':>10}")
+    for count in (10, 25, 50, 100, 200, 400, 2000):
+        intents = build_intents(count)
+        router = IntentRouter(search_patterns, intents)
+        for message in MESSAGES:
+            assert router.classify(message) == legacy_classify(message, search_patterns, intents)
+        legacy = per_message_us(lambda text: legacy_classify(text, search_patterns, intents))
+        compiled = per_message_us(router.classify)
+        routed = per_message_us(bot_with_intents(engine, intents)._route)
+        print(f"{count:>8} {legacy:>14.2f} {compiled:>10.2f} {legacy / compiled:>7.1f}x {routed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
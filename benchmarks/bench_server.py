@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Chat Server Load Test
+Creates thousands of sessions on one shared engine and measures message
+throughput, first in-process through SessionManager and then over HTTP when
+aiohttp is installed. Wikipedia lookups are served from a pre-seeded memory
+cache so the figures measure the server, not the network.
+
+Usage: python benchmarks/bench_server.py [--sessions 5000] [--messages 4]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from namibot import NamiBotEngine
+from server import SessionManager, create_app
+from wiki_cache import PageCache, MemoryCache
+
+
+MESSAGES = [
+    "Hello",
+    "My name is Alice",
+    "Tell me about Albert Einstein",
+    "Thank you",
+]
+
+
+def build_manager():
+    """A session manager whose engine answers lookups from memory."""
+    cache = PageCache([MemoryCache(max_entries=1000)])
+    cache.put("en", "albert einstein", {
+        'title': 'Albert Einstein',
+        'summary': 'Albert Einstein was a German-born theoretical physicist.',
+        'url': 'https://en.wikipedia.org/wiki/Albert_Einstein'
+    })
+    engine = NamiBotEngine(cache=cache, search_index=False)
+    return SessionManager(engine, max_sessions=1000000)
+
+
+async def bench_in_process(sessions, messages):
+    """Throughput of SessionManager.handle across many concurrent sessions."""
+    manager = build_manager()
+    tracemalloc.start()
+    session_ids = [manager.create() for _ in range(sessions)]
+    session_bytes = tracemalloc.get_traced_memory()[0] / sessions
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for i in range(messages):
+        message = MESSAGES[i % len(MESSAGES)]
+        await asyncio.gather(*(manager.handle(session_id, message) for session_id in session_ids))
+    elapsed = time.perf_counter() - start
+    total = sessions * messages
+    print(f"in-process: {sessions} sessions, {total} messages in {elapsed:.2f}s "
+          f"-> {total / elapsed:,.0f} msg/s, ~{session_bytes / 1024:.1f} KiB per session")
+
+
+async def bench_http(sessions, messages, concurrency=200):
+    """Throughput of the HTTP endpoint with a bounded number of concurrent clients."""
+    import aiohttp
+    from aiohttp import web
+
+    runner = web.AppRunner(create_app(build_manager()))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    base = f"http://127.0.0.1:{port}"
+
+    limit = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as client:
+        async def create():
+            async with limit, client.post(f"{base}/sessions") as response:
+                return (await response.json())['session_id']
+
+        async def send(session_id, message):
+            async with limit, client.post(f"{base}/sessions/{session_id}/messages", json={'message': message}) as response:
+                await response.read()
+
+        session_ids = await asyncio.gather(*(create() for _ in range(sessions)))
+        start = time.perf_counter()
+        for i in range(messages):
+            message = MESSAGES[i % len(MESSAGES)]
+            await asyncio.gather(*(send(session_id, message) for session_id in session_ids))
+        elapsed = time.perf_counter() - start
+
+    await runner.cleanup()
+    total = sessions * messages
+    print(f"http:       {sessions} sessions, {total} requests in {elapsed:.2f}s "
+          f"-> {total / elapsed:,.0f} req/s ({concurrency} concurrent clients)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NamiBot server load test")
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--messages", type=int, default=4, help="messages per session")
+    args = parser.parse_args()
+
+    asyncio.run(bench_in_process(args.sessions, args.messages))
+    try:
+        import aiohttp  # noqa: F401
+    except ImportError:
+        print("http:       skipped (aiohttp is not installed)")
+        return
+    asyncio.run(bench_http(args.sessions, args.messages))
+
+
+if __name__ == "__main__":
+    main()
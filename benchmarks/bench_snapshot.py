@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Session Snapshot Benchmark
+Fills a session with a long conversation (search answers of realistic length)
+and a warm page cache, then reports the size of its snapshot and the time to
+write and restore it, with and without compression. Restored sessions must
+have the same history and pages.
+
+Usage: python benchmarks/bench_snapshot.py [--turns 1000] [--pages 200]
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from namibot import NamiBot, NamiBotEngine
+from wiki_cache import PageCache, MemoryCache
+
+
+WORDS = ("the", "of", "and", "theory", "history", "physics", "was", "is", "a", "known", "for",
+         "developed", "published", "research", "university", "century", "science", "first")
+
+
+def text(rng, length):
+    """Random prose of about length characters."""
+    words = []
+    while sum(len(word) + 1 for word in words) < length:
+        words.append(rng.choice(WORDS))
+    return " ".join(words).capitalize() + "."
+
+
+def new_engine():
+    return NamiBotEngine(cache=PageCache([MemoryCache(max_entries=1000)]), negative_cache=False, aliases=False,
+                         search_index=False, title_suggester=False)
+
+
+def build_session(turns, pages, seed=1):
+    """A session whose history alternates questions and answers, on an engine with cached pages."""
+    rng = random.Random(seed)
+    bot = NamiBot("NamiBot", engine=new_engine(), history_limit=turns)
+    bot.user_name = "Ada"
+    for i in range(turns // 2):
+        bot.conversation_history.append("user", f"Tell me about topic {i}")
+        bot.conversation_history.append("bot", f"📚 **Topic {i}**\n\n{text(rng, 600)}\n\n🔗 Read full document: "
+                                               f"https://en.wikipedia.org/wiki/Topic_{i}\n\n📊 Search #{i + 1} in this session")
+    bot.search_count = turns // 2
+    for i in range(pages):
+        bot.engine.cache.put("en", f"topic {i}", {'title': f"Topic {i}", 'summary': text(rng, 600),
+                                                  'url': f"https://en.wikipedia.org/wiki/Topic_{i}"})
+    return bot
+
+
+def timed(function, repeat=20):
+    """Best time of several runs, in milliseconds, and the last result."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NamiBot session snapshot benchmark")
+    parser.add_argument("--turns", type=int, default=1000)
+    parser.add_argument("--pages", type=int, default=200)
+    args = parser.parse_args()
+
+    bot = build_session(args.turns, args.pages)
+    engine = new_engine()
+    history = list(bot.get_conversation_history())
+    print(f"session with {args.turns} turns and {args.pages} cached pages")
+    print(f"{'format':<12} {'bytes':>10} {'snapshot ms':>12} {'restore ms':>11}")
+    for label, compress in (("binary", False), ("binary+zlib", True)):
+        write_ms, data = timed(lambda: bot.snapshot(pages=args.pages, compress=compress))
+        read_ms, restored = timed(lambda: NamiBot.restore(io.BytesIO(data), engine=engine))
+        print(f"{label:<12} {len(data):>10,} {write_ms:>12.2f} {read_ms:>11.2f}")
+        if list(restored.get_conversation_history()) != history or len(engine.cache.hot(args.pages)) != args.pages:
+            print("❌ restored session differs")
+            sys.exit(1)
+    print("✅ restored sessions are identical")
+
+
+if __name__ == "__main__":
+    main()
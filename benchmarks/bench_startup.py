@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark
+Measures how long `import namibot` takes (via python -X importtime, checked
+against a budget) and the time from launching the console until the first
+prompt, both directly and through run.py.
+
+Usage: python benchmarks/bench_startup.py [--runs 5] [--budget-ms 100]
+Exits with status 1 if the median import time is over budget.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROMPT = b"User: "
+
+
+def import_times(module="namibot"):
+    """Run python -X importtime and return ({imported by module: cumulative µs}, total µs)."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    subtree = {}
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package", indented by depth;
+        # children are listed before their parent
+        fields = line[len("import time:"):].split("|")
+        if not line.startswith("import time:") or len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2].rstrip()
+        if name.startswith("  "):
+            subtree[name.strip()] = int(fields[1])
+        elif name.strip() == module:
+            return subtree, int(fields[1])
+        else:
+            subtree = {}  # a top-level import made by the interpreter itself
+    return {}, 0
+
+
+def time_to_prompt(command, stdin=b""):
+    """Seconds from starting command until the console prompt is printed."""
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=ROOT, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, env=dict(os.environ, PYTHONUNBUFFERED="1"))
+    if stdin:
+        process.stdin.write(stdin)
+        process.stdin.flush()
+    output = b""
+    try:
+        while PROMPT not in output:
+            chunk = process.stdout.read1(4096)
+            if not chunk:
+                raise RuntimeError(f"{' '.join(command)} exited before showing a prompt")
+            output += chunk
+        return time.perf_counter() - start
+    finally:
+        process.kill()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NamiBot startup benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=100.0, help="maximum median import time of namibot")
+    args = parser.parse_args()
+
+    runs = [import_times() for _ in range(args.runs)]
+    import_ms = statistics.median(total for _, total in runs) / 1000
+    slowest = sorted(runs[-1][0].items(), key=lambda item: item[1], reverse=True)[:8]
+
+    print(f"import namibot: {import_ms:.1f} ms (median of {args.runs}, budget {args.budget_ms:.0f} ms)")
+    for name, cumulative_us in slowest:  # slowest imports pulled in by namibot
+        print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+    console = [time_to_prompt([sys.executable, "namibot.py"]) for _ in range(args.runs)]
+    launcher = [time_to_prompt([sys.executable, "run.py"], stdin=b"1\n") for _ in range(args.runs)]
+    print(f"first prompt, python namibot.py: {statistics.median(console) * 1000:.1f} ms")
+    print(f"first prompt, python run.py (1): {statistics.median(launcher) * 1000:.1f} ms")
+
+    if import_ms > args.budget_ms:
+        print(f"❌ import time {import_ms:.1f} ms is over the {args.budget_ms:.0f} ms budget")
+        sys.exit(1)
+    print("✅ import time within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Title Suggester Benchmark
+Builds a symmetric-delete index over synthetic Wikipedia-like titles, saves it
+in the binary format, and reports build time, file size, load time and the
+latency of suggestions for titles with one or two typos.
+
+Usage: python benchmarks/bench_suggest.py [--titles 50000] [--queries 2000]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from title_suggest import TitleSuggester
+
+
+SYLLABLES = ("an", "ber", "ca", "do", "el", "fi", "gar", "hol", "in", "jo", "ka", "lin", "mar", "no",
+             "or", "pe", "qui", "ro", "sa", "ter", "u", "vel", "wen", "xi", "yo", "zan", "ste", "ein")
+PATTERNS = ("{0}", "{0} {1}", "{0} {1}", "{0} {1} {2}", "List of {0} {1}", "Battle of {0}",
+            "The {0} {1}", "{0} ({1})", "History of {0}", "{0} {1} (film)")
+
+
+def make_titles(count, seed=1):
+    """Synthetic titles with Wikipedia-like shapes and shared prefixes."""
+    rng = random.Random(seed)
+    vocabulary = ["".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+                  for _ in range(max(100, count // 5))]
+    titles = set()
+    while len(titles) < count:
+        words = [rng.choice(vocabulary) for _ in range(3)]
+        titles.add(rng.choice(PATTERNS).format(*words))
+    return sorted(titles, key=lambda title: rng.random())
+
+
+def misspell(title, edits, rng):
+    """Apply random deletions, insertions, substitutions or transpositions."""
+    for _ in range(edits):
+        i = rng.randrange(len(title) - 1)
+        kind = rng.choice(("delete", "insert", "substitute", "transpose"))
+        letter = rng.choice("abcdefghijklmnopqrstuvwxyz")
+        if kind == "delete":
+            title = title[:i] + title[i + 1:]
+        elif kind == "insert":
+            title = title[:i] + letter + title[i:]
+        elif kind == "substitute":
+            title = title[:i] + letter + title[i + 1:]
+        else:
+            title = title[:i] + title[i + 1] + title[i] + title[i + 2:]
+    return title
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NamiBot title suggester benchmark")
+    parser.add_argument("--titles", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    titles = make_titles(args.titles)
+    start = time.perf_counter()
+    suggester = TitleSuggester.build(titles)
+    build_seconds = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "titles.nbts")
+        suggester.save(path)
+        size = os.path.getsize(path)
+        start = time.perf_counter()
+        suggester = TitleSuggester.load(path)
+        load_ms = (time.perf_counter() - start) * 1000
+
+        rng = random.Random(2)
+        latencies = []
+        found = 0
+        for _ in range(args.queries):
+            title = rng.choice(titles)
+            query = misspell(title, rng.choice((1, 2)), rng)
+            start = time.perf_counter()
+            suggestions = suggester.suggest(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+            found += title in (suggested for suggested, _ in suggestions)
+        suggester.close()
+
+    latencies.sort()
+    print(f"{len(titles)} titles: built in {build_seconds:.1f}s, {size / 1e6:.1f} MB on disk, loaded in {load_ms:.2f} ms")
+    print(f"suggest: p50 {statistics.median(latencies):.3f} ms, p99 {latencies[int(len(latencies) * 0.99)]:.3f} ms, "
+          f"max {latencies[-1]:.3f} ms")
+    print(f"intended title among the suggestions for {found / args.queries:.1%} of {args.queries} misspellings")
+
+
+if __name__ == "__main__":
+    main()
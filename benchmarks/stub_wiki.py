@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Local MediaWiki Stand-in
+A small HTTP server that answers action=query title lookups from recorded
+pages (benchmarks/fixtures/mediawiki_pages.json), applying MediaWiki's title
+normalization and redirects, with optional injected latency and throttling.
+
+Usage: python benchmarks/stub_wiki.py [--port 8765] [--latency 0.05] [--jitter 0.01] [--max-rate 20]
+Point a client at it with api_url="http://127.0.0.1:8765/w/api.php".
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "mediawiki_pages.json")
+
+
+def load_fixtures(path=FIXTURES):
+    """Load recorded pages ({title: extract}), redirects ({from: to}) and links ({title: [titles]})."""
+    with open(path, encoding="utf-8") as fixture_file:
+        data = json.load(fixture_file)
+    return data["pages"], data.get("redirects", {}), data.get("links", {})
+
+
+def normalize_title(title):
+    """MediaWiki title normalization: underscores to spaces, first letter upper case."""
+    title = " ".join(title.replace("_", " ").split())
+    return title[:1].upper() + title[1:]
+
+
+def truncate_extract(text, chars):
+    """TextExtracts' exchars: cut after chars characters, at the end of that word, and add an ellipsis."""
+    if len(text) <= chars:
+        return text
+    return re.match(r"[\w\W]{%d}[^\s\W]*" % chars, text).group() + "…"
+
+
+class StubWikiServer:
+    """Threaded HTTP server replaying recorded MediaWiki query responses."""
+
+    def __init__(self, pages=None, redirects=None, links=None, host="127.0.0.1", port=0, latency=0.0, jitter=0.0,
+                 max_rate=None):
+        if pages is None:
+            pages, redirects, links = load_fixtures()
+        self.pages = pages
+        self.redirects = redirects or {}
+        self.links = links or {}
+        self.latency = latency  # seconds added to every response
+        self.jitter = jitter    # extra random delay, uniform in [0, jitter]
+        self.max_rate = max_rate  # requests per second before answering 429, None for no limit
+        self._tokens = max_rate or 0.0
+        self._updated = time.monotonic()
+        self.request_count = 0
+        self.throttled_count = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                if stub.throttle():
+                    self.send_response(429)
+                    self.send_header("Retry-After", "1")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                params = {key: values[-1] for key, values in parse_qs(urlsplit(self.path).query).items()}
+                body = json.dumps(stub.respond(params)).encode("utf-8")
+                stub.delay()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+
+    @property
+    def api_url(self):
+        """API URL for WikiClient(api_url=...)."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/w/api.php"
+
+    def delay(self):
+        """Sleep for the configured latency plus jitter."""
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def throttle(self):
+        """Return True if this request is over max_rate (a token bucket with one second of burst)."""
+        if self.max_rate is None:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.max_rate, self._tokens + (now - self._updated) * self.max_rate)
+            self._updated = now
+            if self._tokens < 1:
+                self.throttled_count += 1
+                return True
+            self._tokens -= 1
+            return False
+
+    def respond(self, params):
+        """Build the formatversion=2 response to an action=query request."""
+        with self._lock:
+            self.request_count += 1
+        if params.get("action") != "query":
+            return {"error": {"code": "badvalue", "info": "Only action=query is recorded"}}
+
+        normalized, redirects, pages = [], [], {}
+        for title in params.get("titles", "").split("|"):
+            if not title:
+                continue
+            resolved = normalize_title(title)
+            if resolved != title:
+                normalized.append({"from": title, "to": resolved})
+            target = self.redirects.get(resolved)
+            if target is not None:
+                redirects.append({"from": resolved, "to": target})
+                resolved = target
+            if resolved in self.pages:
+                extract = self.pages[resolved]
+                if params.get("exchars"):
+                    extract = truncate_extract(extract, int(params["exchars"]))
+                url = "https://en.wikipedia.org/wiki/" + resolved.replace(" ", "_")
+                pages[resolved] = {"title": resolved, "extract": extract, "fullurl": url}
+                if "info" in params.get("prop", "").split("|"):
+                    # The other fields prop=info&inprop=url returns, so response sizes are realistic
+                    pages[resolved].update({
+                        "pageid": abs(hash(resolved)) % 10 ** 8, "ns": 0,
+                        "contentmodel": "wikitext", "pagelanguage": "en", "pagelanguagehtmlcode": "en",
+                        "pagelanguagedir": "ltr", "touched": "2024-01-01T00:00:00Z", "lastrevid": 1200000000,
+                        "length": 100 * len(self.pages[resolved]),
+                        "editurl": url.replace("/wiki/", "/w/index.php?title=") + "&action=edit",
+                        "canonicalurl": url
+                    })
+                if "links" in params.get("prop", "").split("|"):
+                    pages[resolved]["links"] = [{"ns": 0, "title": link} for link in self.links.get(resolved, [])]
+            else:
+                pages[resolved] = {"title": resolved, "missing": True}
+
+        result = {"pages": list(pages.values())}
+        if normalized:
+            result["normalized"] = normalized
+        if redirects:
+            result["redirects"] = redirects
+        return {"batchcomplete": True, "query": result}
+
+    def start(self):
+        """Serve requests in a background thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Shut the server down."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local MediaWiki stand-in serving recorded pages")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random delay of up to this many seconds")
+    parser.add_argument("--max-rate", type=float, help="answer 429 above this many requests per second")
+    args = parser.parse_args()
+
+    server = StubWikiServer(host=args.host, port=args.port, latency=args.latency, jitter=args.jitter,
+                            max_rate=args.max_rate)
+    print(f"🌐 Stub MediaWiki API at {server.api_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+NamiBot Chat Links
+Finds the URLs in chat text so front ends can render them as links. Kept free
+of tkinter so it can be used (and tested) without a GUI toolkit.
+"""
+
+import re
+
+
+URL_PATTERN = re.compile(r'https?://[^\s]+')
+
+
+def split_links(text):
+    """Split text into (segment, is_url) pairs."""
+    if "://" not in text:
+        return [(text, False)] if text else []
+    segments = []
+    position = 0
+    for match in URL_PATTERN.finditer(text):
+        if match.start() > position:
+            segments.append((text[position:match.start()], False))
+        segments.append((match.group(), True))
+        position = match.end()
+    if position < len(text):
+        segments.append((text[position:], False))
+    return segments
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+NamiBot Conversation History
+A bounded ring buffer of compact turn records. Turns pushed out of the buffer
+can optionally be spilled to an append-only JSON-lines file and are still
+returned when iterating over the history.
+"""
+
+import json
+import os
+import threading
+import time
+import weakref
+from collections import deque
+from datetime import datetime
+
+
+# Spill files in use by live histories in this process, so two never share one
+_spill_owners = weakref.WeakValueDictionary()
+_spill_lock = threading.Lock()
+
+
+class Turn:
+    """One message of a conversation."""
+
+    __slots__ = ('role', 'text', 'timestamp')
+
+    def __init__(self, role, text, timestamp):
+        self.role = role            # 'user' or 'bot'
+        self.text = text
+        self.timestamp = timestamp  # seconds since the epoch
+
+    def as_dict(self):
+        """Return the turn in the {'user'|'bot': text, 'timestamp': datetime} form."""
+        return {self.role: self.text, 'timestamp': datetime.fromtimestamp(self.timestamp)}
+
+
+class ConversationHistory:
+    """Bounded conversation history with optional spill to disk."""
+
+    def __init__(self, max_turns=1000, spill_path=None):
+        """max_turns turns are kept in memory (None for no limit).
+
+        An existing spill_path is continued, e.g. after a restart; a file that
+        another live history in this process spills to is refused.
+        """
+        if max_turns is not None and max_turns < 1:
+            raise ValueError("max_turns must be at least 1")
+        self._turns = deque(maxlen=max_turns)
+        self.spill_path = spill_path
+        self.spilled = 0
+        if spill_path is None:
+            return
+        with _spill_lock:
+            key = os.path.abspath(spill_path)
+            if _spill_owners.get(key) is not None:
+                raise ValueError(f"{spill_path} is already the spill file of another conversation")
+            _spill_owners[key] = self
+        if os.path.exists(spill_path):
+            with open(spill_path, encoding="utf-8") as spill_file:
+                self.spilled = sum(1 for _ in spill_file)
+
+    def append(self, role, text, timestamp=None):
+        """Record a turn, spilling or dropping the oldest one if the buffer is full."""
+        if len(self._turns) == self._turns.maxlen:
+            oldest = self._turns[0]
+            if self.spill_path is not None:
+                with open(self.spill_path, "a", encoding="utf-8") as spill_file:
+                    spill_file.write(json.dumps([oldest.role, oldest.text, oldest.timestamp]) + "\n")
+                self.spilled += 1
+        self._turns.append(Turn(role, text, time.time() if timestamp is None else timestamp))
+
+    def __iter__(self):
+        """Iterate over all turns (spilled ones first) as dicts, oldest first."""
+        if self.spilled:
+            with open(self.spill_path, encoding="utf-8") as spill_file:
+                for line in spill_file:
+                    role, text, timestamp = json.loads(line)
+                    yield Turn(role, text, timestamp).as_dict()
+        for turn in list(self._turns):
+            yield turn.as_dict()
+
+    @property
+    def max_turns(self):
+        """Number of turns held in memory."""
+        return self._turns.maxlen
+
+    def recent(self):
+        """Return the turns still held in memory, oldest first."""
+        return list(self._turns)
+
+    def __len__(self):
+        return self.spilled + len(self._turns)
+
+    def clear(self):
+        """Forget every turn, including spilled ones."""
+        self._turns.clear()
+        if self.spilled and os.path.exists(self.spill_path):
+            os.remove(self.spill_path)
+        self.spilled = 0
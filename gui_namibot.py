@@ -7,21 +7,44 @@ A graphical interface for NamiBot with enhanced display features for Wikipedia d
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 from namibot import NamiBot
+from chat_links import split_links
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 import webbrowser
-import re
+
+
+# Lines of chat kept on screen; older lines are trimmed away
+MAX_SCROLLBACK_LINES = 5000
 
 
 class NamiBotGUI:
-    def __init__(self, root):
+    def __init__(self, root, namibot=None, max_lines=MAX_SCROLLBACK_LINES):
         self.root = root
         self.root.title("NamiBot - Wikipedia Document Assistant")
         self.root.geometry("900x700")
         self.root.resizable(True, True)
         
         # Initialize NamiBot
-        self.namibot = NamiBot("NamiBot")
+        self.namibot = namibot or NamiBot("NamiBot")
+        
+        # Bounded scrollback; each link has its own tag mapped to its URL
+        self.max_lines = max_lines
+        self.links = {}
+        self.link_count = 0
+        
+        # Chunks streamed by the worker thread, inserted together by the main thread
+        self.pending_chunks = []
+        self.flush_scheduled = False
+        self.pending_lock = threading.Lock()
+        
+        # One worker thread runs every NamiBot call in order, so the bot is never
+        # used from two threads. Each message gets a new generation; answers to
+        # older generations are cancelled or dropped.
+        self.worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="namibot-gui")
+        self.generation = 0
+        self.answering = None        # generation of the bot message being shown
+        self.pending_request = None  # future of the latest message
         
         # Create GUI elements
         self.create_widgets()
@@ -127,52 +150,98 @@ class NamiBotGUI:
     
     def display_user_message(self, message):
         """Display a user message in the chat area."""
+        self.insert_segments([(f"You: {message}\n", ("user",))])
+        self.trim_scrollback()
+    
+    def display_bot_message(self, message):
+        """Display a bot message (a string or an iterable of chunks) with URL detection."""
+        text = message if isinstance(message, str) else "".join(message)
+        self.insert_segments([(f"{self.namibot.name}: ", ("bot",))] + self.link_segments(text) + [("\n", ())])
+        self.trim_scrollback()
+    
+    def start_bot_message(self):
+        """Start a new bot message in the chat area."""
+        self.insert_segments([(f"{self.namibot.name}: ", ("bot",))])
+    
+    def append_bot_chunk(self, chunk):
+        """Append part of a bot message, tagging any URLs it contains."""
+        self.insert_segments(self.link_segments(chunk))
+    
+    def finish_bot_message(self):
+        """End the current bot message."""
+        self.insert_segments([("\n", ())])
+        self.trim_scrollback()
+    
+    def queue_bot_chunk(self, chunk, generation):
+        """Queue a chunk from the worker thread; queued chunks are inserted in one batch."""
+        with self.pending_lock:
+            self.pending_chunks.append((generation, chunk))
+            if self.flush_scheduled:
+                return
+            self.flush_scheduled = True
+        self.root.after(0, self.flush_bot_chunks)
+    
+    def flush_bot_chunks(self):
+        """Insert every queued chunk of the current answer at once."""
+        with self.pending_lock:
+            chunks = self.pending_chunks
+            self.pending_chunks = []
+            self.flush_scheduled = False
+        text = "".join(chunk for generation, chunk in chunks if generation == self.answering)
+        if text:
+            self.append_bot_chunk(text)
+    
+    def link_segments(self, text):
+        """Split text into (text, tags) segments, giving each URL its own link tag."""
+        segments = []
+        for segment, is_url in split_links(text):
+            if is_url:
+                tag = f"link{self.link_count}"
+                self.link_count += 1
+                self.links[tag] = segment
+                segments.append((segment, ("url", tag)))
+            else:
+                segments.append((segment, ()))
+        return segments
+    
+    def insert_segments(self, segments):
+        """Insert (text, tags) segments at the end of the chat in a single call."""
+        if not segments:
+            return
+        arguments = []
+        for text, tags in segments:
+            arguments.extend((text, tags))
         self.chat_display.config(state=tk.NORMAL)
-        self.chat_display.insert(tk.END, f"You: {message}\n", "user")
+        self.chat_display.insert(tk.END, *arguments)
         self.chat_display.config(state=tk.DISABLED)
         self.chat_display.see(tk.END)
     
-    def display_bot_message(self, message):
-        """Display a bot message in the chat area with URL detection."""
+    def trim_scrollback(self):
+        """Delete the oldest lines once the chat exceeds max_lines, and forget their links."""
+        lines = int(self.chat_display.index("end-1c").split(".")[0])
+        if lines <= self.max_lines:
+            return
+        # Trim down to 90% so trimming happens once every few hundred lines
+        keep = self.max_lines * 9 // 10
         self.chat_display.config(state=tk.NORMAL)
-        
-        # Insert the message
-        self.chat_display.insert(tk.END, f"{self.namibot.name}: ", "bot")
-        
-        # Check if message contains URLs
-        url_pattern = r'https?://[^\s]+'
-        urls = re.findall(url_pattern, message)
-        
-        if urls:
-            # Split message by URLs and insert with formatting
-            parts = re.split(url_pattern, message)
-            for i, part in enumerate(parts):
-                if part:
-                    self.chat_display.insert(tk.END, part)
-                if i < len(urls):
-                    url = urls[i]
-                    self.chat_display.insert(tk.END, url, "url")
-        else:
-            self.chat_display.insert(tk.END, message)
-        
-        self.chat_display.insert(tk.END, "\n")
+        self.chat_display.delete("1.0", f"{lines - keep + 1}.0")
         self.chat_display.config(state=tk.DISABLED)
-        self.chat_display.see(tk.END)
+        
+        # Links are inserted in order, so the trimmed ones are the oldest
+        for tag in list(self.links):
+            if self.chat_display.tag_ranges(tag):
+                break
+            self.chat_display.tag_delete(tag)
+            del self.links[tag]
     
     def open_url(self, event):
         """Open URL in default browser."""
         try:
-            # Get the URL from the clicked tag
-            index = self.chat_display.index(f"@{event.x},{event.y}")
-            line_start = self.chat_display.index(f"{index} linestart")
-            line_end = self.chat_display.index(f"{index} lineend")
-            line = self.chat_display.get(line_start, line_end)
-            
-            # Extract URL from the line
-            url_pattern = r'https?://[^\s]+'
-            urls = re.findall(url_pattern, line)
-            if urls:
-                webbrowser.open(urls[0])
+            # Each link has its own tag naming its URL
+            for tag in self.chat_display.tag_names(f"@{event.x},{event.y}"):
+                if tag in self.links:
+                    webbrowser.open(self.links[tag])
+                    break
         except Exception as e:
             messagebox.showerror("Error", f"Could not open URL: {e}")
     
@@ -193,47 +262,77 @@ class NamiBotGUI:
         # Clear input field
         self.message_input.delete(0, tk.END)
         
-        # Display user message
+        # Supersede any older message, then display this one
+        generation = self.cancel_pending()
         self.display_user_message(message)
         
-        # Disable send button temporarily
-        self.send_button.config(state=tk.DISABLED)
-        
-        # Get bot response in a separate thread to avoid GUI freezing
-        threading.Thread(target=self.get_bot_response, args=(message,), daemon=True).start()
+        # Answer it on the worker thread
+        self.pending_request = self.worker.submit(self.get_bot_response, message, generation)
+    
+    def cancel_pending(self):
+        """Cancel the queued message, cut off the answer being shown and start a new generation."""
+        self.generation += 1
+        if self.pending_request is not None:
+            self.pending_request.cancel()  # no effect once it is running; it stops at its next chunk
+        if self.answering is not None:
+            self.append_bot_chunk(" …")
+            self.finish_bot_message()
+            self.answering = None
+        return self.generation
     
-    def get_bot_response(self, message):
-        """Get bot response and display it."""
-        # Simulate typing delay for more natural feel
-        time.sleep(0.5)
+    def get_bot_response(self, message, generation):
+        """Stream the bot response into the chat area as it is generated (worker thread)."""
+        if generation != self.generation:
+            return
+        self.root.after(0, self.start_bot_response, generation)
         
-        # Get response from NamiBot
-        response = self.namibot.get_response(message)
+        # Display each chunk in the main thread as soon as NamiBot yields it
+        chunks = self.namibot.stream_response(message)
+        for chunk in chunks:
+            if generation != self.generation:
+                chunks.close()  # a newer message arrived: don't finish this answer
+                break
+            self.queue_bot_chunk(chunk, generation)
         
-        # Display response in main thread
-        self.root.after(0, lambda: self.display_bot_response(response))
+        self.root.after(0, self.finish_bot_response, generation)
+    
+    def start_bot_response(self, generation):
+        """Start showing the answer to a message unless a newer message replaced it."""
+        if generation == self.generation:
+            self.answering = generation
+            self.start_bot_message()
     
-    def display_bot_response(self, response):
-        """Display bot response and re-enable send button."""
-        self.display_bot_message(response)
-        self.send_button.config(state=tk.NORMAL)
-        self.message_input.focus()
+    def finish_bot_response(self, generation):
+        """Finish the answer to a message if it is still being shown."""
+        if self.answering == generation:
+            self.flush_bot_chunks()
+            self.finish_bot_message()
+            self.answering = None
     
     def clear_chat(self):
         """Clear the chat display and conversation history."""
         self.chat_display.config(state=tk.NORMAL)
         self.chat_display.delete(1.0, tk.END)
         self.chat_display.config(state=tk.DISABLED)
+        for tag in self.links:
+            self.chat_display.tag_delete(tag)
+        self.links.clear()
         
-        # Clear NamiBot history
-        self.namibot.clear_history()
+        # Drop any answer in progress, then clear NamiBot history on the worker thread
+        self.answering = None
+        self.cancel_pending()
+        self.worker.submit(self.namibot.clear_history)
         
         # Display welcome message again
         self.display_bot_message("Hello! I'm NamiBot, your Wikipedia document assistant. Ask me about any topic!")
     
     def show_stats(self):
-        """Show NamiBot statistics."""
-        stats = self.namibot.get_stats()
+        """Show NamiBot statistics once the worker thread has collected them."""
+        request = self.worker.submit(self.namibot.get_stats)
+        request.add_done_callback(lambda done: self.root.after(0, self.display_stats, done.result()))
+    
+    def display_stats(self, stats):
+        """Show collected NamiBot statistics."""
         stats_text = f"""
 📊 NamiBot Statistics
 
@@ -326,6 +425,7 @@ Just copy any of these questions or ask your own!
     def exit_app(self):
         """Exit the application."""
         if messagebox.askokcancel("Exit", "Are you sure you want to exit?"):
+            self.worker.shutdown(wait=False, cancel_futures=True)
             self.root.quit()
 
 
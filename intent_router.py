@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+NamiBot Intent Router
+Compiles the name and search patterns into a single regular expression and
+indexes the small-talk intents by keyword, so a message is classified in one
+pass whose cost does not grow with the number of intents.
+"""
+
+import re
+
+
+NAME_PATTERN = r'(?:my name is|i\'m)\s+(\w+)'
+PUNCTUATION_RE = re.compile(r'[?!.,;:]')
+WORD_RE = re.compile(r'\w+')
+PHRASE_RE = re.compile(r'\w+(?: \w+)*')
+
+# Intent patterns of the form \b(phrase|phrase ...)\b can be keyword-indexed
+KEYWORD_INTENT_RE = re.compile(r'^\\b\((?:\?:)?([\w |]+)\)\\b$')
+
+_routers = {}
+
+
+class IntentRouter:
+    """Classify a lowercased message as a name, search or intent match.
+
+    Patterns keep the priority they would have if each were tried in turn with
+    re.search. Name and search alternatives are anchored at the start of the
+    input and preceded by their own lazy scan, so the first alternative that
+    matches anywhere wins. Intents are looked up by the first word of each of
+    their phrases; only those candidates (and any intent that cannot be
+    indexed) are verified with their own regex, in priority order.
+    """
+
+    def __init__(self, search_patterns, intent_patterns):
+        self.search_patterns = tuple(search_patterns)
+        self.intent_patterns = tuple(intent_patterns)
+
+        alternatives = [f"(?P<name>(?s:.*?){NAME_PATTERN})"]
+        alternatives += [f"(?P<search{i}>(?s:.*?){pattern})" for i, pattern in enumerate(self.search_patterns)]
+        self.regex = re.compile(r"\A(?:" + "|".join(alternatives) + ")")
+
+        # The pattern's own first group directly follows the named wrapper group
+        self._first_group = {name: index + 1 for name, index in self.regex.groupindex.items()}
+        self._search_regexes = [re.compile(pattern) for pattern in self.search_patterns]
+
+        # Keyword index: first word of every phrase -> intent indexes
+        self._intent_regexes = [re.compile(pattern) for pattern in self.intent_patterns]
+        self._keywords = {}
+        self._unindexed = []
+        for index, pattern in enumerate(self.intent_patterns):
+            match = KEYWORD_INTENT_RE.match(pattern)
+            phrases = match.group(1).split("|") if match else []
+            if not phrases or not all(PHRASE_RE.fullmatch(phrase) for phrase in phrases):
+                self._unindexed.append(index)
+                continue
+            for phrase in phrases:
+                self._keywords.setdefault(phrase.split(" ", 1)[0], set()).add(index)
+
+    @classmethod
+    def for_patterns(cls, search_patterns, intent_patterns):
+        """Return a shared router for a set of patterns, compiling it only once."""
+        key = (tuple(search_patterns), tuple(intent_patterns))
+        router = _routers.get(key)
+        if router is None:
+            router = _routers[key] = cls(*key)
+        return router
+
+    def classify(self, text):
+        """Return (kind, value) for a lowercased message.
+
+        kind is 'name' (value: the user's name), 'search' (value: the topic with
+        punctuation removed), 'intent' (value: the matching intent pattern) or None.
+        """
+        match = self.regex.match(text)
+        if match is not None:
+            kind = match.lastgroup
+            value = match.group(self._first_group[kind])
+            if kind == "name":
+                return 'name', value
+            query = clean_query(value)
+            if query:
+                return 'search', query
+            # A topic made only of punctuation falls through to the next pattern
+            for regex in self._search_regexes[int(kind[6:]) + 1:]:
+                match = regex.search(text)
+                if match and clean_query(match.group(1)):
+                    return 'search', clean_query(match.group(1))
+        return self._match_intent(text)
+
+    def _match_intent(self, text):
+        """Return the highest-priority intent matching the text."""
+        candidates = set(self._unindexed)
+        for word in WORD_RE.findall(text):
+            indexes = self._keywords.get(word)
+            if indexes:
+                candidates |= indexes
+        for index in sorted(candidates):
+            if self._intent_regexes[index].search(text):
+                return 'intent', self.intent_patterns[index]
+        return None, None
+
+
+def clean_query(query):
+    """Remove question marks and other punctuation from a search topic."""
+    return PUNCTUATION_RE.sub('', query).strip()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+NamiBot Metrics
+Per-stage latency histograms and counters, reported as percentiles through
+get_stats() and in the Prometheus text exposition format.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+
+# Latency buckets in seconds, from 50 µs to 10 s
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Buckets for small counts such as API requests per search
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10)
+
+# Buckets for response sizes in bytes, from nothing to 64 KiB
+BYTE_BUCKETS = (0, 512, 1024, 2048, 4096, 8192, 16384, 32768, 65536)
+
+
+class Histogram:
+    """Cumulative-bucket histogram, as used by Prometheus."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS, discrete=False):
+        self.buckets = tuple(buckets)
+        self.discrete = discrete  # integer observations: quantiles are bucket bounds
+        self.counts = [0] * (len(self.buckets) + 1)  # the last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        """Record one value."""
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            index = len(self.buckets)
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Estimate a quantile by linear interpolation inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[index - 1] if index else 0.0
+                if index == len(self.buckets):
+                    return lower  # beyond the largest bucket
+                upper = self.buckets[index]
+                if self.discrete:
+                    return upper
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+
+class Metrics:
+    """Named latency histograms and counters shared by every session of an engine."""
+
+    def __init__(self, prefix="namibot"):
+        self.prefix = prefix
+        self.histograms = {}
+        self.counters = {}
+        self.collectors = []  # functions returning {name: current value}, exported as gauges
+        self._lock = threading.Lock()
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS):
+        """Record a value in the histogram called name."""
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(buckets, discrete=not name.endswith("_seconds"))
+            histogram.observe(value)
+
+    def increment(self, name, amount=1):
+        """Add to the counter called name."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_collector(self, collector):
+        """Export the values returned by collector() as gauges."""
+        self.collectors.append(collector)
+
+    @contextmanager
+    def timer(self, stage):
+        """Time a block with the monotonic clock and record it as '<stage>_seconds'."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(f"{stage}_seconds", time.perf_counter() - start)
+
+    def get_stats(self):
+        """Return counters and, per histogram, its count, mean and p50/p95/p99."""
+        with self._lock:
+            stats = dict(self.counters)
+            for name, histogram in self.histograms.items():
+                scale = 1000 if name.endswith("_seconds") else 1
+                unit = "_ms" if scale == 1000 else ""
+                base = name[:-len("_seconds")] if scale == 1000 else name
+                stats[base] = {
+                    'count': histogram.count,
+                    f'mean{unit}': histogram.sum / histogram.count * scale if histogram.count else 0.0,
+                    f'p50{unit}': histogram.quantile(0.50) * scale,
+                    f'p95{unit}': histogram.quantile(0.95) * scale,
+                    f'p99{unit}': histogram.quantile(0.99) * scale
+                }
+            return stats
+
+    def to_prometheus(self):
+        """Render every metric in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                metric = f"{self.prefix}_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value}")
+            for name, histogram in sorted(self.histograms.items()):
+                metric = f"{self.prefix}_{name}"
+                lines.append(f"# TYPE {metric} histogram")
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f'{metric}_bucket{{le="{bound:g}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{le="+Inf"}} {histogram.count}')
+                lines.append(f"{metric}_sum {histogram.sum:g}")
+                lines.append(f"{metric}_count {histogram.count}")
+        for collector in self.collectors:
+            for name, value in sorted(collector().items()):
+                lines.append(f"# TYPE {self.prefix}_{name} gauge")
+                lines.append(f"{self.prefix}_{name} {value:g}")
+        return "\n".join(lines) + "\n"
@@ -4,186 +4,698 @@ NamiBot - Wikipedia Document Chatbot
 A smart chatbot that can search and retrieve information from Wikipedia documents.
 """
 
+import copy
 import re
 import random
+import threading
 import time
 from datetime import datetime
-import wikipediaapi
-import requests
-from urllib.parse import quote
+from wiki_api import WikiClient, AsyncWikiClient, ClientPool, API_URL, LANGUAGE_CODE, received_bytes, sent_requests
+from wiki_cache import PageCache, MemoryCache, NegativeCache, AliasMap, normalize_key
+from search_index import SearchIndex
+from intent_router import IntentRouter, clean_query
+from conversation_history import ConversationHistory
+from metrics import Metrics, COUNT_BUCKETS, BYTE_BUCKETS
+from single_flight import SingleFlight
+from rate_limit import shared_limiter
 
 
-class NamiBot:
-    def __init__(self, name="NamiBot", language="en"):
-        self.name = name
-        self.user_name = "User"
-        self.conversation_history = []
+# Characters of a page summary shown in an answer; the API is asked for no more
+SUMMARY_CHARS = 600
+
+
+# A sentence with its closing punctuation and trailing whitespace
+SENTENCE_RE = re.compile(r'[^.!?]*(?:[.!?]+|$)\s*')
+
+# Values that response templates can use, computed only when a reply uses them
+TEMPLATE_FIELDS = {
+    'name': lambda bot: bot.name,
+    'user_name': lambda bot: bot.user_name,
+    'search_count': lambda bot: bot.search_count,
+    'time': lambda bot: datetime.now().strftime('%H:%M:%S'),
+    'time_12h': lambda bot: datetime.now().strftime('%I:%M %p'),
+    'weekday_date': lambda bot: datetime.now().strftime('%A, %B %d, %Y'),
+    'short_date': lambda bot: datetime.now().strftime('%m/%d/%Y'),
+    'long_date': lambda bot: datetime.now().strftime('%B %d, %Y'),
+}
+
+
+class TemplateFields(dict):
+    """Mapping for str.format_map that looks up TEMPLATE_FIELDS of a bot on demand."""
+    
+    def __init__(self, bot):
+        super().__init__()
+        self.bot = bot
+    
+    def __missing__(self, key):
+        return TEMPLATE_FIELDS[key](self.bot)
+
+
+class NamiBotEngine:
+    """Shared, expensive resources: the Wikipedia client, caches and search index.
+    
+    One engine can serve any number of NamiBot sessions; it holds no per-user state.
+    Engines for other languages (for_language) share its caches and connections;
+    with fallback_languages, lookups also search those languages in parallel.
+    """
+    
+    def __init__(self, language="en", backend="online", dump_path=None,
+                 cache=None, negative_cache=None, search_index=None, name="NamiBot", api_url=API_URL,
+                 prefetch=False, rate_limiter=None, fallback_languages=(), title_suggester=None,
+                 aliases=None):
         self.language = language
-        self.search_count = 0
+        self.api_url = api_url
+        self.fallback_languages = tuple(fallback_languages)
         
-        # Initialize Wikipedia API
+        # Initialize Wikipedia API, or the offline dump backend
+        self.backend = backend
+        self._wiki = None
+        self._async_wiki = None
+        self._prefetch_client = None
+        # Token bucket shared by every client in the process unless one is given
+        self.rate_limiter = rate_limiter or shared_limiter
+        # Clients per language sharing one connection pool, and the engines using them
+        self.clients = ClientPool(api_url, self.rate_limiter, extract_chars=SUMMARY_CHARS)
+        self._engines = {language: self}
+        self._engines_lock = threading.Lock()
+        self._fallback_pool = None
         try:
-            self.wiki = wikipediaapi.Wikipedia(
-                language=language,
-                user_agent="NamiBot/1.0 (https://github.com/user/chatbot-namibot; user@example.com)"
-            )
+            if backend == "dump":
+                from wiki_dump import DumpBackend
+                self._wiki = DumpBackend(dump_path, language=language)
+                print(f"✅ {name} initialized successfully with offline Wikipedia dump {dump_path}!")
+            else:
+                # The HTTP client is created on the first search
+                print(f"✅ {name} initialized successfully with Wikipedia API access!")
             self.wiki_available = True
-            print(f"✅ {self.name} initialized successfully with Wikipedia API access!")
         except Exception as e:
             print(f"⚠️ Warning: Wikipedia API not available: {e}")
             self.wiki_available = False
         
-        # Define response patterns
-        self.patterns = {
-            r'\b(hi|hello|hey|greetings)\b': [
-                f"Hello! I'm {self.name}, your Wikipedia research assistant! What would you like to learn about today?",
-                f"Hi there! I'm {self.name}. I can search Wikipedia documents for you!",
-                f"Hello! I'm {self.name}! Ask me anything and I'll find the information in Wikipedia documents!"
-            ],
-            r'\b(how are you|how do you do)\b': [
-                f"I'm doing great! Ready to search Wikipedia documents for you, {self.user_name}!",
-                "I'm functioning perfectly! What topic would you like me to research?",
-                "All systems operational! I'm ready to help you find information in Wikipedia documents!"
-            ],
-            r'\b(what is your name|who are you)\b': [
-                f"My name is {self.name}! I'm a Wikipedia document research assistant.",
-                f"I'm {self.name}, your friendly Wikipedia document explorer.",
-                f"You can call me {self.name}! I help people find information in Wikipedia documents."
-            ],
-            r'\b(bye|goodbye|see you|exit|quit)\b': [
-                f"Goodbye! It was nice helping you research Wikipedia documents, {self.user_name}!",
-                "See you later! Feel free to come back for more Wikipedia knowledge!",
-                "Take care! Wikipedia documents are always here when you need information!"
-            ],
-            r'\b(thank you|thanks)\b': [
-                "You're welcome! Wikipedia documents have so much knowledge to share.",
-                "My pleasure! I love helping people discover information in Wikipedia documents.",
-                "Glad I could help! Wikipedia is an amazing resource for learning."
-            ],
-            r'\b(what time|current time)\b': [
-                f"The current time is {datetime.now().strftime('%H:%M:%S')}",
-                f"It's {datetime.now().strftime('%I:%M %p')} right now",
-                f"Current time: {datetime.now().strftime('%H:%M:%S')}"
-            ],
-            r'\b(what date|today|date)\b': [
-                f"Today is {datetime.now().strftime('%A, %B %d, %Y')}",
-                f"The date is {datetime.now().strftime('%m/%d/%Y')}",
-                f"Today: {datetime.now().strftime('%B %d, %Y')}"
-            ],
-            r'\b(help|what can you do)\b': [
-                "I can search Wikipedia documents for any topic! Just ask me about anything - people, places, events, concepts, etc.",
-                "I'm a Wikipedia document chatbot! Ask me about any topic and I'll find the information for you.",
-                "I can help you learn about anything by searching Wikipedia documents. Just ask me a question!"
-            ],
-            r'\b(wikipedia|wiki)\b': [
-                "Wikipedia is a free online encyclopedia with millions of documents! I can search it for you.",
-                "Wikipedia is one of the largest knowledge bases in the world. What would you like to know?",
-                "Wikipedia documents have information on almost everything! What topic interests you?"
-            ],
-            r'\b(search count|how many searches)\b': [
-                f"I've performed {self.search_count} Wikipedia searches so far in this session!",
-                f"Current search count: {self.search_count} Wikipedia document searches.",
-                f"I've searched Wikipedia documents {self.search_count} times for you!"
-            ]
-        }
+        # Page cache (memory + disk); pass cache=False to disable it
+        if cache is None:
+            try:
+                cache = PageCache.default()
+            except Exception as e:
+                print(f"⚠️ Warning: disk page cache not available, using memory only: {e}")
+                cache = PageCache([MemoryCache()])
+        self.cache = cache or None
+        
+        # Short-lived cache of failed lookups; pass negative_cache=False to disable it
+        if negative_cache is None:
+            negative_cache = NegativeCache()
+        self.negative_cache = negative_cache or None
+        
+        # Redirects and normalizations seen in responses (memory + disk); pass aliases=False to disable it
+        if aliases is None:
+            try:
+                aliases = AliasMap()
+            except Exception as e:
+                print(f"⚠️ Warning: disk alias map not available, using memory only: {e}")
+                aliases = AliasMap(":memory:")
+        self.aliases = aliases if aliases is not False else None
+        
+        # Local BM25 index over fetched summaries; pass search_index=False to disable it
+        if search_index is None:
+            try:
+                search_index = SearchIndex.load()
+            except Exception as e:
+                print(f"⚠️ Warning: saved search index not available, starting empty: {e}")
+                search_index = SearchIndex()
+        self.search_index = search_index if search_index is not False else None
+        self.local_search_hits = 0
+        
+        # Typo-tolerant title index, used when a prebuilt one exists for the language;
+        # pass title_suggester=False to disable it
+        if title_suggester is None:
+            title_suggester = self._default_title_suggester(language)
+        self.title_suggester = title_suggester if title_suggester is not False else None
+        
+        # Per-stage latency histograms and API request counters
+        self.metrics = Metrics()
+        self.metrics.add_collector(self.rate_limiter.get_stats)
+        
+        # Concurrent lookups of the same topic share one fetch
+        self.in_flight = SingleFlight()
+        
+        # Background prefetch of pages linked from answers; pass prefetch=True to enable it
+        self.prefetcher = None
+        if prefetch and backend != "dump" and self.cache is not None:
+            from prefetch import Prefetcher
+            self.prefetcher = Prefetcher(self)
+    
+    @staticmethod
+    def _default_title_suggester(language):
+        """Load the prebuilt title index for a language, or return None."""
+        try:
+            from title_suggest import TitleSuggester
+            return TitleSuggester.default(language)
+        except Exception as e:
+            print(f"⚠️ Warning: title index not available: {e}")
+            return None
+    
+    @property
+    def wiki(self):
+        """Wikipedia client (or dump backend), created on first use."""
+        if self._wiki is None:
+            self._wiki = self.clients.get(self.language)
+        return self._wiki
+    
+    @property
+    def prefetch_client(self):
+        """Separate Wikipedia client for the prefetch threads, created on first use."""
+        if self._prefetch_client is None:
+            self._prefetch_client = WikiClient(language=self.language, api_url=self.api_url,
+                                               limiter=self.rate_limiter, extract_chars=SUMMARY_CHARS)
+        return self._prefetch_client
+    
+    @property
+    def async_wiki(self):
+        """Async Wikipedia client, created on first use."""
+        if self._async_wiki is None:
+            self._async_wiki = AsyncWikiClient(language=self.language, api_url=self.api_url,
+                                               limiter=self.rate_limiter, extract_chars=SUMMARY_CHARS)
+        return self._async_wiki
+    
+    def for_language(self, language):
+        """Engine for another Wikipedia language, created on first use.
         
-        # Default responses for unrecognized input
-        self.default_responses = [
-            "I'm not sure I understand. Could you ask me about a specific topic to search in Wikipedia documents?",
-            "Interesting! Let me search Wikipedia documents for that. Could you be more specific?",
-            "I'm here to help you find information in Wikipedia documents. What would you like to learn about?",
-            "That's an interesting question! Let me search Wikipedia documents for you. Could you rephrase it?",
-            "I can search Wikipedia documents for almost anything! What topic would you like to explore?"
+        It shares the caches, rate limiter, metrics and HTTP connection pool of
+        this engine and has no fallback languages of its own.
+        """
+        if language == self.language:
+            return self
+        if self.backend == "dump":
+            raise ValueError("An offline dump holds a single language")
+        if not LANGUAGE_CODE.fullmatch(language):
+            raise ValueError(f"Not a Wikipedia language code: {language!r}")
+        with self._engines_lock:
+            engine = self._engines.get(language)
+            if engine is None:
+                engine = copy.copy(self)
+                engine.language = language
+                engine.fallback_languages = ()
+                engine._wiki = engine._async_wiki = engine._prefetch_client = None
+                # The local index holds documents in this engine's language
+                engine.search_index = None
+                if self.title_suggester is not None:
+                    engine.title_suggester = self._default_title_suggester(language)
+                if self.prefetcher is not None:
+                    from prefetch import Prefetcher
+                    engine.prefetcher = Prefetcher(engine)
+                self._engines[language] = engine
+            return engine
+    
+    def lookup(self, query):
+        """Find the document for a query. Returns (document, error message).
+        
+        Threads looking up the same query at the same time share one lookup.
+        """
+        return self.in_flight.do(normalize_key(self.language, query), self._lookup, query)
+    
+    async def alookup(self, query):
+        """Find the document for a query without blocking the event loop.
+        
+        Tasks looking up the same query at the same time share one lookup.
+        """
+        return await self.in_flight.ado(normalize_key(self.language, query), self._alookup, query)
+    
+    def _lookup(self, query):
+        """Look up a query through the cache, then the Wikipedia client."""
+        answer, candidates = self._begin_lookup(query)
+        if answer is not None:
+            return answer
+        fallbacks = self._start_fallbacks(query)
+        received, sent = received_bytes(), sent_requests()
+        page = None
+        if candidates:
+            with self.metrics.timer("title_resolution"):
+                page = self.wiki.resolve_titles(candidates)
+        document = self._finish_lookup(query, candidates, page, received_bytes() - received,
+                                       sent_requests() - sent)
+        if document is not None:
+            return document, None
+        for fallback in fallbacks:
+            try:
+                found, _ = fallback.result()
+            except Exception:
+                continue  # a failing fallback language does not hide the others
+            if found is not None:
+                return self._fallback_hit(query, found), None
+        return self._local_fallback(query)
+    
+    async def _alookup(self, query):
+        """Look up a query through the cache, then the async Wikipedia client."""
+        answer, candidates = self._begin_lookup(query)
+        if answer is not None:
+            return answer
+        fallbacks = self._astart_fallbacks(query)
+        received, sent = received_bytes(), sent_requests()
+        page = None
+        if candidates:
+            with self.metrics.timer("title_resolution"):
+                if self.backend == "dump":
+                    # Local dump lookups are memory-mapped and do not block on I/O
+                    page = self.wiki.resolve_titles(candidates)
+                else:
+                    page = await self.async_wiki.resolve_titles(candidates)
+        document = self._finish_lookup(query, candidates, page, received_bytes() - received,
+                                       sent_requests() - sent)
+        if document is not None:
+            return document, None
+        for fallback in fallbacks:
+            try:
+                found, _ = await fallback
+            except Exception:
+                continue
+            if found is not None:
+                return self._fallback_hit(query, found), None
+        return self._local_fallback(query)
+    
+    def _start_fallbacks(self, query):
+        """Start looking the query up in every fallback language, in priority order."""
+        if not self.fallback_languages:
+            return []
+        with self._engines_lock:
+            if self._fallback_pool is None:
+                from concurrent.futures import ThreadPoolExecutor
+                self._fallback_pool = ThreadPoolExecutor(max_workers=4 * len(self.fallback_languages),
+                                                         thread_name_prefix="namibot-fallback")
+        return [self._fallback_pool.submit(self.for_language(language).lookup, query)
+                for language in self.fallback_languages]
+    
+    def _astart_fallbacks(self, query):
+        """Start fallback lookups as tasks on the running event loop."""
+        if not self.fallback_languages:
+            return []
+        import asyncio
+        
+        tasks = [asyncio.ensure_future(self.for_language(language).alookup(query))
+                 for language in self.fallback_languages]
+        for task in tasks:
+            # Tasks left running after a hit in this language still warm the cache
+            task.add_done_callback(lambda done: done.cancelled() or done.exception())
+        return tasks
+    
+    def _fallback_hit(self, query, document):
+        """Remember a document found in a fallback language under this language's query."""
+        self.metrics.increment("fallback_hits")
+        if self.cache is not None:
+            self.cache.put(self.language, query, document)
+        return document
+    
+    def _begin_lookup(self, query):
+        """Answer a lookup locally if possible.
+        
+        Returns ((document, error), None) when no network call is needed, otherwise
+        (None, candidates) with the titles to resolve. Candidates are empty for
+        topics that recently failed, which only fallback languages and the
+        local index may still answer.
+        """
+        canonical = None
+        missing = False
+        with self.metrics.timer("cache_lookup"):
+            answer = self._answer_locally(query)
+            if answer is None:
+                missing = self._known_missing(query)
+            if answer is None and not missing:
+                # A query seen before resolves to its canonical title without a request
+                canonical = self._canonical_title(query)
+                if canonical is not None and self.cache is not None:
+                    cached = self.cache.get(self.language, canonical)
+                    if cached is not None:
+                        answer = cached, None
+        if answer is not None:
+            self.metrics.observe("api_requests_per_search", 0, COUNT_BUCKETS)
+            self.metrics.observe("api_bytes_per_search", 0, BYTE_BUCKETS)
+            return answer, None
+        
+        # Skip title resolution entirely for topics that recently failed
+        if missing:
+            return None, []
+        if canonical is not None:
+            return None, [canonical]
+        with self.metrics.timer("variations"):
+            candidates = self._candidate_titles(query)
+        return None, candidates
+    
+    def _answer_locally(self, query):
+        """Answer from the page cache or an exact local index match, or return None."""
+        # Serve repeated topics from the page cache
+        if self.cache is not None:
+            cached = self.cache.get(self.language, query)
+            if cached is not None:
+                if self.prefetcher is not None:
+                    self.prefetcher.record_hit(self.language, query)
+                return cached, None
+        
+        # A local document with exactly the query as its title needs no network call;
+        # looser matches are only used once title resolution has missed
+        local = self._local_match(query, min_terms=2)
+        if local is not None and self._same_title(local['title'], query):
+            self.local_search_hits += 1
+            return local, None
+        return None
+    
+    def _canonical_title(self, query):
+        """The title a query resolved to before, unless it is known to be missing."""
+        if self.aliases is None:
+            return None
+        title = self.aliases.get(self.language, query)
+        if title is None or self._known_missing(title):
+            return None
+        return title
+    
+    def _record_aliases(self, page, *queries):
+        """Remember the title that queries (and the matching candidate) resolved to."""
+        if self.aliases is None:
+            return
+        for query in set(queries + (page.get('requested'),)):
+            if query:
+                self.aliases.put(self.language, query, page['title'])
+    
+    def _candidate_titles(self, query):
+        """The titles to resolve for a query, minus titles known to be missing.
+        
+        With a title index this is the closest known title (and the query itself
+        if they differ); otherwise the query and its common variations.
+        """
+        if self.title_suggester is not None:
+            with self.metrics.timer("title_suggestion"):
+                suggestion = self.title_suggester.best(query)
+            if suggestion is not None and not self._known_missing(suggestion[0]):
+                title, distance = suggestion
+                self.metrics.increment("title_suggestions")
+                return [title] if distance == 0 else [query, title]
+        
+        # Try the query and some common variations in a single batched request
+        variations = [
+            query.title(),
+            query.capitalize(),
+            query.replace(" ", "_"),
+            query.replace(" ", " ").title(),
+            query.lower().title()
         ]
+        candidates = [query] + [
+            variation for variation in variations
+            if variation != query and not self._known_missing(variation)
+        ]
+        return candidates
+    
+    def _finish_lookup(self, query, candidates, page, bytes_received=0, requests_sent=0):
+        """Store and return a resolved page, or record the misses and return None."""
+        self.metrics.increment("api_requests", requests_sent)
+        self.metrics.observe("api_requests_per_search", requests_sent, COUNT_BUCKETS)
+        self.metrics.increment("api_bytes", bytes_received)
+        self.metrics.observe("api_bytes_per_search", bytes_received, BYTE_BUCKETS)
+        
+        if page is not None:
+            self._record_aliases(page, query)
+            return self._store_page(query, page)
+        
+        for candidate in candidates:
+            self._record_missing(candidate)
+        if self.aliases is not None:
+            self.aliases.delete(self.language, query)  # its title may have been deleted
+        return None
+    
+    def _same_title(self, title, query):
+        """Whether a query names a title, ignoring case and underscores."""
+        return normalize_key(self.language, title).lower() == normalize_key(self.language, query).lower()
+    
+    def _local_match(self, query, min_terms=1):
+        """Find the best locally indexed document containing every query term."""
+        if self.search_index is None:
+            return None
+        return self.search_index.best_match(query, min_terms=min_terms)
+    
+    def _local_fallback(self, query):
+        """Answer from the local index when no page title matches the query."""
+        document = self._local_match(query)
+        if document is not None:
+            self.local_search_hits += 1
+            return document, None
+        return None, self._not_found_message(query)
+    
+    def _known_missing(self, query):
+        """Check whether a query or title is in the negative cache."""
+        return self.negative_cache is not None and self.negative_cache.contains(self.language, query)
+    
+    def _record_missing(self, query):
+        """Remember that a query or title does not exist."""
+        if self.negative_cache is not None:
+            self.negative_cache.add(self.language, query)
+    
+    def _not_found_message(self, query):
+        """Message returned when no page matches the query."""
+        if self.title_suggester is not None:
+            titles = [title for title, _ in self.title_suggester.suggest(query, limit=4)
+                      if not self._known_missing(title)][:3]
+            if titles:
+                return f"I couldn't find any Wikipedia documents about '{query}'. Did you mean: {', '.join(titles)}?"
+        return f"I couldn't find any Wikipedia documents about '{query}'. Try being more specific or check the spelling."
+    
+    def _store_page(self, query, page):
+        """Extract the displayed fields of a page and put them in the cache."""
+        with self.metrics.timer("summary"):
+            return self._build_document(query, page)
+    
+    def _build_document(self, query, page):
+        """Truncate the summary and store the document in the cache and index."""
+        # Extract summary (first SUMMARY_CHARS characters for more detailed responses)
+        summary = page['summary'][:SUMMARY_CHARS]
+        if len(page['summary']) > SUMMARY_CHARS:
+            summary += "..."
+        
+        document = {'title': page['title'], 'summary': summary, 'url': page['url']}
+        if self.cache is not None:
+            self.cache.put(self.language, query, document)
+        if self.search_index is not None:
+            self.search_index.add(document)
+        return document
+    
+    def store_prefetched(self, page):
+        """Cache a prefetched page under its title and the title it was requested as."""
+        document = self._build_document(page['title'].lower(), page)
+        self._record_aliases(page)
+        if page['requested'].lower() != page['title'].lower():
+            self.cache.put(self.language, page['requested'].lower(), document)
+        return document
+    
+    def prefetch_links(self, document):
+        """Warm the cache with pages linked from an answered document, if prefetch is enabled."""
+        if self.prefetcher is not None:
+            self.prefetcher.schedule(document)
+    
+    def get_stats(self):
+        """Get statistics of the shared caches and index."""
+        stats = {}
+        if self.cache is not None:
+            stats.update(self.cache.get_stats())
+        if self.negative_cache is not None:
+            stats.update(self.negative_cache.get_stats())
+        if self.aliases is not None:
+            stats.update(self.aliases.get_stats())
+        if self.search_index is not None:
+            stats['local_search_hits'] = self.local_search_hits
+            stats['indexed_documents'] = len(self.search_index)
+        if self.title_suggester is not None:
+            stats['indexed_titles'] = len(self.title_suggester)
+        if self.prefetcher is not None:
+            stats.update(self.prefetcher.get_stats())
+        stats['coalesced_lookups'] = self.in_flight.shared
+        stats['languages'] = list(self._engines)
+        stats.update(self.rate_limiter.get_stats())
+        stats['metrics'] = self.metrics.get_stats()
+        return stats
+
+
+class NamiBot:
+    # Wikipedia search patterns; group 1 is the topic to search for
+    search_patterns = [
+        r'(?:what is|who is|tell me about|search for|find information about|what do you know about)\s+(.+)',
+        r'(?:can you tell me|do you know|i want to know about)\s+(.+)',
+        r'(.+)\s+(?:on wikipedia|in wikipedia|from wikipedia)',
+        r'(?:explain|describe|research)\s+(.+)',
+    ]
+    
+    # Replies to intent patterns; {fields} are filled in from TEMPLATE_FIELDS when a reply is chosen
+    patterns = {
+        r'\b(hi|hello|hey|greetings)\b': (
+            "Hello! I'm {name}, your Wikipedia research assistant! What would you like to learn about today?",
+            "Hi there! I'm {name}. I can search Wikipedia documents for you!",
+            "Hello! I'm {name}! Ask me anything and I'll find the information in Wikipedia documents!"
+        ),
+        r'\b(how are you|how do you do)\b': (
+            "I'm doing great! Ready to search Wikipedia documents for you, {user_name}!",
+            "I'm functioning perfectly! What topic would you like me to research?",
+            "All systems operational! I'm ready to help you find information in Wikipedia documents!"
+        ),
+        r'\b(what is your name|who are you)\b': (
+            "My name is {name}! I'm a Wikipedia document research assistant.",
+            "I'm {name}, your friendly Wikipedia document explorer.",
+            "You can call me {name}! I help people find information in Wikipedia documents."
+        ),
+        r'\b(bye|goodbye|see you|exit|quit)\b': (
+            "Goodbye! It was nice helping you research Wikipedia documents, {user_name}!",
+            "See you later! Feel free to come back for more Wikipedia knowledge!",
+            "Take care! Wikipedia documents are always here when you need information!"
+        ),
+        r'\b(thank you|thanks)\b': (
+            "You're welcome! Wikipedia documents have so much knowledge to share.",
+            "My pleasure! I love helping people discover information in Wikipedia documents.",
+            "Glad I could help! Wikipedia is an amazing resource for learning."
+        ),
+        r'\b(what time|current time)\b': (
+            "The current time is {time}",
+            "It's {time_12h} right now",
+            "Current time: {time}"
+        ),
+        r'\b(what date|today|date)\b': (
+            "Today is {weekday_date}",
+            "The date is {short_date}",
+            "Today: {long_date}"
+        ),
+        r'\b(help|what can you do)\b': (
+            "I can search Wikipedia documents for any topic! Just ask me about anything - people, places, events, concepts, etc.",
+            "I'm a Wikipedia document chatbot! Ask me about any topic and I'll find the information for you.",
+            "I can help you learn about anything by searching Wikipedia documents. Just ask me a question!"
+        ),
+        r'\b(wikipedia|wiki)\b': (
+            "Wikipedia is a free online encyclopedia with millions of documents! I can search it for you.",
+            "Wikipedia is one of the largest knowledge bases in the world. What would you like to know?",
+            "Wikipedia documents have information on almost everything! What topic interests you?"
+        ),
+        r'\b(search count|how many searches)\b': (
+            "I've performed {search_count} Wikipedia searches so far in this session!",
+            "Current search count: {search_count} Wikipedia document searches.",
+            "I've searched Wikipedia documents {search_count} times for you!"
+        )
+    }
+    
+    # Default responses for unrecognized input
+    default_responses = (
+        "I'm not sure I understand. Could you ask me about a specific topic to search in Wikipedia documents?",
+        "Interesting! Let me search Wikipedia documents for that. Could you be more specific?",
+        "I'm here to help you find information in Wikipedia documents. What would you like to learn about?",
+        "That's an interesting question! Let me search Wikipedia documents for you. Could you rephrase it?",
+        "I can search Wikipedia documents for almost anything! What topic would you like to explore?"
+    )
+    
+    def __init__(self, name="NamiBot", language=None, backend="online", dump_path=None,
+                 cache=None, negative_cache=None, search_index=None, engine=None,
+                 history_limit=1000, history_spill_path=None):
+        self.name = name
+        self.user_name = "User"
+        # Bounded history; older turns are spilled to history_spill_path if given, else dropped
+        self.conversation_history = ConversationHistory(max_turns=history_limit, spill_path=history_spill_path)
+        self.search_count = 0
+        
+        # Shared Wikipedia client, caches and index; pass engine= to share one between sessions
+        # (a language other than the engine's uses its engine for that language)
+        if engine is None:
+            engine = NamiBotEngine(language or "en", backend, dump_path, cache, negative_cache, search_index, name=name)
+        elif language is not None:
+            engine = engine.for_language(language)
+        self.engine = engine
+    
+    @property
+    def language(self):
+        """Wikipedia language of this bot."""
+        return self.engine.language
     
     def search_wikipedia_documents(self, query, max_results=3):
         """Search Wikipedia documents for a given query."""
-        if not self.wiki_available:
+        if not self.engine.wiki_available:
             return None, "Sorry, Wikipedia API is not available right now."
         
         try:
             # Increment search count
             self.search_count += 1
-            
-            # Try to get the page directly
-            page = self.wiki.page(query)
-            
-            if page.exists():
-                # Extract summary (first 600 characters for more detailed responses)
-                summary = page.summary[:600]
-                if len(page.summary) > 600:
-                    summary += "..."
-                
-                return {
-                    'title': page.title,
-                    'summary': summary,
-                    'url': page.fullurl,
-                    'exists': True,
-                    'search_count': self.search_count
-                }, None
-            else:
-                # If direct page doesn't exist, try some common variations
-                variations = [
-                    query.title(),
-                    query.capitalize(),
-                    query.replace(" ", "_"),
-                    query.replace(" ", " ").title(),
-                    query.lower().title()
-                ]
-                
-                for variation in variations:
-                    if variation != query:
-                        page = self.wiki.page(variation)
-                        if page.exists():
-                            summary = page.summary[:600]
-                            if len(page.summary) > 600:
-                                summary += "..."
-                            
-                            return {
-                                'title': page.title,
-                                'summary': summary,
-                                'url': page.fullurl,
-                                'exists': True,
-                                'search_count': self.search_count
-                            }, None
-                
-                # If no variations work, provide a helpful message
-                return None, f"I couldn't find any Wikipedia documents about '{query}'. Try being more specific or check the spelling."
+            document, error = self.engine.lookup(query)
+        except Exception as e:
+            return None, f"Sorry, there was an error searching Wikipedia documents: {str(e)}"
+        if document:
+            self.engine.prefetch_links(document)
+        return (self._build_result(document) if document else None), error
+    
+    async def asearch_wikipedia_documents(self, query, max_results=3):
+        """Search Wikipedia documents for a given query without blocking the event loop."""
+        if not self.engine.wiki_available:
+            return None, "Sorry, Wikipedia API is not available right now."
         
+        try:
+            # Increment search count
+            self.search_count += 1
+            document, error = await self.engine.alookup(query)
         except Exception as e:
             return None, f"Sorry, there was an error searching Wikipedia documents: {str(e)}"
+        if document:
+            self.engine.prefetch_links(document)
+        return (self._build_result(document) if document else None), error
+    
+    def _build_result(self, document):
+        """Build a search result from a cached or freshly fetched document."""
+        return {
+            'title': document['title'],
+            'summary': document['summary'],
+            'url': document['url'],
+            'exists': True,
+            'search_count': self.search_count
+        }
     
     def get_response(self, user_input):
         """Generate a response based on user input."""
+        with self.engine.metrics.timer("turn"):
+            reply, search_query = self._route(user_input)
+            if search_query is not None:
+                return self.handle_wikipedia_search(search_query)
+            return reply
+    
+    def stream_response(self, user_input):
+        """Generate a response as a stream of text chunks.
+        
+        Joining the chunks gives the same text as get_response().
+        """
+        with self.engine.metrics.timer("turn"):
+            reply, search_query = self._route(user_input)
+            if search_query is None:
+                yield reply
+                return
+            yield from self.stream_wikipedia_search(search_query)
+    
+    async def aget_response(self, user_input):
+        """Generate a response based on user input, awaiting any Wikipedia search."""
+        with self.engine.metrics.timer("turn"):
+            reply, search_query = self._route(user_input)
+            if search_query is not None:
+                return await self.ahandle_wikipedia_search(search_query)
+            return reply
+    
+    def _route(self, user_input):
+        """Decide how to answer user input.
+        
+        Returns (reply, None) for a direct reply or (None, query) when a
+        Wikipedia search is needed.
+        """
         # Store the conversation
-        self.conversation_history.append({"user": user_input, "timestamp": datetime.now()})
+        self.conversation_history.append("user", user_input)
         
         # Convert to lowercase for pattern matching
         user_input_lower = user_input.lower().strip()
         
+        # Classify the message against the name, search and intent patterns in one pass
+        with self.engine.metrics.timer("intent_matching"):
+            kind, value = self.intent_router().classify(user_input_lower)
+        
         # Check for name setting
-        if "my name is" in user_input_lower or "i'm" in user_input_lower:
-            name_match = re.search(r'(?:my name is|i\'m)\s+(\w+)', user_input_lower)
-            if name_match:
-                self.user_name = name_match.group(1).title()
-                return f"Nice to meet you, {self.user_name}! I'll remember your name."
+        if kind == 'name':
+            self.user_name = value.title()
+            return f"Nice to meet you, {self.user_name}! I'll remember your name.", None
         
         # Check for Wikipedia search patterns
-        search_patterns = [
-            r'(?:what is|who is|tell me about|search for|find information about|what do you know about)\s+(.+)',
-            r'(?:can you tell me|do you know|i want to know about)\s+(.+)',
-            r'(.+)\s+(?:on wikipedia|in wikipedia|from wikipedia)',
-            r'(?:explain|describe|research)\s+(.+)',
-        ]
-        
-        for pattern in search_patterns:
-            match = re.search(pattern, user_input_lower)
-            if match:
-                search_query = match.group(1).strip()
-                # Remove question marks and other punctuation
-                search_query = re.sub(r'[?!.,;:]', '', search_query).strip()
-                if search_query:
-                    return self.handle_wikipedia_search(search_query)
+        if kind == 'search':
+            return None, value
         
         # Check if the input looks like a direct question (starts with what, who, when, where, how, why)
         question_words = ['what', 'who', 'when', 'where', 'how', 'why']
@@ -197,27 +709,77 @@ class NamiBot:
                 if topic_words:
                     search_query = ' '.join(topic_words[:4])  # Take first 4 words as topic
                     # Remove question marks and other punctuation
-                    search_query = re.sub(r'[?!.,;:]', '', search_query).strip()
-                    return self.handle_wikipedia_search(search_query)
+                    search_query = clean_query(search_query)
+                    return None, search_query
         
         # Check patterns for matches
-        for pattern, responses in self.patterns.items():
-            if re.search(pattern, user_input_lower):
-                response = random.choice(responses)
-                self.conversation_history.append({"bot": response, "timestamp": datetime.now()})
-                return response
+        if kind == 'intent':
+            response = self.render(random.choice(self.patterns[value]))
+            self.conversation_history.append("bot", response)
+            return response, None
         
         # If no pattern matches, return a default response
-        response = random.choice(self.default_responses)
-        self.conversation_history.append({"bot": response, "timestamp": datetime.now()})
-        return response
+        response = self.render(random.choice(self.default_responses))
+        self.conversation_history.append("bot", response)
+        return response, None
+    
+    def render(self, template):
+        """Fill in a response template with this session's current values."""
+        return template.format_map(TemplateFields(self))
+    
+    @classmethod
+    def intent_router(cls):
+        """The compiled router for this class's patterns, built on first use.
+        
+        It is stored on the class itself, so subclasses with their own patterns
+        get their own router and a message costs no more than a size check. It
+        is rebuilt when patterns are added to or removed from the tables.
+        """
+        sizes = (len(cls.search_patterns), len(cls.patterns))
+        cached = cls.__dict__.get('_intent_router')
+        if cached is None or cached[0] != sizes:
+            cached = sizes, IntentRouter.for_patterns(cls.search_patterns, cls.patterns)
+            cls._intent_router = cached
+        return cached[1]
     
     def handle_wikipedia_search(self, query):
         """Handle Wikipedia search and format response."""
         result, error = self.search_wikipedia_documents(query)
-        
+        return self._format_search_response(query, result, error)
+    
+    def stream_wikipedia_search(self, query):
+        """Handle Wikipedia search, yielding the formatted response in chunks."""
+        result, error = self.search_wikipedia_documents(query)
+        chunks = []
+        formatting = 0.0
+        pending = self._search_response_chunks(query, result, error)
+        while True:
+            start = time.perf_counter()
+            chunk = next(pending, None)
+            formatting += time.perf_counter() - start
+            if chunk is None:
+                break
+            chunks.append(chunk)
+            yield chunk
+        self.engine.metrics.observe("formatting_seconds", formatting)
+        self.conversation_history.append("bot", "".join(chunks))
+    
+    async def ahandle_wikipedia_search(self, query):
+        """Handle Wikipedia search asynchronously and format response."""
+        result, error = await self.asearch_wikipedia_documents(query)
+        return self._format_search_response(query, result, error)
+    
+    def _format_search_response(self, query, result, error):
+        """Format a search result (or error) as the bot's reply."""
+        with self.engine.metrics.timer("formatting"):
+            response = "".join(self._search_response_chunks(query, result, error))
+        self.conversation_history.append("bot", response)
+        return response
+    
+    def _search_response_chunks(self, query, result, error):
+        """Yield the reply to a search: title header, summary sentences, URL, footer."""
         if error:
-            response = error
+            yield error
         elif result and result.get('exists'):
             # Found a page
             title = result['title']
@@ -225,31 +787,63 @@ class NamiBot:
             url = result['url']
             search_count = result['search_count']
             
-            response = f"📚 **{title}**\n\n{summary}\n\n🔗 Read full document: {url}\n\n📊 Search #{search_count} in this session"
+            yield f"📚 **{title}**\n\n"
+            for sentence in SENTENCE_RE.findall(summary):
+                if sentence:
+                    yield sentence
+            yield f"\n\n🔗 Read full document: {url}"
+            yield f"\n\n📊 Search #{search_count} in this session"
         else:
-            response = f"I couldn't find Wikipedia documents about '{query}'. Try rephrasing your question or asking about a different topic."
+            yield f"I couldn't find Wikipedia documents about '{query}'. Try rephrasing your question or asking about a different topic."
+    
+    def snapshot(self, stream=None, pages=0, compress=True):
+        """Save this session, and up to pages of the hottest cached pages, in the binary snapshot format.
         
-        self.conversation_history.append({"bot": response, "timestamp": datetime.now()})
-        return response
+        Writes to stream if given, otherwise returns the snapshot as bytes.
+        """
+        from session_snapshot import write_snapshot
+        if stream is not None:
+            write_snapshot(self, stream, pages, compress)
+            return None
+        import io
+        buffer = io.BytesIO()
+        write_snapshot(self, buffer, pages, compress)
+        return buffer.getvalue()
+    
+    @classmethod
+    def restore(cls, source, engine=None, warm_cache=True, languages=None, max_turns=None, max_bytes=None):
+        """Rebuild a session from snapshot() bytes or a binary stream, on engine if given.
+        
+        Saved pages warm the engine's page cache. For snapshots from untrusted
+        sources, pass warm_cache=False and limits for the languages, history
+        length and size to accept (see session_snapshot.read_snapshot).
+        """
+        from session_snapshot import read_snapshot
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            import io
+            source = io.BytesIO(source)
+        return read_snapshot(source, engine, cls, warm_cache, languages, max_turns, max_bytes)
     
     def get_conversation_history(self):
-        """Return the conversation history."""
-        return self.conversation_history
+        """Return an iterator over the conversation history, oldest turn first."""
+        return iter(self.conversation_history)
     
     def clear_history(self):
         """Clear the conversation history."""
-        self.conversation_history = []
+        self.conversation_history.clear()
         self.search_count = 0
         return "Conversation history and search count cleared!"
     
     def get_stats(self):
         """Get bot statistics."""
-        return {
+        stats = {
             'total_searches': self.search_count,
             'conversation_length': len(self.conversation_history),
             'bot_name': self.name,
             'user_name': self.user_name
         }
+        stats.update(self.engine.get_stats())
+        return stats
 
 
 def main():
@@ -291,8 +885,11 @@ def main():
                 print(f"   User name: {stats['user_name']}")
                 continue
             
-            response = namibot.get_response(user_input)
-            print(f"\n{namibot.name}: {response}")
+            # Print the response as it is generated
+            print(f"\n{namibot.name}: ", end="", flush=True)
+            for chunk in namibot.stream_response(user_input):
+                print(chunk, end="", flush=True)
+            print()
             
         except KeyboardInterrupt:
             print(f"\n\n{namibot.name}: Goodbye! Thanks for using NamiBot!")
@@ -303,4 +900,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main() 
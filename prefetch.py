@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+NamiBot Speculative Prefetch
+After a page is answered, fetch the summaries of the articles it links to in
+the background so that likely follow-up questions are served from the cache.
+Links mentioned in the answered summary are preferred, in order of mention.
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from wiki_api import sent_requests
+from wiki_cache import normalize_key
+
+
+class Prefetcher:
+    """Bounded background prefetcher of linked pages with a request budget."""
+
+    def __init__(self, engine, max_links=5, max_workers=2, max_pending=8,
+                 budget=60, budget_window=60.0, remember=1000):
+        self.engine = engine
+        self.max_links = max_links          # linked pages fetched per answered page
+        self.max_pending = max_pending      # queued jobs beyond this are dropped
+        self.budget = budget                # API requests allowed per budget_window seconds
+        self.budget_window = budget_window
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="namibot-prefetch")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._spent = deque()               # times of recent prefetch requests
+        self._done = OrderedDict()          # pages whose links were prefetched recently
+        self._prefetched = OrderedDict()    # cache key warmed and not yet asked for -> keys of its page
+        self.remember = remember
+        self.prefetched_pages = 0
+        self.hits = 0
+        self.skipped = 0
+
+    def schedule(self, document):
+        """Queue a prefetch of the pages linked from an answered document."""
+        title = document['title']
+        with self._lock:
+            if title in self._done or self._pending >= self.max_pending:
+                self.skipped += 1
+                return False
+            self._remember(self._done, title, True)
+            self._pending += 1
+        self._pool.submit(self._run, document)
+        return True
+
+    def _run(self, document):
+        try:
+            self.prefetch(document)
+        except Exception:
+            pass  # prefetching is best effort; the next real lookup reports errors
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def prefetch(self, document):
+        """Fetch and cache the summaries of the top linked pages of a document."""
+        client = self.engine.prefetch_client
+        if not self._spend():
+            return 0
+        sent = sent_requests()
+        try:
+            return self._fetch_links(client, document)
+        finally:
+            self.engine.metrics.increment("api_requests", sent_requests() - sent)
+
+    def _fetch_links(self, client, document):
+        """Resolve and cache the top linked pages of a document not cached yet."""
+        links = rank_links(client.linked_titles(document['title']), document['summary'])
+        links = [title for title in links if not self.engine.cache.contains(self.engine.language, title.lower())]
+        links = links[:self.max_links]
+        if not links or not self._spend():
+            return 0
+
+        pages = client.resolve_all(links)
+        for page in pages:
+            self.engine.store_prefetched(page)
+            keys = {normalize_key(self.engine.language, query)
+                    for query in (page['title'].lower(), page['requested'].lower())}
+            with self._lock:
+                for key in keys:
+                    self._remember(self._prefetched, key, keys)
+                self.prefetched_pages += 1
+        return len(pages)
+
+    def _spend(self):
+        """Take one request from the budget, or return False if it is used up."""
+        now = time.monotonic()
+        with self._lock:
+            while self._spent and now - self._spent[0] > self.budget_window:
+                self._spent.popleft()
+            if len(self._spent) >= self.budget:
+                self.skipped += 1
+                return False
+            self._spent.append(now)
+        self.engine.metrics.increment("prefetch_requests")
+        return True
+
+    def _remember(self, entries, key, value):
+        """Add a key to a bounded recency map."""
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > self.remember:
+            entries.popitem(last=False)
+
+    def record_hit(self, language, query):
+        """Count a cache hit on a prefetched query (once per prefetched page)."""
+        with self._lock:
+            keys = self._prefetched.pop(normalize_key(language, query), None)
+            if keys:
+                self.hits += 1
+                for key in keys:
+                    self._prefetched.pop(key, None)
+
+    def get_stats(self):
+        """Return prefetch counters and the hit rate."""
+        return {
+            'prefetched_pages': self.prefetched_pages,
+            'prefetch_hits': self.hits,
+            'prefetch_hit_rate': self.hits / self.prefetched_pages if self.prefetched_pages else 0.0,
+            'prefetch_skipped': self.skipped
+        }
+
+    def close(self, wait=False):
+        """Stop the worker threads."""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+def rank_links(links, summary):
+    """Order linked titles by their first mention in the summary; unmentioned ones are dropped."""
+    text = summary.lower()
+    positions = {}
+    for title in links:
+        # "Mercury (planet)" is mentioned as "mercury"
+        name = title.split(" (")[0].lower()
+        position = text.find(name)
+        if position >= 0 and len(name) > 2:
+            positions[title] = position
+    return sorted(positions, key=positions.get)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+NamiBot Rate Limiting
+A token bucket shared by every Wikipedia client in the process. The rate adapts
+to the server: it is halved whenever a response is throttled (HTTP 429/503,
+maxlag or ratelimited errors) and creeps up with each successful request, so it
+settles just below the highest rate the server accepts.
+Retry-After hints pause every client until the server is ready again.
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+
+# MediaWiki errors (MediaWiki-API-Error header) that mean "slow down and retry"
+THROTTLE_ERRORS = ("maxlag", "ratelimited")
+
+
+class RateLimiter:
+    """Adaptive token bucket (additive increase, multiplicative decrease)."""
+
+    def __init__(self, rate=10.0, max_rate=50.0, burst=10, min_rate=0.5, increase=0.5,
+                 backoff=1.0, max_backoff=60.0):
+        self.rate = rate              # current allowed requests per second
+        self.max_rate = max_rate      # the rate never grows beyond this
+        self.burst = burst            # requests that may be sent back to back
+        self.min_rate = min_rate
+        self.increase = increase      # rate added per successful request
+        self.backoff = backoff        # first retry delay without a Retry-After hint
+        self.max_backoff = max_backoff
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._throttled_at = None     # rate when the server last throttled us
+        self._pauses = 0              # number of pauses so far; waiting callers re-queue after one
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.throttled_responses = 0
+        self.waited = 0.0
+
+    def reserve(self):
+        """Take a token; return (seconds to wait before sending, current pause number)."""
+        with self._lock:
+            now = time.monotonic()
+            # Tokens accrue from the last update, which lies in the future during a pause
+            if now > self._updated:
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+            self._tokens -= 1
+            # Callers queue up one token interval apart, starting when any pause ends
+            delay = max(0.0, self._updated - now) + max(0.0, -self._tokens / self.rate)
+            self.requests += 1
+            self.waited += delay
+            return delay, self._pauses
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        waited = 0.0
+        while True:
+            delay, pauses = self.reserve()
+            if delay > 0:
+                time.sleep(delay)
+            waited += delay
+            # A throttled response while we slept paused everyone: queue up again
+            if pauses == self._pauses:
+                return waited
+
+    async def aacquire(self):
+        """Wait on the event loop until a request may be sent."""
+        import asyncio
+
+        waited = 0.0
+        while True:
+            delay, pauses = self.reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            waited += delay
+            if pauses == self._pauses:
+                return waited
+
+    def succeeded(self):
+        """Raise the rate a little after a successful request, more slowly near the last throttled rate."""
+        with self._lock:
+            step = self.increase
+            if self._throttled_at is not None and self.rate >= 0.8 * self._throttled_at:
+                step /= 10
+            self.rate = min(self.max_rate, self.rate + step)
+
+    def throttled(self, attempt, retry_after=None):
+        """Halve the rate and pause every client after a throttled response.
+
+        Responses throttled during a pause (sent before it began) do not lower the
+        rate again. Returns the pause: Retry-After if the server sent one, otherwise
+        exponential backoff for this attempt, capped at max_backoff.
+        """
+        delay = min(self.max_backoff, retry_after if retry_after is not None else self.backoff * 2 ** attempt)
+        with self._lock:
+            now = time.monotonic()
+            self.throttled_responses += 1
+            if now < self._updated and self._pauses:
+                return self._updated - now
+            self._throttled_at = self.rate
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = 0.0
+            self._updated = now + delay
+            self._pauses += 1
+        return delay
+
+    def get_stats(self):
+        """Return the current rate and the limiter counters."""
+        return {
+            'rate_limit_rate': round(self.rate, 3),
+            'rate_limit_requests': self.requests,
+            'rate_limit_throttled': self.throttled_responses,
+            'rate_limit_wait_seconds': round(self.waited, 3)
+        }
+
+
+def throttle_hint(status, headers):
+    """Return (throttled, Retry-After seconds or None) for an HTTP response."""
+    throttled = status in (429, 503) or headers.get("MediaWiki-API-Error") in THROTTLE_ERRORS
+    return throttled, parse_retry_after(headers.get("Retry-After")) if throttled else None
+
+
+def parse_retry_after(value):
+    """Parse a Retry-After header (seconds or an HTTP date) into seconds, or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+# One limiter for every client in the process unless a client is given its own
+shared_limiter = RateLimiter()
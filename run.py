@@ -2,10 +2,11 @@
 """
 NamiBot Launcher
 Choose between console and GUI versions of NamiBot.
+Each mode runs in this interpreter; its modules are imported only once chosen.
 """
 
+import subprocess
 import sys
-import os
 
 
 def main():
@@ -27,22 +28,25 @@ def main():
             if choice == "1":
                 print("\nStarting Console Version...")
                 print("Ask me about any topic and I'll search Wikipedia documents!")
-                os.system("python namibot.py")
+                from namibot import main as run_console
+                run_console()
                 break
             elif choice == "2":
                 print("\nStarting GUI Version...")
                 print("Opening graphical interface with clickable links!")
-                os.system("python gui_namibot.py")
+                from gui_namibot import main as run_gui
+                run_gui()
                 break
             elif choice == "3":
                 print("\nStarting Test Suite...")
                 print("Running comprehensive tests and demo...")
-                os.system("python test_namibot.py")
+                from test_namibot import main as run_tests
+                run_tests()
                 break
             elif choice == "4":
                 print("\nInstalling Dependencies...")
                 print("This will install the required packages for Wikipedia API access.")
-                os.system("pip install -r requirements.txt")
+                subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
                 print("Dependencies installed! You can now run NamiBot.")
                 break
             elif choice == "5":
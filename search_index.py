@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+NamiBot Local Search Index
+An incremental inverted index with BM25 ranking over every page summary NamiBot
+has fetched, so fuzzy queries can be answered without a network call.
+
+New documents are appended to a small log next to the saved index as they
+arrive; the whole index is only rewritten by save() (at exit), so adding a
+document never pickles the index on the lookup path.
+"""
+
+import atexit
+import json
+import math
+import os
+import pickle
+import re
+import threading
+
+from wiki_cache import DEFAULT_CACHE_DIR
+
+
+INDEX_VERSION = 1
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+STOP_WORDS = {
+    'a', 'an', 'the', 'of', 'in', 'on', 'at', 'to', 'for', 'with', 'by', 'and', 'or',
+    'is', 'are', 'was', 'were', 'be', 'as', 'from', 'that', 'this', 'it', 'its'
+}
+
+
+def tokenize(text):
+    """Split text into lowercase terms, dropping stop words."""
+    return [term for term in TOKEN_RE.findall(text.lower()) if term not in STOP_WORDS]
+
+
+class SearchIndex:
+    """BM25 index over page documents ({'title', 'summary', 'url'})."""
+
+    def __init__(self, path=None, k1=1.2, b=0.75, title_weight=3):
+        self.path = path
+        self.log_path = path + ".log" if path is not None else None
+        self.k1 = k1
+        self.b = b
+        self.title_weight = title_weight
+
+        self.documents = []      # doc id -> document (None once replaced)
+        self.doc_lengths = []    # doc id -> number of weighted terms
+        self.postings = {}       # term -> {doc id: term frequency}
+        self.doc_ids = {}        # title -> doc id
+        self.total_length = 0
+        self._unsaved = 0
+        self._lock = threading.Lock()
+
+        if path is not None:
+            atexit.register(self.save)
+
+    @classmethod
+    def load(cls, path=None, **kwargs):
+        """Load an index from disk, or start an empty one if there is none."""
+        path = path or os.path.join(DEFAULT_CACHE_DIR, "search_index.pickle")
+        index = cls(path, **kwargs)
+        if os.path.exists(path):
+            with open(path, "rb") as index_file:
+                state = pickle.load(index_file)
+            if state.get('version') == INDEX_VERSION:
+                index.documents = state['documents']
+                index.doc_lengths = state['doc_lengths']
+                index.postings = state['postings']
+                index.doc_ids = state['doc_ids']
+                index.total_length = state['total_length']
+        # Documents added since the last save
+        if os.path.exists(index.log_path):
+            with open(index.log_path, encoding="utf-8") as log_file:
+                for line in log_file:
+                    try:
+                        document = json.loads(line)
+                    except ValueError:
+                        break  # a line cut off by a crash
+                    index.add(document, log=False)
+        return index
+
+    def save(self):
+        """Write the whole index to disk and empty the log, if there are unsaved changes."""
+        if self.path is None or not self._unsaved:
+            return
+        with self._lock:
+            state = {
+                'version': INDEX_VERSION,
+                'documents': self.documents,
+                'doc_lengths': self.doc_lengths,
+                'postings': self.postings,
+                'doc_ids': self.doc_ids,
+                'total_length': self.total_length
+            }
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "wb") as index_file:
+                pickle.dump(state, index_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+            if os.path.exists(self.log_path):
+                os.remove(self.log_path)
+            self._unsaved = 0
+
+    def _terms(self, document):
+        """Weighted term frequencies of a document (title terms count extra)."""
+        frequencies = {}
+        for term in tokenize(document['title']):
+            frequencies[term] = frequencies.get(term, 0) + self.title_weight
+        for term in tokenize(document['summary']):
+            frequencies[term] = frequencies.get(term, 0) + 1
+        return frequencies
+
+    def add(self, document, log=True):
+        """Index a document, replacing any earlier version with the same title.
+
+        With a path, the document is also appended to the log so it survives a crash.
+        """
+        document = {'title': document['title'], 'summary': document['summary'], 'url': document['url']}
+        with self._lock:
+            old_id = self.doc_ids.get(document['title'])
+            if old_id is not None:
+                if self.documents[old_id] == document:
+                    return
+                self._remove(old_id)
+
+            doc_id = len(self.documents)
+            frequencies = self._terms(document)
+            self.documents.append(document)
+            self.doc_lengths.append(sum(frequencies.values()))
+            self.total_length += self.doc_lengths[doc_id]
+            self.doc_ids[document['title']] = doc_id
+            for term, frequency in frequencies.items():
+                self.postings.setdefault(term, {})[doc_id] = frequency
+            self._unsaved += 1
+
+            if log and self.log_path is not None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+                with open(self.log_path, "a", encoding="utf-8") as log_file:
+                    log_file.write(json.dumps(document, ensure_ascii=False) + "\n")
+
+    def _remove(self, doc_id):
+        """Drop a document's postings (caller holds the lock)."""
+        for term in self._terms(self.documents[doc_id]):
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self.postings[term]
+        self.total_length -= self.doc_lengths[doc_id]
+        self.doc_lengths[doc_id] = 0
+        del self.doc_ids[self.documents[doc_id]['title']]
+        self.documents[doc_id] = None
+
+    def search(self, query, limit=5):
+        """Return up to limit (score, matched term count, document) tuples, best first."""
+        terms = set(tokenize(query))
+        with self._lock:
+            count = len(self.doc_ids)
+            if not terms or not count:
+                return []
+            average_length = self.total_length / count
+
+            scores = {}
+            matched = {}
+            for term in terms:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, frequency in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+                    matched[doc_id] = matched.get(doc_id, 0) + 1
+
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+            return [(score, matched[doc_id], self.documents[doc_id]) for doc_id, score in ranked]
+
+    def best_match(self, query, min_terms=1):
+        """Return the best document matching every query term, or None.
+
+        Queries with fewer than min_terms terms are not answered, which keeps
+        short, ambiguous queries going to an exact title lookup instead.
+        """
+        terms = set(tokenize(query))
+        if len(terms) < min_terms:
+            return None
+        results = self.search(query, limit=1)
+        if not results:
+            return None
+        _, matched_terms, document = results[0]
+        if matched_terms < len(terms):
+            return None
+        return document
+
+    def __len__(self):
+        return len(self.doc_ids)
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+NamiBot Chat Server
+Hosts many chat sessions in one process on top of a shared NamiBotEngine,
+over plain HTTP (JSON) and WebSocket. Requires aiohttp.
+
+Endpoints:
+  POST   /sessions                         {"language": ...} (optional, a served language) -> {"session_id": ...}
+  POST   /sessions/{session_id}/messages   {"message": ...} -> {"response": ...}
+  DELETE /sessions/{session_id}
+  GET    /sessions/{session_id}/snapshot   -> binary session snapshot (without cached pages)
+  PUT    /sessions/{session_id}            binary session snapshot -> {"session_id": ...}
+  GET    /ws                            WebSocket, one session per connection
+  GET    /stats                         Engine and session statistics
+  GET    /metrics                       Prometheus text-format metrics
+"""
+
+import argparse
+import asyncio
+import re
+import struct
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+
+from namibot import NamiBot, NamiBotEngine
+
+# Session ids as created by SessionManager.create
+SESSION_ID = re.compile(r"[0-9a-f]{32}")
+
+
+class SessionManager:
+    """Lightweight per-user NamiBot sessions sharing one engine, with idle eviction.
+
+    Sessions may use the engine's language, its fallback languages and any
+    extra languages given; each language keeps an engine alive, so clients
+    cannot choose others.
+    """
+
+    def __init__(self, engine, bot_name="NamiBot", idle_timeout=15 * 60, max_sessions=10000, languages=(),
+                 history_limit=1000, max_snapshot_bytes=4 * 1024 * 1024):
+        self.engine = engine
+        self.history_limit = history_limit            # turns kept per session, also for restored ones
+        self.max_snapshot_bytes = max_snapshot_bytes  # size of a restored snapshot, sent and inflated
+        self.languages = frozenset(languages) | {engine.language, *engine.fallback_languages}
+        self.bot_name = bot_name
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()  # session id -> (bot, last active), least recently used first
+        self.messages_handled = 0
+        self.evicted = 0
+
+    def create(self, language=None):
+        """Create a new session, optionally in another served language than the engine's, and return its id."""
+        if language is not None and language not in self.languages:
+            raise ValueError(f"language must be one of {', '.join(sorted(self.languages))}")
+        session_id = uuid.uuid4().hex
+        bot = NamiBot(self.bot_name, language=language, engine=self.engine, history_limit=self.history_limit)
+        self.sessions[session_id] = (bot, time.monotonic())
+        while len(self.sessions) > self.max_sessions:
+            self.sessions.popitem(last=False)
+            self.evicted += 1
+        return session_id
+
+    def get(self, session_id):
+        """Return the bot of a session (marking it active), or None."""
+        entry = self.sessions.get(session_id)
+        if entry is None:
+            return None
+        self.sessions[session_id] = (entry[0], time.monotonic())
+        self.sessions.move_to_end(session_id)
+        return entry[0]
+
+    def snapshot(self, session_id):
+        """Return a session as snapshot bytes (see session_snapshot.py), or None if it does not exist.
+
+        Cached pages are shared by all sessions, so they are never included.
+        """
+        bot = self.get(session_id)
+        return bot.snapshot() if bot is not None else None
+
+    def restore(self, session_id, data):
+        """Add (or replace) a session from snapshot bytes, e.g. one moved from another worker.
+
+        Snapshots carrying cached pages are rejected, so clients cannot write to the shared cache,
+        and so are snapshots beyond this manager's languages, history limit or snapshot size.
+        """
+        bot = NamiBot.restore(data, engine=self.engine, warm_cache=False, languages=self.languages,
+                              max_turns=self.history_limit, max_bytes=self.max_snapshot_bytes)
+        self.sessions[session_id] = (bot, time.monotonic())
+        self.sessions.move_to_end(session_id)
+        while len(self.sessions) > self.max_sessions:
+            self.sessions.popitem(last=False)
+            self.evicted += 1
+        return session_id
+
+    def close(self, session_id):
+        """End a session."""
+        return self.sessions.pop(session_id, None) is not None
+
+    def evict_idle(self):
+        """Drop sessions that have been idle longer than idle_timeout."""
+        cutoff = time.monotonic() - self.idle_timeout
+        evicted = 0
+        while self.sessions:
+            session_id, (_, last_active) = next(iter(self.sessions.items()))
+            if last_active > cutoff:
+                break
+            del self.sessions[session_id]
+            evicted += 1
+        self.evicted += evicted
+        return evicted
+
+    async def handle(self, session_id, message):
+        """Answer a message in a session. Returns None if the session does not exist."""
+        bot = self.get(session_id)
+        if bot is None:
+            return None
+        self.messages_handled += 1
+        return await bot.aget_response(message)
+
+    def get_stats(self):
+        """Get server statistics."""
+        stats = {
+            'active_sessions': len(self.sessions),
+            'evicted_sessions': self.evicted,
+            'messages_handled': self.messages_handled
+        }
+        stats.update(self.engine.get_stats())
+        return stats
+
+    def to_prometheus(self):
+        """Engine metrics plus session gauges in the Prometheus text format."""
+        prefix = self.engine.metrics.prefix
+        return self.engine.metrics.to_prometheus() + "\n".join([
+            f"# TYPE {prefix}_active_sessions gauge",
+            f"{prefix}_active_sessions {len(self.sessions)}",
+            f"# TYPE {prefix}_evicted_sessions_total counter",
+            f"{prefix}_evicted_sessions_total {self.evicted}",
+            f"# TYPE {prefix}_messages_handled_total counter",
+            f"{prefix}_messages_handled_total {self.messages_handled}"
+        ]) + "\n"
+
+
+def create_app(manager, sweep_interval=60):
+    """Build the aiohttp application serving a SessionManager."""
+    from aiohttp import web, WSMsgType
+    from wiki_api import close_async_session
+
+    async def json_object(request):
+        """The request body as a JSON object ({} if empty); 400 if it is anything else."""
+        if not request.can_read_body:
+            return {}
+        try:
+            data = await request.json()
+        except ValueError:
+            raise web.HTTPBadRequest(text="body must be JSON")
+        if not isinstance(data, dict):
+            raise web.HTTPBadRequest(text="body must be a JSON object")
+        return data
+
+    async def create_session(request):
+        data = await json_object(request)
+        try:
+            session_id = manager.create(data.get('language'))
+        except (TypeError, ValueError) as e:
+            raise web.HTTPBadRequest(text=str(e))
+        return web.json_response({'session_id': session_id})
+
+    async def post_message(request):
+        data = await json_object(request)
+        message = str(data.get('message', '')).strip()
+        if not message:
+            raise web.HTTPBadRequest(text="message is required")
+        response = await manager.handle(request.match_info['session_id'], message)
+        if response is None:
+            raise web.HTTPNotFound(text="unknown or expired session")
+        return web.json_response({'response': response})
+
+    async def delete_session(request):
+        if not manager.close(request.match_info['session_id']):
+            raise web.HTTPNotFound(text="unknown or expired session")
+        return web.json_response({'closed': True})
+
+    async def get_snapshot(request):
+        data = manager.snapshot(request.match_info['session_id'])
+        if data is None:
+            raise web.HTTPNotFound(text="unknown or expired session")
+        return web.Response(body=data, content_type="application/octet-stream")
+
+    async def put_session(request):
+        session_id = request.match_info['session_id']
+        if not SESSION_ID.fullmatch(session_id):
+            raise web.HTTPBadRequest(text="session_id must be 32 hex digits")
+        # Read the body with its own size limit rather than aiohttp's app-wide one
+        limit = manager.max_snapshot_bytes
+        if request.content_length is not None and request.content_length > limit:
+            raise web.HTTPRequestEntityTooLarge(max_size=limit, actual_size=request.content_length)
+        body = bytearray()
+        async for chunk in request.content.iter_chunked(64 * 1024):
+            body += chunk
+            if len(body) > limit:
+                raise web.HTTPRequestEntityTooLarge(max_size=limit, actual_size=len(body))
+        try:
+            manager.restore(session_id, bytes(body))
+        except (ValueError, IndexError, struct.error, zlib.error) as e:
+            raise web.HTTPBadRequest(text=f"invalid session snapshot: {e}")
+        return web.json_response({'session_id': session_id})
+
+    async def websocket(request):
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        session_id = manager.create()
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT or not msg.data.strip():
+                    continue
+                response = await manager.handle(session_id, msg.data.strip())
+                if response is None:
+                    await ws.close(message=b"session expired")
+                    break
+                await ws.send_str(response)
+        finally:
+            manager.close(session_id)
+        return ws
+
+    async def stats(request):
+        return web.json_response(manager.get_stats())
+
+    async def metrics(request):
+        return web.Response(text=manager.to_prometheus(),
+                            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+    async def sweep_idle_sessions(app):
+        async def sweep():
+            while True:
+                await asyncio.sleep(sweep_interval)
+                manager.evict_idle()
+
+        task = asyncio.create_task(sweep())
+        yield
+        task.cancel()
+
+    app = web.Application()
+    app.router.add_post('/sessions', create_session)
+    app.router.add_post('/sessions/{session_id}/messages', post_message)
+    app.router.add_delete('/sessions/{session_id}', delete_session)
+    app.router.add_get('/sessions/{session_id}/snapshot', get_snapshot)
+    app.router.add_put('/sessions/{session_id}', put_session)
+    app.router.add_get('/ws', websocket)
+    app.router.add_get('/stats', stats)
+    app.router.add_get('/metrics', metrics)
+    app.cleanup_ctx.append(sweep_idle_sessions)
+    app.on_cleanup.append(lambda app: close_async_session())
+    return app
+
+
+def main():
+    """Run the NamiBot chat server."""
+    from aiohttp import web
+
+    parser = argparse.ArgumentParser(description="NamiBot multi-session chat server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--idle-timeout", type=float, default=15 * 60, help="seconds before an idle session is evicted")
+    parser.add_argument("--max-sessions", type=int, default=10000)
+    parser.add_argument("--history-limit", type=int, default=1000, help="turns kept per session")
+    parser.add_argument("--prefetch", action="store_true", help="prefetch pages linked from each answer")
+    parser.add_argument("--fallback-languages", default="",
+                        help="comma-separated languages searched in parallel, e.g. de,fr")
+    parser.add_argument("--languages", default="",
+                        help="comma-separated extra languages sessions may choose (the engine's language "
+                             "and fallback languages are always allowed)")
+    args = parser.parse_args()
+
+    fallback_languages = [language.strip() for language in args.fallback_languages.split(",") if language.strip()]
+    languages = [language.strip() for language in args.languages.split(",") if language.strip()]
+    engine = NamiBotEngine(language=args.language, prefetch=args.prefetch, fallback_languages=fallback_languages)
+    manager = SessionManager(engine, idle_timeout=args.idle_timeout, max_sessions=args.max_sessions,
+                             languages=languages, history_limit=args.history_limit)
+    print(f"🌐 NamiBot server listening on http://{args.host}:{args.port}")
+    web.run_app(create_app(manager), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+NamiBot Session Snapshots
+Saves a NamiBot session (user name, search count and conversation history) and
+optionally the hottest pages of the shared page cache in a compact, versioned
+binary format, so a session survives a worker restart or moves to another
+worker process.
+
+Layout: an 8-byte header (magic, format version, flags) followed by the body,
+zlib-compressed when FLAG_COMPRESSED is set. The body holds the session fields,
+then the turns and the pages, each as a count followed by fixed-size records
+and length-prefixed UTF-8 strings. Both directions stream through small
+buffers, so large sessions are never held as one Python object tree.
+
+Only the turns held in memory are saved; turns spilled to disk stay in the
+spill file of the original session, and restored sessions do not spill.
+"""
+
+import struct
+import zlib
+
+from wiki_api import LANGUAGE_CODE
+
+
+MAGIC = b"NBSN"
+FORMAT_VERSION = 2
+FLAG_COMPRESSED = 1
+HEADER = struct.Struct("<4sHH")        # magic, version, flags
+SESSION = struct.Struct("<QI")         # search count, history limit (0 for none)
+TURN = struct.Struct("<BdI")           # role, timestamp, text bytes
+COUNT = struct.Struct("<I")
+STRING = struct.Struct("<I")
+PAGE_TIME = struct.Struct("<d")
+ROLES = ("user", "bot")
+CHUNK_SIZE = 64 * 1024
+MAX_STRING_BYTES = 1 << 20             # names, languages, turn texts and page fields
+
+
+class _Writer:
+    """Buffers records and writes them to a stream, compressing on the way if asked."""
+
+    def __init__(self, stream, compress):
+        self.stream = stream
+        self.compressor = zlib.compressobj(1) if compress else None
+        self.buffer = bytearray()
+
+    def write(self, data):
+        self.buffer += data
+        if len(self.buffer) >= CHUNK_SIZE:
+            self.flush()
+
+    def string(self, text):
+        data = text.encode("utf-8")
+        self.write(STRING.pack(len(data)))
+        self.write(data)
+
+    def flush(self, final=False):
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        if self.compressor is not None:
+            data = self.compressor.compress(data)
+            if final:
+                data += self.compressor.flush()
+        if data:
+            self.stream.write(data)
+
+
+class _Reader:
+    """Reads exact byte counts from a stream, decompressing chunk by chunk if needed.
+
+    At most max_bytes of body (after decompression) are read, if given.
+    """
+
+    def __init__(self, stream, compressed, max_bytes=None):
+        self.stream = stream
+        self.decompressor = zlib.decompressobj() if compressed else None
+        self.max_bytes = max_bytes
+        self.total = 0
+        self.buffer = b""
+        self.position = 0
+
+    def _next_chunk(self):
+        """Up to CHUNK_SIZE more bytes of body; b"" at the end of the stream."""
+        if self.decompressor is None:
+            chunk = self.stream.read(CHUNK_SIZE)
+        else:
+            # Inflate at most one chunk at a time, so a small body cannot expand unchecked
+            chunk = b""
+            while not chunk and not self.decompressor.eof:
+                raw = self.decompressor.unconsumed_tail or self.stream.read(CHUNK_SIZE)
+                if not raw:
+                    break
+                chunk = self.decompressor.decompress(raw, CHUNK_SIZE)
+        self.total += len(chunk)
+        if self.max_bytes is not None and self.total > self.max_bytes:
+            raise ValueError(f"Session snapshot is larger than {self.max_bytes} bytes")
+        return chunk
+
+    def read(self, size):
+        while len(self.buffer) - self.position < size:
+            chunk = self._next_chunk()
+            if not chunk:
+                raise ValueError("Truncated session snapshot")
+            self.buffer = self.buffer[self.position:] + chunk
+            self.position = 0
+        data = self.buffer[self.position:self.position + size]
+        self.position += size
+        return data
+
+    def finish(self):
+        """Check that a compressed body is complete, up to and including its checksum."""
+        while self.decompressor is not None and not self.decompressor.eof:
+            if not self._next_chunk() and not self.decompressor.eof:
+                raise ValueError("Truncated session snapshot")
+
+    def unpack(self, record):
+        return record.unpack(self.read(record.size))
+
+    def string(self):
+        (size,) = self.unpack(STRING)
+        if size > MAX_STRING_BYTES:
+            raise ValueError(f"Session snapshot holds a string of {size} bytes (at most {MAX_STRING_BYTES})")
+        return str(self.read(size), "utf-8")
+
+
+def write_snapshot(bot, stream, pages=0, compress=True):
+    """Write a session, and up to pages of the most recently used cached pages, to a binary stream."""
+    history = bot.conversation_history
+    stream.write(HEADER.pack(MAGIC, FORMAT_VERSION, FLAG_COMPRESSED if compress else 0))
+    writer = _Writer(stream, compress)
+    writer.string(bot.name)
+    writer.string(bot.user_name)
+    writer.string(bot.language)
+    writer.write(SESSION.pack(bot.search_count, history.max_turns or 0))
+
+    turns = history.recent()
+    writer.write(COUNT.pack(len(turns)))
+    for turn in turns:
+        text = turn.text.encode("utf-8")
+        writer.write(TURN.pack(ROLES.index(turn.role), turn.timestamp, len(text)))
+        writer.write(text)
+
+    cache = bot.engine.cache
+    hot = cache.hot(pages) if pages and cache is not None else []
+    writer.write(COUNT.pack(len(hot)))
+    for key, stored_at, page in hot:
+        writer.write(PAGE_TIME.pack(stored_at))
+        for text in (key, page['title'], page['summary'], page['url']):
+            writer.string(text)
+    writer.flush(final=True)
+
+
+def read_snapshot(stream, engine, bot_class, warm_cache=True, languages=None, max_turns=None, max_bytes=None):
+    """Rebuild a session from a binary stream on an engine, warming its page cache with the saved pages.
+
+    For snapshots from untrusted sources: with warm_cache=False a snapshot
+    holding pages is rejected, with languages one in a language not listed,
+    with max_turns one holding more turns (the session gets this history limit
+    instead of the saved one) and with max_bytes one whose body inflates to
+    more bytes. Raises ValueError for anything that is not a valid (or
+    accepted) snapshot.
+    """
+    header = stream.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError("Not a NamiBot session snapshot")
+    magic, version, flags = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError("Not a NamiBot session snapshot")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported session snapshot version {version} (expected {FORMAT_VERSION})")
+    reader = _Reader(stream, flags & FLAG_COMPRESSED, max_bytes)
+    name = reader.string()
+    user_name = reader.string()
+    language = reader.string()
+    if not LANGUAGE_CODE.fullmatch(language):
+        raise ValueError(f"Invalid language in session snapshot: {language!r}")
+    if languages is not None and language not in languages:
+        raise ValueError(f"Session snapshot language {language!r} is not served here")
+    search_count, saved_max_turns = reader.unpack(SESSION)
+    (turn_count,) = reader.unpack(COUNT)
+    if max_turns is not None and turn_count > max_turns:
+        raise ValueError(f"Session snapshot holds {turn_count} turns (at most {max_turns})")
+
+    history_limit = max_turns if max_turns is not None else saved_max_turns or None
+    bot = bot_class(name, language=language, engine=engine, history_limit=history_limit)
+    bot.user_name = user_name
+    bot.search_count = search_count
+    history = bot.conversation_history
+    for _ in range(turn_count):
+        role, timestamp, size = reader.unpack(TURN)
+        if role >= len(ROLES):
+            raise ValueError(f"Invalid turn role in session snapshot: {role}")
+        if size > MAX_STRING_BYTES:
+            raise ValueError(f"Session snapshot holds a turn of {size} bytes (at most {MAX_STRING_BYTES})")
+        history.append(ROLES[role], str(reader.read(size), "utf-8"), timestamp)
+
+    (page_count,) = reader.unpack(COUNT)
+    if page_count and not warm_cache:
+        raise ValueError("Session snapshot holds cached pages, which are not accepted here")
+    cache = bot.engine.cache
+    for _ in range(page_count):
+        (stored_at,) = reader.unpack(PAGE_TIME)
+        key, title, summary, url = (reader.string() for _ in range(4))
+        if cache is not None:
+            cache.warm(key, {'title': title, 'summary': summary, 'url': url}, stored_at)
+    reader.finish()
+    return bot
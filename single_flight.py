@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+NamiBot Request Coalescing
+Concurrent calls with the same key share one execution: the first caller runs
+the function and everyone else waiting on that key gets its result (or error).
+Works for threads (do) and for coroutines on an event loop (ado).
+"""
+
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls by key."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> concurrent.futures.Future of the running call
+        self._tasks = {}  # (event loop, key) -> asyncio task of the running call
+        self.shared = 0   # calls answered by another caller's execution
+
+    def do(self, key, function, *args):
+        """Call function(*args), or wait for the identical call already running."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+            else:
+                self.shared += 1
+        if not leader:
+            return call.result()
+
+        try:
+            result = function(*args)
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    async def ado(self, key, coroutine_function, *args):
+        """Await coroutine_function(*args), or the identical call already running on this loop.
+
+        The call runs as its own task, so a cancelled caller does not cancel it
+        for the others.
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        task_key = (loop, key)
+        task = self._tasks.get(task_key)
+        if task is None:
+            task = self._tasks[task_key] = loop.create_task(coroutine_function(*args))
+            task.add_done_callback(lambda done: self._finish_task(task_key, done))
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _finish_task(self, task_key, task):
+        """Forget a finished task; mark its error as seen in case every caller was cancelled."""
+        self._tasks.pop(task_key, None)
+        if not task.cancelled():
+            task.exception()
+
+    def __len__(self):
+        return len(self._calls) + len(self._tasks)
@@ -4,8 +4,34 @@ Test script for NamiBot
 Demonstrates various Wikipedia document search functionalities and tests responses.
 """
 
-from namibot import NamiBot
+from namibot import NamiBot, NamiBotEngine
+from wiki_api import WikiClient, pick_first_existing
+from wiki_dump import DumpBackend
+import wiki_dump
+from search_index import SearchIndex
+from intent_router import IntentRouter
+from conversation_history import ConversationHistory
+from metrics import Histogram, Metrics
+from single_flight import SingleFlight
+from prefetch import Prefetcher, rank_links
+from rate_limit import RateLimiter, parse_retry_after, throttle_hint
+from wiki_cache import PageCache, MemoryCache, SQLiteCache, NegativeCache, AliasMap
+from chat_links import split_links
+from batch import read_questions, run_batch
+from title_suggest import TitleSuggester, edit_distance
+from session_snapshot import COUNT, TURN
+import asyncio
+import bz2
+import io
+import json
+import os
+import random
+import re
+import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 
 
 def test_namibot_searches():
@@ -73,7 +99,7 @@ def test_namibot_searches():
     print("\n🗑️ Clearing conversation history...")
     result = namibot.clear_history()
     print(f"Result: {result}")
-    print(f"History length after clearing: {len(namibot.get_conversation_history())}")
+    print(f"History length after clearing: {len(list(namibot.get_conversation_history()))}")
 
 
 def test_basic_conversation():
@@ -146,6 +172,958 @@ def test_research_commands():
         print("-" * 30)
 
 
+def test_page_cache():
+    """Test the memory and SQLite page cache tiers without network access."""
+    print("\n💾 Testing Page Cache")
+    print("=" * 40)
+    
+    page = {'title': 'Albert Einstein', 'summary': 'Physicist.', 'url': 'https://en.wikipedia.org/wiki/Albert_Einstein'}
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "pages.sqlite3")
+        cache = PageCache([MemoryCache(max_entries=2), SQLiteCache(path)])
+        assert cache.get("en", "albert einstein") is None
+        cache.put("en", "albert einstein", page)
+        assert cache.get("en", "albert einstein") == page
+        assert cache.get("en", "Albert_Einstein") == page
+        assert cache.get_stats()['cache_hits'] == 2
+        assert cache.get_stats()['cache_misses'] == 1
+        # Probing changes neither the counters nor when a row was last accessed
+        accessed = cache.tiers[1]._conn.execute("SELECT key, accessed_at FROM pages").fetchall()
+        assert cache.contains("en", "Albert Einstein") and not cache.contains("en", "Isaac Newton")
+        assert cache.tiers[1]._conn.execute("SELECT key, accessed_at FROM pages").fetchall() == accessed
+        assert cache.get_stats()['cache_hits'] == 2 and cache.get_stats()['cache_misses'] == 1
+        cache.tiers[1].close()
+        
+        # A fresh cache over the same file still has the page
+        restarted = PageCache([MemoryCache(), SQLiteCache(path)])
+        assert restarted.get("en", "albert einstein") == page
+        assert len(restarted.tiers[0]) == 1
+        restarted.tiers[1].close()
+    
+    # Size and TTL eviction in the memory tier
+    lru = MemoryCache(max_entries=2, ttl=None)
+    for key in ("a", "b", "c"):
+        lru.put(key, key)
+    assert lru.get("a") is None and lru.get("c") == "c"
+    probed = MemoryCache(max_entries=2, ttl=None)
+    probed.put("a", "a")
+    probed.put("b", "b")
+    assert probed.peek("a") and not probed.peek("z")
+    probed.put("c", "c")
+    assert probed.get("a") is None and probed.get("b") == "b"  # peeking did not save "a" from eviction
+    expiring = MemoryCache(ttl=10)
+    expiring.put("old", "value", stored_at=time.time() - 60)
+    assert not expiring.peek("old") and expiring.get("old") is None
+    
+    # Failed lookups are remembered until their TTL runs out
+    negative = NegativeCache(ttl=300)
+    negative.add("en", "Albert Einstien")
+    assert negative.contains("en", "albert_einstien") is False
+    assert negative.contains("en", "Albert_Einstien") is True
+    assert negative.contains("fr", "Albert Einstien") is False
+    print("Page cache tests passed!")
+
+
+def test_batched_title_resolution():
+    """Test picking the first existing page from a batched MediaWiki response."""
+    print("\n📦 Testing Batched Title Resolution")
+    print("=" * 40)
+    
+    result = {
+        'normalized': [{'from': 'albert einstein', 'to': 'Albert einstein'}],
+        'redirects': [{'from': 'Albert einstein', 'to': 'Albert Einstein'}],
+        'pages': [
+            {'title': 'Albert Einstein', 'pageid': 736, 'extract': 'Physicist.',
+             'fullurl': 'https://en.wikipedia.org/wiki/Albert_Einstein'},
+            {'title': 'Albert Einstein (film)', 'missing': True},
+        ]
+    }
+    page = pick_first_existing(['Albert Einstein (film)', 'albert einstein'], result)
+    assert page['title'] == 'Albert Einstein'
+    assert page['requested'] == 'albert einstein'
+    assert page['url'] == 'https://en.wikipedia.org/wiki/Albert_Einstein'
+    assert pick_first_existing(['Albert Einstein (film)'], result) is None
+    print("Batched title resolution tests passed!")
+
+
+def _dump_page(title, text="", redirect=None):
+    """Build one <page> element of a pages-articles dump."""
+    redirect_tag = f'<redirect title="{redirect}" />' if redirect else ""
+    return (f"<page><title>{title}</title><ns>0</ns>{redirect_tag}"
+            f"<revision><text xml:space=\"preserve\">{text}</text></revision></page>\n")
+
+
+def test_offline_dump_backend():
+    """Test the offline dump backend on small plain and multistream dumps."""
+    print("\n🗄️ Testing Offline Dump Backend")
+    print("=" * 40)
+
+    pages = [
+        _dump_page("Albert Einstein",
+                   "{{Infobox scientist|name=Einstein}}'''Albert Einstein''' was a "
+                   "[[Germany|German]]-born [[physicist]].&lt;ref&gt;Cite&lt;/ref&gt;\n== Life ==\nBorn in Ulm."),
+        _dump_page("Einstein", redirect="Albert Einstein"),
+        _dump_page("Marie Curie", "'''Marie Curie''' was a chemist."),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        plain_path = os.path.join(tmp, "pages-articles.xml")
+        with open(plain_path, "w", encoding="utf-8") as dump_file:
+            dump_file.write("<mediawiki>\n" + "".join(pages) + "</mediawiki>\n")
+
+        multistream_path = os.path.join(tmp, "pages-articles-multistream.xml.bz2")
+        with open(multistream_path, "wb") as dump_file:
+            dump_file.write(bz2.compress(b"<mediawiki>\n"))
+            dump_file.write(bz2.compress("".join(pages[:2]).encode("utf-8")))
+            dump_file.write(bz2.compress(pages[2].encode("utf-8")))
+            dump_file.write(bz2.compress(b"</mediawiki>\n"))
+
+        for path in (plain_path, multistream_path):
+            backend = DumpBackend(path)
+            page = backend.resolve_titles(["einstein", "Einstein"])
+            assert page['title'] == "Albert Einstein"
+            assert page['requested'] == "einstein"
+            assert page['summary'] == "Albert Einstein was a German-born physicist."
+            assert page['url'] == "https://en.wikipedia.org/wiki/Albert_Einstein"
+            assert backend.resolve_titles(["Marie_Curie"])['summary'] == "Marie Curie was a chemist."
+            assert backend.resolve_titles(["Isaac Newton"]) is None
+            backend.close()
+
+        # Batch workers share one backend; with a one-stream cache every lookup evicts another
+        backend = DumpBackend(multistream_path)
+        block_cache_size, wiki_dump.BLOCK_CACHE_SIZE = wiki_dump.BLOCK_CACHE_SIZE, 1
+        try:
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                titles = list(pool.map(lambda i: backend.get_page(("Einstein", "Marie Curie")[i % 2])['title'],
+                                       range(400)))
+        finally:
+            wiki_dump.BLOCK_CACHE_SIZE = block_cache_size
+            backend.close()
+        assert titles == ["Albert Einstein", "Marie Curie"] * 200
+    print("Offline dump backend tests passed!")
+
+
+def test_local_search_index():
+    """Test BM25 ranking, incremental updates and persistence of the local index."""
+    print("\n🔎 Testing Local Search Index")
+    print("=" * 40)
+
+    documents = [
+        {'title': 'Albert Einstein', 'url': 'https://en.wikipedia.org/wiki/Albert_Einstein',
+         'summary': 'Albert Einstein was a physicist who developed the theory of relativity.'},
+        {'title': 'Theory of relativity', 'url': 'https://en.wikipedia.org/wiki/Theory_of_relativity',
+         'summary': 'The theory of relativity comprises special relativity and general relativity.'},
+        {'title': 'Marie Curie', 'url': 'https://en.wikipedia.org/wiki/Marie_Curie',
+         'summary': 'Marie Curie was a physicist and chemist who researched radioactivity.'},
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "search_index.pickle")
+        index = SearchIndex(path)
+        for document in documents:
+            index.add(document)
+
+        assert index.best_match("theory of relativity einstein")['title'] == 'Albert Einstein'
+        assert index.best_match("relativity")['title'] == 'Theory of relativity'
+        assert index.best_match("curie radioactivity")['title'] == 'Marie Curie'
+        assert index.best_match("einstein radioactivity") is None
+        assert index.best_match("relativity", min_terms=2) is None
+
+        # Re-adding a page replaces its old postings
+        index.add(dict(documents[2], summary='Marie Curie was a Polish chemist.'))
+        assert index.best_match("curie radioactivity") is None
+        assert len(index) == 3
+
+        # Added pages survive without a save, through the log
+        assert len(SearchIndex.load(path)) == 3 and not os.path.exists(path)
+        index.save()
+        assert not os.path.exists(index.log_path)
+        reloaded = SearchIndex.load(path)
+        assert len(reloaded) == 3
+        assert reloaded.best_match("polish chemist")['title'] == 'Marie Curie'
+
+    # A page with exactly the asked title wins over a local document mentioning its words
+    index = SearchIndex()
+    index.add({'title': 'Theory of relativity', 'url': documents[1]['url'],
+               'summary': 'Albert Einstein developed the theory of relativity.'})
+    engine = NamiBotEngine(cache=False, negative_cache=False, aliases=False, title_suggester=False,
+                           search_index=index)
+    engine.wiki.resolve_titles = lambda candidates: dict(documents[0], requested=candidates[0])
+    assert engine.lookup("albert einstein")[0]['title'] == 'Albert Einstein'
+    # Without such a page, the local document still answers
+    engine.wiki.resolve_titles = lambda candidates: None
+    assert engine.lookup("einstein relativity")[0]['title'] == 'Theory of relativity'
+    print("Local search index tests passed!")
+
+
+def test_intent_router():
+    """Test that the compiled router keeps the sequential matching priority."""
+    print("\n🧭 Testing Intent Router")
+    print("=" * 40)
+
+    intents = [r'\b(hi|hello|hey|greetings)\b', r'\b(thank you|thanks)\b', r'\b(what date|today|date)\b', r'wiki+']
+    router = IntentRouter(NamiBot.search_patterns, intents)
+
+    assert router.classify("my name is alice") == ('name', 'alice')
+    assert router.classify("hello, tell me about albert einstein?") == ('search', 'albert einstein')
+    assert router.classify("python on wikipedia") == ('search', 'python')
+    assert router.classify("research tell me about ?") == ('search', 'tell me about')
+    assert router.classify("thanks, hello") == ('intent', intents[0])
+    assert router.classify("thank you for today") == ('intent', intents[1])
+    assert router.classify("wikiii") == ('intent', 'wiki+')
+    assert router.classify("i like turtles") == (None, None)
+    assert IntentRouter.for_patterns(NamiBot.search_patterns, intents) is IntentRouter.for_patterns(NamiBot.search_patterns, intents)
+
+    # Sessions reuse their class's router; a subclass with its own patterns gets its own
+    assert NamiBot.intent_router() is NamiBot.intent_router()
+    bot_class = type("TurtleBot", (NamiBot,), {'patterns': {r'\b(turtles?)\b': ("Turtles!",)}})
+    assert bot_class.intent_router() is not NamiBot.intent_router()
+    assert bot_class(engine=NamiBotEngine(cache=False, negative_cache=False, aliases=False, search_index=False,
+                                          title_suggester=False)).get_response("i like turtles") == "Turtles!"
+    bot_class.patterns[r'\b(frogs?)\b'] = ("Frogs!",)
+    assert bot_class.intent_router().classify("frogs") == ('intent', r'\b(frogs?)\b')
+    print("Intent router tests passed!")
+
+
+def test_conversation_history():
+    """Test the bounded history buffer and its spill file."""
+    print("\n🗂️ Testing Conversation History")
+    print("=" * 40)
+
+    bounded = ConversationHistory(max_turns=3)
+    for i in range(5):
+        bounded.append("user", f"message {i}")
+    assert [entry['user'] for entry in bounded] == ["message 2", "message 3", "message 4"]
+    assert len(bounded) == 3
+
+    with tempfile.TemporaryDirectory() as tmp:
+        spilling = ConversationHistory(max_turns=2, spill_path=os.path.join(tmp, "history.jsonl"))
+        spilling.append("user", "Hello", timestamp=1700000000.0)
+        spilling.append("bot", "Hi there!")
+        spilling.append("user", "Who is Marie Curie?")
+        entries = list(spilling)
+        assert len(spilling) == 3 and len(spilling.recent()) == 2
+        assert entries[0] == {'user': 'Hello', 'timestamp': datetime.fromtimestamp(1700000000.0)}
+        assert [entry.get('bot') for entry in entries] == [None, "Hi there!", None]
+        # Two live conversations never share a spill file
+        try:
+            ConversationHistory(max_turns=1, spill_path=spilling.spill_path)
+            assert False, "a spill file in use was shared"
+        except ValueError:
+            pass
+        # After a restart the spilled turns are kept and appended to
+        spill_path = spilling.spill_path
+        del spilling, entries
+        restarted = ConversationHistory(max_turns=1, spill_path=spill_path)
+        restarted.append("user", "First")
+        restarted.append("user", "Second")
+        assert len(restarted) == 3 and [entry['user'] for entry in restarted] == ["Hello", "First", "Second"]
+        restarted.clear()
+        assert len(restarted) == 0 and list(restarted) == [] and not os.path.exists(spill_path)
+
+    try:
+        ConversationHistory(max_turns=0)
+        assert False, "a history without room for a turn was created"
+    except ValueError:
+        pass
+    print("Conversation history tests passed!")
+
+
+def test_metrics():
+    """Test the latency histograms, Prometheus output and per-stage timings."""
+    print("\n⏱️ Testing Metrics")
+    print("=" * 40)
+
+    histogram = Histogram(buckets=(0.001, 0.01, 0.1))
+    for value in [0.0005] * 90 + [0.05] * 10:
+        histogram.observe(value)
+    assert histogram.quantile(0.5) <= 0.001
+    assert 0.01 < histogram.quantile(0.99) <= 0.1
+
+    metrics = Metrics()
+    metrics.increment("api_requests", 2)
+    with metrics.timer("title_resolution"):
+        pass
+    text = metrics.to_prometheus()
+    assert "namibot_api_requests_total 2" in text
+    assert 'namibot_title_resolution_seconds_bucket{le="+Inf"} 1' in text
+
+    # A cached lookup goes through routing and the cache without any API request
+    cache = PageCache([MemoryCache()])
+    cache.put("en", "albert einstein", {'title': 'Albert Einstein', 'summary': 'Physicist.',
+                                         'url': 'https://en.wikipedia.org/wiki/Albert_Einstein'})
+    namibot = NamiBot("MetricsBot", engine=NamiBotEngine(cache=cache, aliases=False, search_index=False,
+                                                         title_suggester=False))
+    namibot.get_response("Tell me about Albert Einstein")
+    namibot.get_response("Hello")
+    stats = namibot.get_stats()['metrics']
+    assert stats['turn']['count'] == 2 and stats['intent_matching']['count'] == 2
+    assert stats['cache_lookup']['count'] == 1 and 'title_resolution' not in stats
+    assert stats['api_requests_per_search']['p99'] == 0
+    assert namibot.engine._wiki is None  # the HTTP client is only created for a network search
+    print("Metrics tests passed!")
+
+
+def test_single_flight():
+    """Test that concurrent identical calls share one execution."""
+    print("\n🛫 Testing Request Coalescing")
+    print("=" * 40)
+
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def fetch(topic):
+        calls.append(topic)
+        release.wait(5)
+        return topic.title()
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        futures = [pool.submit(flight.do, "en:marie curie", fetch, "marie curie") for _ in range(5)]
+        while flight.shared < 4:
+            time.sleep(0.01)
+        release.set()
+        assert [future.result() for future in futures] == ["Marie Curie"] * 5
+    assert calls == ["marie curie"] and len(flight) == 0
+
+    async def afetch(topic):
+        calls.append(topic)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream error")
+
+    async def fetch_concurrently():
+        return await asyncio.gather(*(flight.ado("en:python", afetch, "python") for _ in range(3)),
+                                    return_exceptions=True)
+
+    errors = asyncio.run(fetch_concurrently())
+    assert calls.count("python") == 1 and all(isinstance(error, RuntimeError) for error in errors)
+    assert flight.shared == 6 and len(flight) == 0
+    print("Request coalescing tests passed!")
+
+
+class FakeLinkClient:
+    """Stands in for WikiClient in the prefetch test."""
+
+    def __init__(self, links, pages):
+        self.links = links
+        self.pages = pages
+
+    def linked_titles(self, title):
+        return self.links[title]
+
+    def resolve_all(self, titles):
+        return [{'title': title, 'summary': self.pages[title], 'requested': title,
+                 'url': 'https://en.wikipedia.org/wiki/' + title.replace(" ", "_")}
+                for title in titles if title in self.pages]
+
+
+def test_prefetch():
+    """Test that linked pages mentioned in an answer are prefetched into the cache."""
+    print("\n🔮 Testing Link Prefetch")
+    print("=" * 40)
+
+    einstein = {'title': 'Albert Einstein', 'url': 'https://en.wikipedia.org/wiki/Albert_Einstein',
+                'summary': 'Albert Einstein developed the theory of relativity and worked on the photoelectric effect.'}
+    cache = PageCache([MemoryCache()])
+    cache.put("en", "albert einstein", einstein)
+    namibot = NamiBot("PrefetchBot", engine=NamiBotEngine(cache=cache, negative_cache=False, aliases=False,
+                                                          search_index=False, title_suggester=False))
+    namibot.engine.prefetcher = Prefetcher(namibot.engine, max_links=2)
+    namibot.engine._prefetch_client = FakeLinkClient(
+        {'Albert Einstein': ['Germany', 'Photoelectric effect', 'Theory of relativity (physics)']},
+        {'Photoelectric effect': 'Emission of electrons by light.',
+         'Theory of relativity (physics)': 'Two theories by Albert Einstein.'})
+
+    assert rank_links(['Germany', 'Photoelectric effect', 'Theory of relativity (physics)'], einstein['summary']) == \
+        ['Theory of relativity (physics)', 'Photoelectric effect']
+    assert namibot.engine.prefetcher.prefetch(einstein) == 2
+    assert cache.get_stats()['cache_misses'] == 0  # checking which links are cached is not a lookup
+    assert "Emission of electrons" in namibot.get_response("Tell me about photoelectric effect")
+    namibot.get_response("Tell me about photoelectric effect")
+    stats = namibot.get_stats()
+    assert stats['prefetched_pages'] == 2 and stats['prefetch_hits'] == 1
+    assert stats['prefetch_hit_rate'] == 0.5
+    namibot.engine.prefetcher.close()
+    print("Link prefetch tests passed!")
+
+
+class FakeResponse:
+    """Minimal requests.Response for the client tests."""
+
+    def __init__(self, status_code, headers=None, data=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.data = data or {}
+        self.content = json.dumps(self.data).encode("utf-8")
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return self.data
+
+
+def test_async_lookup():
+    """Test aget_response against the local MediaWiki stand-in: a hit, a miss and coalesced calls."""
+    print("\n⚡ Testing Async Lookup")
+    print("=" * 40)
+    try:
+        import aiohttp  # noqa: F401 (the async client needs it)
+    except ImportError:
+        print("aiohttp is not installed, skipping")
+        return
+    import sys
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+    from stub_wiki import StubWikiServer
+    from wiki_api import close_async_session
+
+    pages = {"Albert Einstein": "Albert Einstein was a theoretical physicist."}
+    with StubWikiServer(pages=pages, latency=0.05) as stub:
+        engine = NamiBotEngine(api_url=stub.api_url, cache=PageCache([MemoryCache()]), negative_cache=NegativeCache(),
+                               aliases=False, search_index=False, title_suggester=False,
+                               rate_limiter=RateLimiter(rate=1e6, max_rate=1e6, burst=1e6))
+
+        async def ask():
+            try:
+                # Five sessions asking at once share one request
+                answers = await asyncio.gather(*(NamiBot(engine=engine).aget_response("Tell me about albert einstein")
+                                                 for _ in range(5)))
+                missing = await NamiBot(engine=engine).aget_response("Tell me about zorblax quintet")
+                return answers, missing
+            finally:
+                await close_async_session()
+
+        answers, missing = asyncio.run(ask())
+        assert len(set(answers)) == 1 and "📚 **Albert Einstein**" in answers[0]
+        assert "couldn't find" in missing
+        assert stub.request_count == 2
+        assert engine.get_stats()['coalesced_lookups'] == 4
+    print("Async lookup tests passed!")
+
+
+def test_session_manager():
+    """Test session handling, the max_sessions cap, idle eviction and bad request bodies."""
+    print("\n🗂️ Testing Session Manager")
+    print("=" * 40)
+    from server import SessionManager
+
+    engine = NamiBotEngine(cache=False, negative_cache=False, aliases=False, search_index=False,
+                           title_suggester=False)
+    manager = SessionManager(engine, idle_timeout=60, max_sessions=2, languages=["de"])
+    first, second = manager.create(), manager.create()
+    assert asyncio.run(manager.handle(first, "my name is ada")) == "Nice to meet you, Ada! I'll remember your name."
+    assert asyncio.run(manager.handle("no-such-session", "hello")) is None
+    assert manager.get(first).user_name == "Ada" and manager.messages_handled == 1
+
+    # The least recently active session makes room for a new one
+    third = manager.create()
+    assert manager.get(second) is None and manager.get(first) is not None and manager.evicted == 1
+
+    # Sessions idle longer than idle_timeout are dropped
+    bot, _ = manager.sessions[first]
+    manager.sessions[first] = (bot, time.monotonic() - 120)
+    manager.sessions.move_to_end(first, last=False)
+    assert manager.evict_idle() == 1 and list(manager.sessions) == [third]
+    assert manager.get_stats()['active_sessions'] == 1 and manager.close(third) and not manager.close(third)
+
+    # Sessions move between workers as snapshots, but clients cannot send pages for the shared cache
+    cached = NamiBotEngine(cache=PageCache([MemoryCache()]), negative_cache=False, aliases=False,
+                           search_index=False, title_suggester=False)
+    cached.cache.put("en", "einstein", {'title': 'Fake', 'summary': 'Planted.', 'url': 'https://example.com'})
+    with_pages = NamiBot(engine=cached).snapshot(pages=10)
+    moved = manager.restore("0" * 32, NamiBot(engine=cached).snapshot())
+    assert manager.get(moved) is not None and manager.snapshot(moved) is not None
+    try:
+        manager.restore("1" * 32, with_pages)
+        assert False, "a snapshot with pages was restored"
+    except ValueError:
+        pass
+
+    # Only the configured languages get sessions (and engines), also through snapshots
+    french = NamiBot(engine=cached.for_language("fr")).snapshot()
+    for attempt in (lambda: manager.create("en-" + "a" * 5), lambda: manager.restore("2" * 32, french)):
+        try:
+            attempt()
+            assert False, "a session in a language that is not served was created"
+        except ValueError:
+            pass
+    assert list(engine._engines) == ["en"] and manager.get(manager.create("de")).language == "de"
+
+    # Restored sessions get the manager's history limit, and small bodies cannot inflate without bound
+    long_session = NamiBot(engine=cached, history_limit=None)
+    for i in range(1500):
+        long_session.conversation_history.append("user", f"message {i}")
+    bulky = NamiBot(engine=cached, history_limit=None)
+    for i in range(6):
+        bulky.conversation_history.append("bot", "a" * 900000)
+    assert len(bulky.snapshot()) < 100000
+    for snapshot, reason in ((long_session.snapshot(), "turns"), (bulky.snapshot(), "larger than")):
+        try:
+            manager.restore("3" * 32, snapshot)
+            assert False, "an oversized snapshot was restored"
+        except ValueError as e:
+            assert reason in str(e)
+    manager.restore("3" * 32, NamiBot(engine=cached, history_limit=None).snapshot())
+    assert manager.get("3" * 32).conversation_history.max_turns == manager.history_limit
+
+    try:
+        from aiohttp.test_utils import TestClient, TestServer
+    except ImportError:
+        print("aiohttp is not installed, skipping the HTTP checks")
+        return
+    from server import create_app
+
+    async def post_bad_bodies():
+        client = TestClient(TestServer(create_app(manager)))
+        await client.start_server()
+        try:
+            session_id = (await (await client.post("/sessions")).json())['session_id']
+            statuses = [(await client.post("/sessions", data="{not json")).status,
+                        (await client.post(f"/sessions/{session_id}/messages", data="[1, 2]")).status,
+                        (await client.post(f"/sessions/{session_id}/messages", json={"message": "hi"})).status,
+                        (await client.put("/sessions/" + "1" * 32, data=with_pages)).status,
+                        (await client.post("/sessions", json={"language": "en-aa"})).status,
+                        (await client.post("/sessions", json={"language": "de"})).status]
+            manager.max_snapshot_bytes = 1000
+            statuses.append((await client.put("/sessions/" + "1" * 32, data=b"NBSN" + bytes(2000))).status)
+        finally:
+            await client.close()
+        return statuses
+
+    assert asyncio.run(post_bad_bodies()) == [400, 400, 200, 400, 400, 200, 413]
+    print("Session manager tests passed!")
+
+
+def test_streaming_response():
+    """Test that streamed chunks join to the get_response text and the reply is recorded."""
+    print("\n🌊 Testing Streaming Response")
+    print("=" * 40)
+
+    engine = NamiBotEngine(cache=False, negative_cache=False, aliases=False, search_index=False,
+                           title_suggester=False)
+    engine.wiki.resolve_titles = lambda candidates: {
+        'title': 'Marie Curie', 'requested': candidates[0], 'url': 'https://en.wikipedia.org/wiki/Marie_Curie',
+        'summary': 'Marie Curie was a physicist and chemist. She won two Nobel Prizes! Was she the first?'}
+
+    for message in ("Tell me about marie curie", "hello", "zzz"):
+        random_state = random.getstate()
+        expected = NamiBot(engine=engine).get_response(message)
+        random.setstate(random_state)  # the same choice of small-talk reply
+        bot = NamiBot(engine=engine)
+        chunks = list(bot.stream_response(message))
+        assert "".join(chunks) == expected
+        turns = list(bot.get_conversation_history())
+        assert turns[0]['user'] == message and turns[-1]['bot'] == expected and len(turns) == 2
+    assert len(chunks) == 1 and len(list(NamiBot(engine=engine).stream_response("Tell me about marie curie"))) > 4
+    print("Streaming response tests passed!")
+
+
+def test_rate_limiter():
+    """Test the adaptive token bucket and retries of throttled requests."""
+    print("\n🚦 Testing Rate Limiter")
+    print("=" * 40)
+
+    assert parse_retry_after("3") == 3.0 and parse_retry_after(None) is None
+    assert throttle_hint(429, {"Retry-After": "2"}) == (True, 2.0)
+    assert throttle_hint(200, {"MediaWiki-API-Error": "maxlag", "Retry-After": "5"}) == (True, 5.0)
+    assert throttle_hint(200, {}) == (False, None)
+
+    limiter = RateLimiter(rate=100.0, max_rate=200.0, burst=2)
+    assert limiter.reserve()[0] == 0 and limiter.reserve()[0] == 0
+    assert 0.005 < limiter.reserve()[0] <= 0.01  # the burst is used up: wait one token interval
+    assert limiter.throttled(0, retry_after=0.05) == 0.05
+    assert limiter.rate == 50.0
+    limiter.throttled(0, retry_after=0.05)  # sent before the pause: no second halving
+    assert limiter.rate == 50.0 and limiter.get_stats()['rate_limit_throttled'] == 2
+    assert limiter.reserve()[0] >= 0.04
+    limiter.succeeded()
+    assert limiter.rate == 50.5  # well below the throttled rate of 100 it grows at full speed
+
+    # A 429 with Retry-After is retried once the pause is over
+    client = WikiClient(limiter=RateLimiter(), max_retries=2)
+    responses = [FakeResponse(429, {"Retry-After": "0"}),
+                 FakeResponse(200, data={"query": {"pages": [{"title": "Python"}]}})]
+    client.session.get = lambda url, params=None, timeout=None: responses.pop(0)
+    assert client.query(titles="Python") == {"pages": [{"title": "Python"}]}
+    assert client.request_count == 2 and client.limiter.throttled_responses == 1
+
+    # The retry is counted in the engine's request metrics too
+    engine = NamiBotEngine(cache=False, negative_cache=False, aliases=False, search_index=False,
+                           title_suggester=False, rate_limiter=RateLimiter())
+    responses = [FakeResponse(429, {"Retry-After": "0"}),
+                 FakeResponse(200, data={"query": {"pages": [
+                     {"title": "Python", "extract": "A language.", "fullurl": "https://en.wikipedia.org/wiki/Python"}]}})]
+    engine.wiki.session.get = lambda url, params=None, timeout=None: responses.pop(0)
+    assert engine.lookup("python")[0]['title'] == "Python"
+    assert engine.get_stats()['metrics']['api_requests'] == 2
+    print("Rate limiter tests passed!")
+
+
+class FakeChatText:
+    """Stands in for the GUI's ScrolledText: lines of text and the first line of each tag."""
+
+    def __init__(self):
+        self.lines = [""]
+        self.first_line = 1    # line number of lines[0] since the chat started
+        self.tag_lines = {}
+
+    def insert(self, index, *arguments):
+        for text, tags in zip(arguments[::2], arguments[1::2]):
+            for tag in tags:
+                self.tag_lines.setdefault(tag, self.first_line + len(self.lines) - 1)
+            parts = text.split("\n")
+            self.lines[-1] += parts[0]
+            self.lines.extend(parts[1:])
+
+    def index(self, index):
+        return f"{len(self.lines)}.{len(self.lines[-1])}"
+
+    def delete(self, start, end):
+        removed = int(end.split(".")[0]) - 1
+        del self.lines[:removed]
+        self.first_line += removed
+
+    def tag_ranges(self, tag):
+        line = self.tag_lines.get(tag)
+        return (f"{line - self.first_line + 1}.0",) if line is not None and line >= self.first_line else ()
+
+    def tag_delete(self, tag):
+        self.tag_lines.pop(tag, None)
+
+    def config(self, **options):
+        pass
+
+    def see(self, index):
+        pass
+
+
+def test_chat_links():
+    """Test URL splitting and that GUI render time per message stays flat over 10k messages."""
+    print("\n🔗 Testing Chat Links")
+    print("=" * 40)
+
+    assert split_links("") == []
+    assert split_links("no links here") == [("no links here", False)]
+    assert split_links("Read https://en.wikipedia.org/wiki/Python and http://x.org now") == [
+        ("Read ", False), ("https://en.wikipedia.org/wiki/Python", True),
+        (" and ", False), ("http://x.org", True), (" now", False)]
+    assert split_links("https://a.org") == [("https://a.org", True)]
+
+    try:
+        from gui_namibot import NamiBotGUI
+    except ImportError:
+        print("tkinter is not installed, skipping the render check")
+        return
+
+    # The rendering code of the GUI, on a stand-in widget so no display is needed
+    app = NamiBotGUI.__new__(NamiBotGUI)
+    app.namibot, app.chat_display, app.max_lines = NamiBot.__new__(NamiBot), FakeChatText(), 500
+    app.namibot.name, app.links, app.link_count = "NamiBot", {}, 0
+    answer = "📖 **Python**\n\nPython is a programming language.\n\n🔗 Read more: https://en.wikipedia.org/wiki/Python"
+    blocks = []
+    for block in range(10):
+        start = time.perf_counter()
+        for i in range(1000):
+            app.display_user_message(f"Tell me about Python {i}")
+            app.start_bot_message()
+            for chunk in answer.split("\n\n"):
+                app.append_bot_chunk(chunk + "\n\n")
+            app.finish_bot_message()
+        blocks.append(time.perf_counter() - start)
+        assert len(app.chat_display.lines) <= app.max_lines + 1 and len(app.links) <= app.max_lines
+    assert app.link_count == 10000 and all(app.chat_display.tag_ranges(tag) for tag in app.links)
+    # Bounded scrollback and links keep the last block about as fast as the first
+    assert blocks[-1] < 3 * min(blocks[:3]) + 0.05, blocks
+    print("Chat link tests passed!")
+
+
+def test_batch_mode():
+    """Test that batch answers are written in input order with the input fields kept."""
+    print("\n📦 Testing Batch Mode")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dump_path = os.path.join(tmp, "pages-articles.xml")
+        with open(dump_path, "w", encoding="utf-8") as dump_file:
+            dump_file.write("<mediawiki>\n" + _dump_page("Marie Curie", "'''Marie Curie''' was a chemist.")
+                            + "</mediawiki>\n")
+        engine = NamiBotEngine(backend="dump", dump_path=dump_path, cache=False, negative_cache=False,
+                               aliases=False, search_index=False, title_suggester=False)
+
+        lines = ["hello", "", '{"id": 7, "question": "Who is Marie Curie?"}', "my name is Ann"] * 10
+        output = io.StringIO()
+        stats = run_batch(read_questions(lines), output, engine, workers=4)
+        engine.wiki.close()
+
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert stats['questions'] == 30 and stats['failed'] == 0
+    assert [result.get('id', result.get('line')) for result in results[:3]] == [1, 7, 4]
+    assert "Marie Curie was a chemist." in results[1]['response']
+    # Each question gets a fresh session, so no name leaks into later answers
+    assert all(result['response'].startswith("Nice to meet you, Ann!") for result in results[2::3])
+    assert all(result['line'] == 4 * i + 4 for i, result in enumerate(results[2::3]))
+
+    # Malformed lines and lines without a question are reported in place
+    lines = ['{"id": 1, "question": ', '{"id": 2} {}', '{"id": 3, "question": ""}', '{"id": 4}', "hello",
+             '{"error": "upstream", "note": "no question"}', '{"error": "upstream", "question": "hello"}']
+    output = io.StringIO()
+    stats = run_batch(read_questions(lines), output, engine, workers=2)
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+    # An input field named "error" neither breaks the batch nor counts as a failure
+    assert stats['questions'] == 7 and stats['failed'] == 5
+    assert [result['line'] for result in results[:6]] == [1, 2, 3, 4, 5, 6]
+    assert results[5]['error'] == "No question field" and 'response' in results[6]
+    assert results[0]['error'].startswith("Invalid JSON") and results[1]['error'].startswith("Invalid JSON")
+    assert results[2] == {'line': 3, 'id': 3, 'question': '', 'error': 'No question field'}
+    assert 'response' not in results[3] and 'response' in results[4]
+    print("Batch mode tests passed!")
+
+
+def test_minimal_payload_fetch():
+    """Test that one request asks for a capped extract and its bytes are counted per answer."""
+    print("\n📉 Testing Minimal Payload Fetch")
+    print("=" * 40)
+
+    engine = NamiBotEngine(cache=False, negative_cache=False, aliases=False, search_index=False,
+                           title_suggester=False)
+    sent = []
+    response = FakeResponse(200, data={"query": {"pages": [
+        {"title": "Python", "extract": "Python is a programming language.", "fullurl": "https://en.wikipedia.org/wiki/Python"}]}})
+    engine.wiki.session.get = lambda url, params=None, timeout=None: sent.append(params) or response
+    document, error = engine.lookup("python")
+
+    assert document['url'] == "https://en.wikipedia.org/wiki/Python" and error is None
+    assert len(sent) == 1 and sent[0]['exchars'] == 600 and sent[0]['exintro'] == 1 and sent[0]['inprop'] == 'url'
+    assert engine.wiki.bytes_received == len(response.content)
+    stats = engine.get_stats()['metrics']
+    assert stats['api_bytes'] == len(response.content)
+    assert stats['api_bytes_per_search']['count'] == 1
+    print("Minimal payload fetch tests passed!")
+
+
+def test_language_pool():
+    """Test per-language engines sharing resources and the parallel fallback by priority."""
+    print("\n🌍 Testing Language Pool")
+    print("=" * 40)
+
+    engine = NamiBotEngine(cache=PageCache([MemoryCache()]), negative_cache=NegativeCache(), aliases=False,
+                           search_index=False, title_suggester=False, fallback_languages=("de", "fr"))
+    assert engine.clients.languages() == []  # no client until the first lookup
+    german, french = engine.for_language("de"), engine.for_language("fr")
+    assert engine.for_language("de") is german and german.cache is engine.cache
+    assert german.wiki.session is engine.wiki.session and engine.clients.languages() == ["de", "en"]
+    assert NamiBot("FrenchBot", language="fr", engine=engine).language == "fr"
+
+    calls = []
+
+    def resolver(language, delay, found):
+        def resolve_titles(titles):
+            calls.append(language)
+            time.sleep(delay)
+            if found:
+                return {'title': 'Kartoffel', 'summary': f'{language} summary.', 'requested': titles[0],
+                        'url': f'https://{language}.wikipedia.org/wiki/Kartoffel'}
+            return None
+        return resolve_titles
+
+    engine.wiki.resolve_titles = resolver("en", 0.02, False)
+    german.wiki.resolve_titles = resolver("de", 0.05, True)
+    french.wiki.resolve_titles = resolver("fr", 0, True)
+
+    # German has priority over French even though French answers first
+    document, error = engine.lookup("kartoffel")
+    assert error is None and document['url'] == "https://de.wikipedia.org/wiki/Kartoffel"
+    assert sorted(calls) == ["de", "en", "fr"]
+    # The hit is cached under the English query, so asking again sends nothing
+    calls.clear()
+    assert engine.lookup("kartoffel")[0] == document and calls == []
+    assert engine.get_stats()['metrics']['fallback_hits'] == 1
+
+    # A fallback hit wins over a loose local match, also once the English query is known to be missing
+    index = SearchIndex()
+    index.add({'title': 'Potato salad', 'summary': 'A salad made with kartoffel.',
+               'url': 'https://en.wikipedia.org/wiki/Potato_salad'})
+    engine = NamiBotEngine(cache=PageCache([MemoryCache()]), negative_cache=NegativeCache(), aliases=False,
+                           search_index=index, title_suggester=False, fallback_languages=("de",))
+    engine.wiki.resolve_titles = resolver("en", 0, False)
+    engine.for_language("de").wiki.resolve_titles = resolver("de", 0, True)
+    assert engine.lookup("kartoffel")[0]['url'] == "https://de.wikipedia.org/wiki/Kartoffel"
+    engine.cache.clear()
+    calls.clear()
+    assert engine.lookup("kartoffel")[0]['url'] == "https://de.wikipedia.org/wiki/Kartoffel"
+    assert calls == ["de"] and engine.negative_cache.hits >= 1
+    print("Language pool tests passed!")
+
+
+def test_title_suggester():
+    """Test typo-tolerant title suggestions from a saved index and their use as lookup candidates."""
+    print("\n🔤 Testing Title Suggester")
+    print("=" * 40)
+
+    assert edit_distance("einstien", "einstein", 2) == 1  # a transposition is one edit
+    assert edit_distance("kitten", "sitting", 2) == 3
+    titles = [("Albert Einstein", 900), ("Albert Einstein Medal", 10), ("Alberta", 300), ("Einstein (crater)", 5),
+              ("Python (programming language)", 800), ("List of Albert Einstein awards", 1)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "titles-en.nbts")
+        TitleSuggester.build(titles).save(path)
+        suggester = TitleSuggester.load(path)
+        assert len(suggester) == 6
+        assert suggester.suggest("Albert Einstien")[0] == ("Albert Einstein", 1)
+        assert suggester.best("albert_einstein") == ("Albert Einstein", 0)
+        assert suggester.best("albret einstien") == ("Albert Einstein", 2)
+        assert suggester.best("quantum gravity") is None
+
+        engine = NamiBotEngine(cache=False, negative_cache=NegativeCache(), search_index=False,
+                               title_suggester=suggester, aliases=False)
+        requested = []
+
+        def resolve_titles(candidates):
+            requested.append(candidates)
+            if "Albert Einstein" in candidates:
+                return {'title': 'Albert Einstein', 'summary': 'Physicist.', 'requested': 'Albert Einstein',
+                        'url': 'https://en.wikipedia.org/wiki/Albert_Einstein'}
+            return None
+
+        engine.wiki.resolve_titles = resolve_titles
+        document, error = engine.lookup("albert einstien")
+        assert error is None and document['title'] == "Albert Einstein"
+        assert requested == [["albert einstien", "Albert Einstein"]]
+        engine.lookup("Albert Einstein")
+        assert requested[-1] == ["Albert Einstein"]  # an exact match is the only candidate
+        assert engine.get_stats()['indexed_titles'] == 6
+        suggester.close()
+    print("Title suggester tests passed!")
+
+
+def test_alias_map():
+    """Test that learned redirects persist and send only the canonical title."""
+    print("\n🔀 Testing Alias Map")
+    print("=" * 40)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "aliases.sqlite3")
+        aliases = AliasMap(path, max_entries=2)
+        assert aliases.put("en", "usa", "United States")
+        assert not aliases.put("en", "Albert_Einstein", "Albert Einstein")  # not an alias
+        aliases.put("en", "AI", "Artificial intelligence")
+        assert aliases.get("en", "ai") is None and aliases.get("en", "AI") == "Artificial intelligence"
+        aliases.put("en", "einstein", "Albert Einstein")  # evicts the oldest alias
+        assert aliases.get("en", "usa") is None and len(aliases) == 2
+        stats = aliases.get_stats()
+        assert stats['alias_hits'] == 1 and stats['alias_misses'] == 2 and stats['alias_evictions'] == 1
+        aliases.close()
+
+        sent = []
+        response = FakeResponse(200, data={"query": {
+            "normalized": [{"from": "ai", "to": "Ai"}],
+            "redirects": [{"from": "Ai", "to": "Artificial intelligence"}],
+            "pages": [{"title": "Artificial intelligence", "extract": "Intelligence of machines.",
+                       "fullurl": "https://en.wikipedia.org/wiki/Artificial_intelligence"}]}})
+
+        def new_engine():
+            engine = NamiBotEngine(cache=PageCache([MemoryCache()]), negative_cache=NegativeCache(),
+                                   search_index=False, title_suggester=False,
+                                   aliases=AliasMap(os.path.join(tmp, "learned.sqlite3")))
+            engine.wiki.session.get = lambda url, params=None, timeout=None: sent.append(params['titles']) or response
+            return engine
+
+        engine = new_engine()
+        assert engine.lookup("ai")[0]['title'] == "Artificial intelligence"
+        assert len(engine.aliases) == 1 and sent[0] == "ai|Ai"
+        engine.aliases.close()
+        # After a restart the page cache is empty, but only the canonical title is requested
+        engine = new_engine()
+        assert engine.lookup("ai")[0]['title'] == "Artificial intelligence"
+        assert sent[-1] == "Artificial intelligence" and len(sent) == 2
+        assert engine.get_stats()['alias_hits'] == 1
+        engine.aliases.close()
+    print("Alias map tests passed!")
+
+
+def test_response_templates():
+    """Test that replies are shared templates rendered with the session's current values."""
+    print("\n🧩 Testing Response Templates")
+    print("=" * 40)
+
+    engine = NamiBotEngine(cache=False, negative_cache=False, aliases=False, search_index=False,
+                           title_suggester=False)
+    bot = NamiBot("Nami", engine=engine)
+    assert 'patterns' not in vars(bot) and 'default_responses' not in vars(bot)
+    assert bot.render("Hi {user_name}, I'm {name} ({search_count} searches)") == "Hi User, I'm Nami (0 searches)"
+    bot.get_response("my name is ada")
+    bot.search_count = 7
+    assert "7" in bot.get_response("search count")
+    replies = {bot.render(template) for template in NamiBot.patterns[r'\b(how are you|how do you do)\b']}
+    assert "I'm doing great! Ready to search Wikipedia documents for you, Ada!" in replies
+    assert re.fullmatch(r"\d\d:\d\d:\d\d", bot.render("{time}"))
+    print("Response templates tests passed!")
+
+
+def test_session_snapshot():
+    """Test saving a session with hot pages and restoring it on another engine."""
+    print("\n💾 Testing Session Snapshot")
+    print("=" * 40)
+
+    def new_engine():
+        return NamiBotEngine(cache=PageCache([MemoryCache()]), negative_cache=False, aliases=False,
+                             search_index=False, title_suggester=False)
+
+    bot = NamiBot("Nami", engine=new_engine(), history_limit=50)
+    bot.get_response("my name is ada")
+    bot.get_response("thanks, naïve café ☕")
+    bot.search_count = 4
+    page = {'title': 'Albert Einstein', 'summary': 'Physicist.', 'url': 'https://en.wikipedia.org/wiki/Albert_Einstein'}
+    bot.engine.cache.put("en", "einstein", page)
+
+    for compress in (True, False):
+        engine = new_engine()
+        restored = NamiBot.restore(bot.snapshot(pages=10, compress=compress), engine=engine)
+        assert (restored.name, restored.user_name, restored.search_count) == ("Nami", "Ada", 4)
+        assert list(restored.get_conversation_history()) == list(bot.get_conversation_history())
+        assert restored.conversation_history.max_turns == 50
+        assert engine.cache.get("en", "einstein") == page and engine.cache.get("en", "Albert Einstein") == page
+
+    # Streaming to and from a file, without pages
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "session.nbsn")
+        with open(path, "wb") as snapshot_file:
+            bot.snapshot(snapshot_file)
+        engine = new_engine()
+        with open(path, "rb") as snapshot_file:
+            restored = NamiBot.restore(snapshot_file, engine=engine)
+        assert len(restored.conversation_history) == len(bot.conversation_history)
+        assert engine.cache.get("en", "einstein") is None
+
+    # Unlimited histories round-trip; restored sessions never spill
+    unlimited = NamiBot("Nami", engine=new_engine(), history_limit=None)
+    unlimited.get_response("hello")
+    restored = NamiBot.restore(unlimited.snapshot(), engine=new_engine())
+    assert restored.conversation_history.max_turns is None and restored.conversation_history.spill_path is None
+
+    # Untrusted snapshots may not warm the shared cache
+    try:
+        NamiBot.restore(bot.snapshot(pages=10), engine=new_engine(), warm_cache=False)
+        assert False, "a snapshot with pages was accepted"
+    except ValueError:
+        pass
+
+    data = bot.snapshot(compress=False)
+    bad_language = data.replace(b"\x02\x00\x00\x00en", b"\x02\x00\x00\x00e/")
+    # The last turn record is followed by its text and the page count
+    role_at = len(data) - COUNT.size - len(bot.conversation_history.recent()[-1].text.encode("utf-8")) - TURN.size
+    bad_role = data[:role_at] + b"\x07" + data[role_at + 1:]
+    for broken in (data[:-3], b"NBSN\x09\x00\x00\x00", b"junk", bad_language, bad_role):
+        try:
+            NamiBot.restore(broken, engine=new_engine())
+            assert False, "a broken snapshot was restored"
+        except ValueError:
+            pass
+    print("Session snapshot tests passed!")
+
+
 def interactive_demo():
     """Run an interactive demo of NamiBot."""
     print("\n🎮 Interactive NamiBot Demo")
@@ -185,7 +1163,30 @@ def main():
     print("🤖 NamiBot - Test Suite")
     print("=" * 60)
     
-    # Test basic conversation first
+    # Offline tests first
+    test_page_cache()
+    test_batched_title_resolution()
+    test_offline_dump_backend()
+    test_local_search_index()
+    test_intent_router()
+    test_conversation_history()
+    test_metrics()
+    test_single_flight()
+    test_prefetch()
+    test_async_lookup()
+    test_session_manager()
+    test_streaming_response()
+    test_rate_limiter()
+    test_chat_links()
+    test_batch_mode()
+    test_minimal_payload_fetch()
+    test_language_pool()
+    test_title_suggester()
+    test_alias_map()
+    test_response_templates()
+    test_session_snapshot()
+    
+    # Test basic conversation
     test_basic_conversation()
     
     # Test research commands
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+NamiBot Title Suggester
+Typo-tolerant lookup of Wikipedia titles from a local titles list, using
+symmetric deletes (SymSpell): every title is indexed under the strings left
+after deleting up to max_distance characters from its prefix, and likewise from
+its suffix. A title within max_distance of a query shares a delete with it at
+both ends, so the candidates are the titles found through both the query's
+prefix and suffix deletes - few even when thousands of titles start with
+"List of". Candidates are ranked by edit distance, then by the score from the
+titles list (e.g. page views), then by list order.
+
+The index is saved in a compact binary file that is memory-mapped on load, so
+loading takes no time regardless of its size.
+
+Usage: python title_suggest.py build enwiki-latest-all-titles-in-ns0 [titles-en.nbts]
+       python title_suggest.py suggest "albert einstien" [titles-en.nbts]
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from wiki_cache import DEFAULT_CACHE_DIR
+
+
+MAGIC = b"NBTS"
+FORMAT_VERSION = 1
+# magic, version, max distance, prefix length, titles, hash slots, postings, title bytes
+HEADER = struct.Struct("<4sHBBIIII")
+
+
+def normalize_title(title):
+    """Compare titles case-insensitively, with underscores as spaces."""
+    return " ".join(title.replace("_", " ").lower().split())
+
+
+def key_hash(key):
+    """Stable 64-bit hash of a delete (never 0)."""
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little") or 1
+
+
+def deletes(text, max_distance, prefix_length):
+    """Keys for the prefix and suffix of text: each, and every string left after deleting
+    up to max_distance characters from it, marked with the end it came from."""
+    keys = set()
+    for end, window in (("<", text[:prefix_length]), (">", text[-prefix_length:])):
+        found = {window}
+        edge = found
+        for _ in range(max_distance):
+            edge = {word[:i] + word[i + 1:] for word in edge for i in range(len(word))} - found
+            found |= edge
+        keys.update(end + word for word in found)
+    return keys
+
+
+def edit_distance(a, b, max_distance):
+    """Optimal string alignment distance, or max_distance + 1 if it is larger."""
+    too_far = max_distance + 1
+    if abs(len(a) - len(b)) > max_distance:
+        return too_far
+    # A common prefix and suffix do not change the distance
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < len(a) - start and end < len(b) - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a, b = a[start:len(a) - end], b[start:len(b) - end]
+    if not a or not b:
+        return min(max(len(a), len(b)), too_far)
+
+    # Only cells within max_distance of the diagonal can stay within max_distance
+    previous2 = None
+    previous = [min(j, too_far) for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [too_far] * (len(b) + 1)
+        current[0] = row_min = min(i, too_far)
+        for j in range(max(1, i - max_distance), min(len(b), i + max_distance) + 1):
+            cost = a[i - 1] != b[j - 1]
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if cost and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return too_far
+        previous2, previous = previous, current
+    return min(previous[-1], too_far)
+
+
+class TitleSuggester:
+    """Symmetric-delete index over a list of titles."""
+
+    def __init__(self, blob, offsets, scores, hashes, starts, counts, postings,
+                 max_distance=2, prefix_length=7, source=None):
+        self.blob = blob            # UTF-8 titles, back to back
+        self.offsets = offsets      # title id -> start in blob (one extra entry at the end)
+        self.scores = scores        # title id -> score
+        self.hashes = hashes        # open-addressing table: delete hash per slot
+        self.starts = starts        # slot -> first title id in postings
+        self.counts = counts        # slot -> number of title ids (0 = empty slot)
+        self.postings = postings
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self._source = source       # memory map the arrays point into, if loaded from a file
+
+    @classmethod
+    def build(cls, titles, max_distance=2, prefix_length=7):
+        """Index titles, given as strings or (title, score) pairs, most important first."""
+        blob = bytearray()
+        offsets = array("I", [0])
+        scores = array("I")
+        index = {}
+        seen = set()
+        for entry in titles:
+            title, score = (entry, 0) if isinstance(entry, str) else entry
+            title = " ".join(title.replace("_", " ").split())
+            normalized = normalize_title(title)
+            if not normalized or normalized in seen:
+                continue
+            seen.add(normalized)
+            title_id = len(scores)
+            blob += title.encode("utf-8")
+            offsets.append(len(blob))
+            scores.append(min(int(score), 2 ** 32 - 1))
+            for key in deletes(normalized, max_distance, prefix_length):
+                index.setdefault(key_hash(key), []).append(title_id)
+
+        slot_count = 1 << max(3, (2 * len(index) - 1).bit_length())  # at most half full
+        mask = slot_count - 1
+        hashes = array("Q", bytes(8 * slot_count))
+        starts = array("I", bytes(4 * slot_count))
+        counts = array("I", bytes(4 * slot_count))
+        postings = array("I")
+        for hashed, title_ids in index.items():
+            slot = hashed & mask
+            while counts[slot]:
+                slot = (slot + 1) & mask
+            hashes[slot], starts[slot], counts[slot] = hashed, len(postings), len(title_ids)
+            postings.extend(title_ids)
+        return cls(bytes(blob), offsets, scores, hashes, starts, counts, postings, max_distance, prefix_length)
+
+    @classmethod
+    def from_titles_file(cls, path, **kwargs):
+        """Build from a titles list: one title per line, optionally followed by a tab and a score.
+
+        Wikipedia's all-titles-in-ns0 dumps (gzipped or not) can be used as they are.
+        """
+        opener = open
+        if path.endswith(".gz"):
+            import gzip
+            opener = gzip.open
+
+        def entries():
+            with opener(path, "rt", encoding="utf-8") as titles_file:
+                for line in titles_file:
+                    title, _, score = line.rstrip("\n").partition("\t")
+                    if title and title != "page_title":
+                        yield title, int(score) if score.isdigit() else 0
+
+        return cls.build(entries(), **kwargs)
+
+    @classmethod
+    def load(cls, path):
+        """Memory-map an index saved with save()."""
+        with open(path, "rb") as index_file:
+            source = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(source)
+        magic, version, max_distance, prefix_length, title_count, slot_count, posting_count, blob_size = \
+            HEADER.unpack_from(view)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} title index")
+
+        position = 24  # the header padded to a multiple of 8, so the hash table is aligned
+
+        def section(typecode, count):
+            nonlocal position
+            size = count * array(typecode).itemsize
+            part = view[position:position + size].cast(typecode)
+            position += size
+            return part
+
+        hashes = section("Q", slot_count)
+        starts = section("I", slot_count)
+        counts = section("I", slot_count)
+        postings = section("I", posting_count)
+        scores = section("I", title_count)
+        offsets = section("I", title_count + 1)
+        blob = view[position:position + blob_size]
+        return cls(blob, offsets, scores, hashes, starts, counts, postings, max_distance, prefix_length, source)
+
+    @classmethod
+    def default(cls, language="en"):
+        """Load the prebuilt index for a language from the cache directory, or return None."""
+        path = os.path.join(DEFAULT_CACHE_DIR, f"titles-{language}.nbts")
+        return cls.load(path) if os.path.exists(path) else None
+
+    def save(self, path):
+        """Write the index in the binary format read by load()."""
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, self.max_distance, self.prefix_length, len(self),
+                             len(self.hashes), len(self.postings), len(self.blob))
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as index_file:
+            index_file.write(header.ljust(24, b"\0"))
+            for part in (self.hashes, self.starts, self.counts, self.postings, self.scores, self.offsets):
+                index_file.write(part.tobytes())
+            index_file.write(self.blob)
+        os.replace(tmp_path, path)
+
+    def title(self, title_id):
+        """The title with a given id."""
+        return str(self.blob[self.offsets[title_id]:self.offsets[title_id + 1]], "utf-8")
+
+    def _title_ids(self, key):
+        """Ids of the titles indexed under a delete."""
+        hashed = key_hash(key)
+        mask = len(self.hashes) - 1
+        slot = hashed & mask
+        while self.counts[slot]:
+            if self.hashes[slot] == hashed:
+                start = self.starts[slot]
+                return self.postings[start:start + self.counts[slot]]
+            slot = (slot + 1) & mask
+        return ()
+
+    def suggest(self, query, limit=5):
+        """Return up to limit (title, edit distance) pairs, closest first."""
+        query = normalize_title(query)
+        if not query:
+            return []
+        postings = {"<": [], ">": []}
+        for key in deletes(query, self.max_distance, self.prefix_length):
+            postings[key[0]].append(self._title_ids(key))
+        # Collect the candidates from the end with fewer postings ("List of ..." has many at
+        # the start), and intersect with the other end when that is cheaper than checking them all
+        fewer, more = sorted(postings.values(), key=lambda ids: sum(map(len, ids)))
+        candidates = set().union(*fewer)
+        if len(candidates) * 100 > sum(map(len, more)):
+            candidates.intersection_update(set().union(*more))
+
+        ranked = []
+        for title_id in candidates:
+            title = self.title(title_id)
+            distance = edit_distance(query, normalize_title(title), self.max_distance)
+            if distance <= self.max_distance:
+                ranked.append((distance, -self.scores[title_id], title_id, title))
+        ranked.sort()
+        return [(title, distance) for distance, _, _, title in ranked[:limit]]
+
+    def best(self, query):
+        """The closest title and its edit distance, or None."""
+        suggestions = self.suggest(query, limit=1)
+        return suggestions[0] if suggestions else None
+
+    def close(self):
+        """Release the memory map of a loaded index."""
+        if self._source is not None:
+            for part in (self.hashes, self.starts, self.counts, self.postings, self.scores, self.offsets, self.blob):
+                part.release()
+            self._source.close()
+            self._source = None
+
+    def __len__(self):
+        return len(self.scores)
+
+
+def main():
+    """Build an index from a titles list, or look up suggestions."""
+    if len(sys.argv) < 3 or sys.argv[1] not in ("build", "suggest"):
+        print(__doc__.strip().split("Usage: ")[1])
+        sys.exit(1)
+    default_path = os.path.join(DEFAULT_CACHE_DIR, "titles-en.nbts")
+    path = sys.argv[3] if len(sys.argv) > 3 else default_path
+
+    if sys.argv[1] == "build":
+        suggester = TitleSuggester.from_titles_file(sys.argv[2])
+        suggester.save(path)
+        print(f"✅ Indexed {len(suggester)} titles in {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+    else:
+        suggester = TitleSuggester.load(path)
+        for title, distance in suggester.suggest(sys.argv[2]):
+            print(f"{distance}  {title}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+NamiBot Wikipedia Client
+Talks to the MediaWiki Action API directly so several candidate titles can be
+resolved (with normalization and redirects) in a single request.
+"""
+
+import re
+import threading
+import weakref
+from contextvars import ContextVar
+
+from rate_limit import shared_limiter, throttle_hint
+
+
+USER_AGENT = "NamiBot/1.0 (https://github.com/user/chatbot-namibot; user@example.com)"
+API_URL = "https://{language}.wikipedia.org/w/api.php"
+# Wikipedia language codes such as "en", "de", "zh-yue"; anything else must not reach API_URL
+LANGUAGE_CODE = re.compile(r"[a-z]{2,3}(-[a-z]+)*")
+
+# MediaWiki accepts at most 50 titles per query for regular clients
+MAX_TITLES_PER_REQUEST = 50
+
+# One query returns existence, normalization, redirects, intro extract and URL;
+# clients created with extract_chars also cap the extract (exchars) on the server
+RESOLVE_PARAMS = {
+    'redirects': 1,
+    'prop': 'extracts|info',
+    'exintro': 1,
+    'explaintext': 1,
+    'exlimit': 'max',
+    'inprop': 'url'
+}
+
+# Keep-alive connection pools for the async client, one per event loop
+ASYNC_POOL_SIZE = 100
+_async_sessions = weakref.WeakKeyDictionary()
+
+# Response bytes received and requests sent (retries included) by the current thread or
+# task, for per-answer accounting
+_received = ContextVar("namibot_received_bytes", default=0)
+_sent = ContextVar("namibot_sent_requests", default=0)
+
+
+class WikiClient:
+    """Minimal MediaWiki client for resolving titles to page summaries."""
+
+    def __init__(self, language="en", user_agent=USER_AGENT, api_url=API_URL, timeout=10,
+                 limiter=None, max_retries=3, extract_chars=None, session=None):
+        self.language = language
+        self.api_url = api_url.format(language=language)
+        self.timeout = timeout
+        if session is None:
+            import requests
+
+            session = requests.Session()
+        self.session = session
+        self.session.headers["User-Agent"] = user_agent
+        self.limiter = limiter or shared_limiter
+        self.max_retries = max_retries
+        self.resolve_params = resolve_params(extract_chars)
+        self.request_count = 0
+        self.bytes_received = 0
+
+    def query(self, **params):
+        """Run an action=query request and return the decoded 'query' object.
+
+        Requests wait for the rate limiter; throttled responses are retried after
+        the server's Retry-After (or exponential backoff), up to max_retries times.
+        """
+        params.update(action="query", format="json", formatversion=2)
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            response = self.session.get(self.api_url, params=params, timeout=self.timeout)
+            self._count_response(len(response.content))
+            throttled, retry_after = throttle_hint(response.status_code, response.headers)
+            if not throttled:
+                self.limiter.succeeded()
+                break
+            self.limiter.throttled(attempt, retry_after)
+        response.raise_for_status()
+        return query_result(response.json())
+
+    def _count_response(self, size):
+        """Add a response and its body size to the client totals and to the current thread's or task's counts."""
+        self.request_count += 1
+        self.bytes_received += size
+        _sent.set(_sent.get() + 1)
+        _received.set(_received.get() + size)
+
+    def resolve_titles(self, titles):
+        """Return the first title (by priority) that exists, with its summary and URL.
+
+        All titles are sent in one request (chunked at 50). The result is a dict
+        with 'title', 'summary', 'url' and 'requested' (the candidate that matched),
+        or None if none of the titles exist.
+        """
+        for chunk in title_chunks(titles):
+            page = pick_first_existing(chunk, self.query(titles="|".join(chunk), **self.resolve_params))
+            if page is not None:
+                return page
+        return None
+
+    def resolve_all(self, titles):
+        """Return every title that exists, in the given order, as resolve_titles pages."""
+        pages = {}
+        for chunk in title_chunks(titles):
+            for page in existing_pages(chunk, self.query(titles="|".join(chunk), **self.resolve_params)):
+                pages.setdefault(page['title'], page)
+        return list(pages.values())
+
+    def linked_titles(self, title, limit="max"):
+        """Return the titles of the articles a page links to (one request, up to 500)."""
+        result = self.query(titles=title, redirects=1, prop="links", plnamespace=0, pllimit=limit)
+        return [link["title"] for page in result.get("pages", []) for link in page.get("links", [])]
+
+
+class ClientPool:
+    """WikiClients per language, created on first use, sharing one keep-alive connection pool."""
+
+    def __init__(self, api_url=API_URL, limiter=None, extract_chars=None):
+        self.api_url = api_url
+        self.limiter = limiter
+        self.extract_chars = extract_chars
+        self.session = None  # requests session of the first client, reused by the others
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def get(self, language):
+        """Return the client for a language."""
+        with self._lock:
+            client = self._clients.get(language)
+            if client is None:
+                client = WikiClient(language, api_url=self.api_url, limiter=self.limiter,
+                                    extract_chars=self.extract_chars, session=self.session)
+                self.session = client.session
+                self._clients[language] = client
+            return client
+
+    def languages(self):
+        """Languages that have a client."""
+        return list(self._clients)
+
+
+class AsyncWikiClient:
+    """Asyncio version of WikiClient sharing one keep-alive connection pool per event loop."""
+
+    def __init__(self, language="en", user_agent=USER_AGENT, api_url=API_URL, timeout=10,
+                 limiter=None, max_retries=3, extract_chars=None):
+        self.language = language
+        self.api_url = api_url.format(language=language)
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.limiter = limiter or shared_limiter
+        self.max_retries = max_retries
+        self.resolve_params = resolve_params(extract_chars)
+        self.request_count = 0
+        self.bytes_received = 0
+
+    def _count_response(self, size):
+        """Add a response and its body size to the client totals and to the current task's counts."""
+        self.request_count += 1
+        self.bytes_received += size
+        _sent.set(_sent.get() + 1)
+        _received.set(_received.get() + size)
+
+    async def query(self, **params):
+        """Run an action=query request and return the decoded 'query' object."""
+        import aiohttp
+
+        params.update(action="query", format="json", formatversion=2)
+        session = get_async_session(self.user_agent)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.aacquire()
+            async with session.get(self.api_url, params=params, timeout=timeout) as response:
+                self._count_response(len(await response.read()))
+                throttled, retry_after = throttle_hint(response.status, response.headers)
+                if not throttled:
+                    self.limiter.succeeded()
+                else:
+                    self.limiter.throttled(attempt, retry_after)
+                    if attempt < self.max_retries:
+                        continue
+                response.raise_for_status()
+                return query_result(await response.json())
+
+    async def resolve_titles(self, titles):
+        """Async counterpart of WikiClient.resolve_titles."""
+        for chunk in title_chunks(titles):
+            page = pick_first_existing(chunk, await self.query(titles="|".join(chunk), **self.resolve_params))
+            if page is not None:
+                return page
+        return None
+
+
+def get_async_session(user_agent=USER_AGENT):
+    """Return the aiohttp session (and its connection pool) for the running event loop."""
+    import asyncio
+    import aiohttp
+
+    loop = asyncio.get_running_loop()
+    session = _async_sessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(limit=ASYNC_POOL_SIZE, keepalive_timeout=30)
+        session = aiohttp.ClientSession(connector=connector, headers={"User-Agent": user_agent})
+        _async_sessions[loop] = session
+    return session
+
+
+async def close_async_session():
+    """Close the connection pool of the running event loop."""
+    import asyncio
+
+    session = _async_sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
+
+
+def resolve_params(extract_chars=None):
+    """Parameters of a title resolution query, with the extract capped at extract_chars."""
+    if extract_chars is None:
+        return RESOLVE_PARAMS
+    # TextExtracts cuts at the end of the word after extract_chars and adds an ellipsis
+    return dict(RESOLVE_PARAMS, exchars=extract_chars)
+
+
+def received_bytes():
+    """Response bytes received so far by the current thread or asyncio task."""
+    return _received.get()
+
+
+def sent_requests():
+    """API requests sent so far by the current thread or asyncio task, retries included."""
+    return _sent.get()
+
+
+def title_chunks(titles):
+    """Deduplicate titles (keeping priority order) and split them into API-sized chunks."""
+    titles = [title for title in dict.fromkeys(titles) if title]
+    return [titles[start:start + MAX_TITLES_PER_REQUEST] for start in range(0, len(titles), MAX_TITLES_PER_REQUEST)]
+
+
+def query_result(data):
+    """Return the 'query' object of an API response, raising on API errors."""
+    if "error" in data:
+        raise RuntimeError(data["error"].get("info", "MediaWiki API error"))
+    return data.get("query", {})
+
+
+def pick_first_existing(titles, result):
+    """Pick the first of titles that resolves to an existing page in a query result."""
+    return next(existing_pages(titles, result), None)
+
+
+def existing_pages(titles, result):
+    """Yield the pages of a query result that titles resolve to, in the order of titles."""
+    normalized = {entry["from"]: entry["to"] for entry in result.get("normalized", [])}
+    redirects = {entry["from"]: entry["to"] for entry in result.get("redirects", [])}
+    pages = {page["title"]: page for page in result.get("pages", [])}
+
+    for title in titles:
+        resolved = normalized.get(title, title)
+        resolved = redirects.get(resolved, resolved)
+        page = pages.get(resolved)
+        if page is None or page.get("missing") or page.get("invalid"):
+            continue
+        yield {
+            'title': page["title"],
+            'summary': page.get("extract", ""),
+            'url': page.get("fullurl", ""),
+            'requested': title
+        }
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+NamiBot Page Cache
+A two-tier cache (in-memory LRU + SQLite on disk) for Wikipedia page lookups.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "NAMIBOT_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".namibot")
+)
+
+
+def normalize_key(language, query):
+    """Build the cache key for a query or title in a given language."""
+    key = " ".join(query.replace("_", " ").split())
+    return f"{language}:{key}"
+
+
+class MemoryCache:
+    """In-memory LRU tier with TTL and size-based eviction."""
+
+    def __init__(self, max_entries=512, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if self.ttl is not None and time.time() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def peek(self, key):
+        """Check whether key holds an unexpired value, without changing its recency."""
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry is not None and (self.ttl is None or time.time() - entry[0] <= self.ttl)
+
+    def put(self, key, value, stored_at=None):
+        """Store a value, evicting the least recently used entries if full."""
+        with self._lock:
+            self._entries[key] = (stored_at or time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        """Remove a key from the cache."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def recent(self, limit):
+        """Return up to limit unexpired (key, stored_at, value) entries, most recently used first."""
+        now = time.time()
+        entries = []
+        with self._lock:
+            for key in reversed(self._entries):
+                stored_at, value = self._entries[key]
+                if self.ttl is None or now - stored_at <= self.ttl:
+                    entries.append((key, stored_at, value))
+                    if len(entries) >= limit:
+                        break
+        return entries
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCache:
+    """On-disk tier backed by SQLite, so cached pages survive restarts."""
+
+    def __init__(self, path=None, max_entries=50000, ttl=7 * 24 * 3600):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "page_cache.sqlite3")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " key TEXT PRIMARY KEY,"
+            " title TEXT NOT NULL,"
+            " summary TEXT NOT NULL,"
+            " url TEXT NOT NULL,"
+            " stored_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key):
+        """Return the cached page for key, or None if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT title, summary, url, stored_at FROM pages WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            title, summary, url, stored_at = row
+            if self.ttl is not None and now - stored_at > self.ttl:
+                self._conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE pages SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return {'title': title, 'summary': summary, 'url': url}
+
+    def peek(self, key):
+        """Check whether key holds an unexpired page, without updating or deleting any row."""
+        oldest = 0 if self.ttl is None else time.time() - self.ttl
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM pages WHERE key = ? AND stored_at >= ?", (key, oldest)
+            ).fetchone()
+        return row is not None
+
+    def put(self, key, value, stored_at=None):
+        """Store a page, evicting the least recently accessed rows if full."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (key, title, summary, url, stored_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, value['title'], value['summary'], value['url'], stored_at or now, now)
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM pages WHERE key IN ("
+                    " SELECT key FROM pages ORDER BY accessed_at ASC LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+            self._conn.commit()
+
+    def delete(self, key):
+        """Remove a key from the cache."""
+        with self._lock:
+            self._conn.execute("DELETE FROM pages WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            self._conn.execute("DELETE FROM pages")
+            self._conn.commit()
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+
+class NegativeCache:
+    """Short-lived record of queries and titles known not to exist."""
+
+    def __init__(self, max_entries=4096, ttl=300):
+        self._entries = MemoryCache(max_entries=max_entries, ttl=ttl)
+        self.hits = 0
+
+    def contains(self, language, query):
+        """Return True if the query recently failed to resolve."""
+        if self._entries.get(normalize_key(language, query)) is None:
+            return False
+        self.hits += 1
+        return True
+
+    def add(self, language, query):
+        """Record a failed lookup."""
+        self._entries.put(normalize_key(language, query), True)
+
+    def clear(self):
+        """Remove every entry and reset the counter."""
+        self._entries.clear()
+        self.hits = 0
+
+    def get_stats(self):
+        """Return the negative hit counter."""
+        return {
+            'negative_cache_hits': self.hits,
+            'negative_cache_size': len(self._entries)
+        }
+
+
+class AliasMap:
+    """Persistent map of queries and redirect titles to the canonical titles they resolved to.
+
+    Aliases outlive cached pages, so a repeated query sends one title instead of
+    its variations. Recent aliases are kept in memory in front of SQLite; when
+    the table is full, the rows least recently stored or read from disk are evicted.
+    """
+
+    def __init__(self, path=None, max_entries=100000, ttl=30 * 24 * 3600):
+        self.path = path or os.path.join(DEFAULT_CACHE_DIR, "aliases.sqlite3")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._recent = MemoryCache(max_entries=4096, ttl=ttl)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS aliases ("
+            " key TEXT PRIMARY KEY,"
+            " title TEXT NOT NULL,"
+            " stored_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS aliases_accessed ON aliases (accessed_at)")
+        self._conn.commit()
+
+    def get(self, language, query):
+        """Return the canonical title a query resolved to, or None."""
+        key = normalize_key(language, query)
+        title = self._recent.get(key)
+        if title is None:
+            title = self._load(key)
+        if title is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return title
+
+    def _load(self, key):
+        """Read an alias from SQLite and keep it in memory."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT title, stored_at FROM aliases WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            title, stored_at = row
+            if self.ttl is not None and now - stored_at > self.ttl:
+                self._conn.execute("DELETE FROM aliases WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE aliases SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        self._recent.put(key, title, stored_at)
+        return title
+
+    def put(self, language, query, title):
+        """Record that a query resolved to a title. Returns False if they are the same."""
+        key = normalize_key(language, query)
+        if key == normalize_key(language, title):
+            return False
+        now = time.time()
+        self._recent.put(key, title, now)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO aliases (key, title, stored_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, title, now, now)
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM aliases").fetchone()[0]
+            if count > self.max_entries:
+                evicted = self._conn.execute(
+                    "SELECT key FROM aliases ORDER BY accessed_at ASC LIMIT ?", (count - self.max_entries,)
+                ).fetchall()
+                self._conn.executemany("DELETE FROM aliases WHERE key = ?", evicted)
+                for (evicted_key,) in evicted:
+                    self._recent.delete(evicted_key)
+                self.evictions += len(evicted)
+            self._conn.commit()
+        return True
+
+    def delete(self, language, query):
+        """Forget an alias, e.g. when its title no longer exists."""
+        key = normalize_key(language, query)
+        self._recent.delete(key)
+        with self._lock:
+            self._conn.execute("DELETE FROM aliases WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        """Remove every alias and reset counters."""
+        self._recent.clear()
+        with self._lock:
+            self._conn.execute("DELETE FROM aliases")
+            self._conn.commit()
+        self.hits = self.misses = self.evictions = 0
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM aliases").fetchone()[0]
+
+    def get_stats(self):
+        """Return hit/miss counters, size and evictions."""
+        lookups = self.hits + self.misses
+        return {
+            'alias_hits': self.hits,
+            'alias_misses': self.misses,
+            'alias_hit_rate': self.hits / lookups if lookups else 0.0,
+            'aliases': len(self),
+            'alias_evictions': self.evictions
+        }
+
+
+class PageCache:
+    """Layered page cache. Tiers are checked in order; hits are promoted upwards."""
+
+    def __init__(self, tiers=None):
+        self.tiers = list(tiers) if tiers is not None else [MemoryCache()]
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def default(cls, path=None):
+        """Create the standard memory + SQLite cache."""
+        return cls([MemoryCache(), SQLiteCache(path)])
+
+    def get(self, language, query):
+        """Look up a page by language and query/title."""
+        key = normalize_key(language, query)
+        for depth, tier in enumerate(self.tiers):
+            value = tier.get(key)
+            if value is not None:
+                for upper in self.tiers[:depth]:
+                    upper.put(key, value)
+                self.hits += 1
+                return value
+        self.misses += 1
+        return None
+
+    def contains(self, language, query):
+        """Check whether a page is cached without counting a hit or miss or changing its recency."""
+        key = normalize_key(language, query)
+        return any(tier.peek(key) for tier in self.tiers)
+
+    def put(self, language, query, page):
+        """Store a page under its query and its resolved title."""
+        value = {'title': page['title'], 'summary': page['summary'], 'url': page['url']}
+        keys = {normalize_key(language, query), normalize_key(language, page['title'])}
+        for key in keys:
+            for tier in self.tiers:
+                tier.put(key, value)
+
+    def hot(self, limit):
+        """The most recently used pages of the memory tier as (key, stored_at, page) entries."""
+        tier = self.tiers[0] if self.tiers else None
+        return tier.recent(limit) if isinstance(tier, MemoryCache) else []
+
+    def warm(self, key, page, stored_at):
+        """Store a page under a cache key taken from hot(), keeping its original age."""
+        for tier in self.tiers:
+            tier.put(key, page, stored_at)
+
+    def clear(self):
+        """Empty every tier and reset counters."""
+        for tier in self.tiers:
+            tier.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def get_stats(self):
+        """Return hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            'cache_hits': self.hits,
+            'cache_misses': self.misses,
+            'cache_hit_rate': self.hits / lookups if lookups else 0.0
+        }
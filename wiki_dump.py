@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+NamiBot Offline Wikipedia Backend
+Serves page summaries from a local pages-articles dump (plain XML or bz2
+multistream) through a sorted, memory-mapped title index. No network needed.
+"""
+
+import bz2
+import html
+import mmap
+import os
+import re
+import struct
+import threading
+from collections import OrderedDict
+from urllib.parse import quote
+
+
+INDEX_MAGIC = b"NBIDX001"
+INDEX_HEADER = struct.Struct("<8sQ")
+INDEX_ENTRY = struct.Struct("<QIQ")  # title offset, title length, dump offset
+
+CHUNK_SIZE = 1 << 20
+MAX_REDIRECT_HOPS = 3
+BLOCK_CACHE_SIZE = 8
+
+PAGE_TITLE_RE = re.compile(rb"<page>\s*<title>(.*?)</title>", re.DOTALL)
+PAGE_RE = re.compile(r"<page>.*?</page>", re.DOTALL)
+TITLE_RE = re.compile(r"<title>(.*?)</title>", re.DOTALL)
+REDIRECT_RE = re.compile(r'<redirect\s+title="(.*?)"\s*/>')
+TEXT_RE = re.compile(r"<text[^>]*>(.*?)</text>", re.DOTALL)
+
+
+def normalize_title(title):
+    """Normalize a title the way MediaWiki does: underscores, spacing, first letter."""
+    title = " ".join(title.replace("_", " ").split())
+    return title[:1].upper() + title[1:]
+
+
+def wikitext_to_text(wikitext):
+    """Reduce the lead section of a wikitext article to plain text."""
+    lead = re.split(r"\n==[^=]", wikitext, maxsplit=1)[0]
+    lead = re.sub(r"<!--.*?-->", "", lead, flags=re.DOTALL)
+    lead = re.sub(r"<ref[^>/]*/>", "", lead)
+    lead = re.sub(r"<ref[^>]*>.*?</ref>", "", lead, flags=re.DOTALL)
+    lead = _strip_nested(lead, "{{", "}}")
+    lead = _strip_nested(lead, "{|", "|}")
+    lead = re.sub(r"\[\[(?:File|Image|Category):[^\[\]]*(?:\[\[[^\]]*\]\][^\[\]]*)*\]\]", "", lead, flags=re.IGNORECASE)
+    lead = re.sub(r"\[\[(?:[^|\]]*\|)?([^\]]*)\]\]", r"\1", lead)
+    lead = re.sub(r"\[https?://[^\s\]]+\s*([^\]]*)\]", r"\1", lead)
+    lead = re.sub(r"'{2,}", "", lead)
+    lead = re.sub(r"<[^>]+>", "", lead)
+    lead = re.sub(r"\(\s*[;,]?\s*\)", "", lead)
+    lines = [line.strip() for line in lead.splitlines()]
+    return "\n".join(line for line in lines if line).strip()
+
+
+def _strip_nested(text, open_token, close_token):
+    """Remove (possibly nested) blocks such as templates and tables."""
+    result = []
+    depth = 0
+    i = 0
+    while i < len(text):
+        if text.startswith(open_token, i):
+            depth += 1
+            i += len(open_token)
+        elif depth and text.startswith(close_token, i):
+            depth -= 1
+            i += len(close_token)
+        else:
+            if not depth:
+                result.append(text[i])
+            i += 1
+    return "".join(result)
+
+
+def _iter_streams(dump_file):
+    """Yield (offset, decompressed bytes) for every bz2 stream of a multistream dump."""
+    offset = 0
+    pending = b""
+    while True:
+        decompressor = bz2.BZ2Decompressor()
+        start = offset
+        parts = []
+        while not decompressor.eof:
+            data = pending or dump_file.read(CHUNK_SIZE)
+            pending = b""
+            if not data:
+                if parts:
+                    yield start, b"".join(parts)
+                return
+            parts.append(decompressor.decompress(data))
+            if decompressor.eof:
+                pending = decompressor.unused_data
+            offset += len(data) - len(pending)
+        yield start, b"".join(parts)
+
+
+def _scan_dump(dump_path):
+    """Return (title, offset) pairs for every page in the dump."""
+    entries = []
+    if dump_path.endswith(".bz2"):
+        with open(dump_path, "rb") as dump_file:
+            for offset, data in _iter_streams(dump_file):
+                for match in PAGE_TITLE_RE.finditer(data):
+                    entries.append((html.unescape(match.group(1).decode("utf-8")), offset))
+    else:
+        with open(dump_path, "rb") as dump_file, \
+                mmap.mmap(dump_file.fileno(), 0, access=mmap.ACCESS_READ) as dump_map:
+            for match in PAGE_TITLE_RE.finditer(dump_map):
+                entries.append((html.unescape(match.group(1).decode("utf-8")), match.start()))
+    return entries
+
+
+def _read_multistream_index(index_path):
+    """Read the offset:pageid:title index published alongside multistream dumps."""
+    opener = bz2.open if index_path.endswith(".bz2") else open
+    entries = []
+    with opener(index_path, "rt", encoding="utf-8") as index_file:
+        for line in index_file:
+            offset, _, title = line.rstrip("\n").split(":", 2)
+            entries.append((title, int(offset)))
+    return entries
+
+
+def build_index(dump_path, index_path=None, multistream_index_path=None):
+    """Build the sorted title -> offset index for a dump and write it to disk."""
+    index_path = index_path or dump_path + ".nbidx"
+    if multistream_index_path:
+        entries = _read_multistream_index(multistream_index_path)
+    else:
+        entries = _scan_dump(dump_path)
+
+    keyed = {}
+    for title, offset in entries:
+        keyed.setdefault(normalize_title(title).encode("utf-8"), offset)
+    keys = sorted(keyed)
+
+    header_size = INDEX_HEADER.size + INDEX_ENTRY.size * len(keys)
+    table = bytearray()
+    blob = bytearray()
+    for key in keys:
+        table += INDEX_ENTRY.pack(header_size + len(blob), len(key), keyed[key])
+        blob += key
+
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "wb") as index_file:
+        index_file.write(INDEX_HEADER.pack(INDEX_MAGIC, len(keys)))
+        index_file.write(table)
+        index_file.write(blob)
+    os.replace(tmp_path, index_path)
+    return index_path
+
+
+class TitleIndex:
+    """Memory-mapped, binary-searchable title -> dump offset index."""
+
+    def __init__(self, index_path):
+        self._file = open(index_path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = INDEX_HEADER.unpack_from(self._map, 0)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"{index_path} is not a NamiBot title index")
+
+    def _entry(self, position):
+        title_offset, title_length, dump_offset = INDEX_ENTRY.unpack_from(
+            self._map, INDEX_HEADER.size + position * INDEX_ENTRY.size
+        )
+        return self._map[title_offset:title_offset + title_length], dump_offset
+
+    def lookup(self, title):
+        """Return the dump offset for a title, or None."""
+        key = normalize_title(title).encode("utf-8")
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            entry_key, dump_offset = self._entry(middle)
+            if entry_key == key:
+                return dump_offset
+            if entry_key < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        """Release the memory map."""
+        self._map.close()
+        self._file.close()
+
+
+class DumpBackend:
+    """Offline replacement for WikiClient that reads a local pages-articles dump."""
+
+    def __init__(self, dump_path, language="en", index_path=None, multistream_index_path=None):
+        self.language = language
+        self.dump_path = dump_path
+        self.multistream = dump_path.endswith(".bz2")
+        self.request_count = 0
+
+        index_path = index_path or dump_path + ".nbidx"
+        if not os.path.exists(index_path) or os.path.getmtime(index_path) < os.path.getmtime(dump_path):
+            print(f"📚 Building title index for {dump_path} (one-time)...")
+            build_index(dump_path, index_path, multistream_index_path)
+        self.index = TitleIndex(index_path)
+
+        self._file = open(dump_path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._blocks = OrderedDict()
+        self._blocks_lock = threading.Lock()  # batch workers share one backend
+
+    def _read_block(self, offset):
+        """Decompress (or slice) only the part of the dump holding the page."""
+        if not self.multistream:
+            end = self._map.find(b"</page>", offset)
+            return self._map[offset:end + len(b"</page>")].decode("utf-8")
+
+        # Neighbouring pages share a bz2 stream, so keep a few decompressed streams around
+        with self._blocks_lock:
+            block = self._blocks.get(offset)
+            if block is not None:
+                self._blocks.move_to_end(offset)
+                return block
+
+        decompressor = bz2.BZ2Decompressor()
+        parts = []
+        position = offset
+        while not decompressor.eof and position < len(self._map):
+            parts.append(decompressor.decompress(self._map[position:position + CHUNK_SIZE]))
+            position += CHUNK_SIZE
+        block = b"".join(parts).decode("utf-8")
+
+        with self._blocks_lock:
+            self._blocks[offset] = block
+            self._blocks.move_to_end(offset)
+            if len(self._blocks) > BLOCK_CACHE_SIZE:
+                self._blocks.popitem(last=False)
+        return block
+
+    def _find_page(self, title):
+        """Return (title, redirect target, wikitext) for a title, or None."""
+        offset = self.index.lookup(title)
+        if offset is None:
+            return None
+        key = normalize_title(title)
+        for page in PAGE_RE.findall(self._read_block(offset)):
+            title_match = TITLE_RE.search(page)
+            if title_match and normalize_title(html.unescape(title_match.group(1))) == key:
+                redirect = REDIRECT_RE.search(page)
+                text = TEXT_RE.search(page)
+                return (
+                    html.unescape(title_match.group(1)),
+                    html.unescape(redirect.group(1)) if redirect else None,
+                    html.unescape(text.group(1)) if text else ""
+                )
+        return None
+
+    def get_page(self, title):
+        """Return the page for a title (following redirects) as a dict, or None."""
+        for _ in range(MAX_REDIRECT_HOPS + 1):
+            page = self._find_page(title)
+            if page is None:
+                return None
+            resolved_title, redirect, wikitext = page
+            if redirect is None:
+                return {
+                    'title': resolved_title,
+                    'summary': wikitext_to_text(wikitext),
+                    'url': f"https://{self.language}.wikipedia.org/wiki/{quote(resolved_title.replace(' ', '_'))}"
+                }
+            title = redirect
+        return None
+
+    def resolve_titles(self, titles):
+        """Return the first title (by priority) that exists, like WikiClient.resolve_titles."""
+        for title in dict.fromkeys(titles):
+            if not title:
+                continue
+            page = self.get_page(title)
+            if page is not None:
+                page['requested'] = title
+                return page
+        return None
+
+    def close(self):
+        """Release the dump and index memory maps."""
+        self._map.close()
+        self._file.close()
+        self.index.close()